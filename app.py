@@ -1,32 +1,59 @@
-from flask import Flask, render_template, jsonify, request, send_file, redirect
-from database import get_db_connection, init_database, get_synthetic_datasets, list_real_tickers, list_all_tickers, list_chart_tickers, store_short_link, get_short_link_url
-from datetime import datetime, timedelta, timezone
+from flask import Flask, render_template, jsonify, request, redirect, stream_with_context, abort
+import database
+from database import get_db_connection, db_connection, release_db_connection, init_database, get_synthetic_datasets, list_real_tickers, list_all_tickers, list_chart_tickers, store_short_link, get_short_link_url
+from datetime import date, datetime, timedelta, timezone
 import alpaca_trade_api as tradeapi
 import time
 import os
+import sqlite3
+import threading
 import pandas as pd
 import json
+import random
 import re
 import importlib
+import hashlib
+import traceback
+from collections import OrderedDict
+import dataclasses
+import functools
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import uuid
+from itertools import chain
+from urllib.parse import urlencode
+from werkzeug.http import http_date
 from typing import Optional
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Union
 try:
     import pandas_ta as ta
 except ImportError:
     ta = None
 import math
-from utils import calculate_vwap_per_trading_day, get_market_hours_info, get_market_open_times
+from utils import (
+    STOCK_DATA_UPSERT_SQL,
+    calculate_vwap_per_trading_day,
+    get_market_hours_info,
+    get_market_open_times,
+    stock_data_rows,
+    wilder_rsi,
+)
 from strategies import (
     compute_vwap_ema_crossover_signals,
     compute_fools_paradise_signals,
     STRATEGY_REGISTRY,
+    add_shared_indicators,
     build_regular_mask,
+    compute_signals_batch,
+    load_registry_manifest,
+    write_registry_manifest,
     normalize_signals,
 )
 from backtesting import run_backtest, RiskRewardExecutionModel
 from candlestick_analysis import compute_candlestick_bias, count_pattern_instances
 from replay.session import ReplaySession, ReplaySessionConfig
-from synthetic_generators import get_generator, write_synthetic_series_to_db
+from replay.stats import FillTally
+from synthetic_generators import get_generator, generate_and_store
 
 # Optional imports for predictive analytics - won't break app if not installed
 try:
@@ -38,10 +65,12 @@ except ImportError:
 
 try:
     import scipy
+    from scipy.signal import lfilter
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
     scipy = None
+    lfilter = None
 
 try:
     import statsmodels.api as sm
@@ -50,25 +79,232 @@ except ImportError:
     STATSMODELS_AVAILABLE = False
     sm = None
 
+# Optional fast JSON encoder/decoder for large payloads (falls back to Flask's jsonify / stdlib json).
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 app = Flask(__name__)
 
-# Initialize database on startup
-init_database()
+# init_database() runs from the server entry points (`__main__` below, run_unified.py), not at
+# import: spawned backtest/synthetic pool workers import this module and must not re-run the
+# schema statements and migrations against the serving process's database.
+
+
+@app.teardown_appcontext
+def _release_db_connection(_exc=None):
+    # Connections are pooled per thread (see database.get_db_connection); this only releases the
+    # handle and rolls back a transaction a handler left open. Handles close at process exit.
+    release_db_connection()
 
 VALID_SYNTH_TIMEFRAMES = {"1m", "5m", "15m"}
+SYNTH_TIMEFRAME_SECONDS = {"1m": 60, "5m": 300, "15m": 900}
+# Scalar `params` knobs accepted by /api/synthetic_generate for the trend-regime generators
+# (regime drift/vol use the `up_`/`down_`/`chop_` prefixed keys).
+SYNTH_V2_PARAM_KEYS = (
+    "stay_prob",
+    "overnight_gap_sigma",
+    "overnight_gap_mu",
+    "diurnal_volume_strength",
+    "diurnal_vol_strength",
+    "base_volume",
+    "base_spread",
+    "spread_diurnal_strength",
+    "depth_scale",
+)
+SYNTH_V3_PARAM_KEYS = SYNTH_V2_PARAM_KEYS + (
+    "daily_vol_sigma",
+    "daily_vol_rho",
+    "daily_vol_mu",
+    "event_prob",
+    "event_sigma",
+    "vol_ret_coupling",
+)
+# Generators that take a params dataclass: name -> (module exposing DEFAULT_PARAMS, keys).
+SYNTH_PARAM_GENERATORS = {
+    "trend_regime_v2": ("synthetic_generators.trend_regime_v2", SYNTH_V2_PARAM_KEYS),
+    "trend_regime_v3": ("synthetic_generators.trend_regime_v3", SYNTH_V3_PARAM_KEYS),
+}
 SYNTH_DEFAULT_LIMIT = 1000
 SYNTH_MAX_LIMIT = 5000
+# /api/synthetic_bars streams rows from the cursor in batches of this size.
+SYNTH_STREAM_BATCH = 1000
+# /replay/trade_ledger streams each session's FILL rows in batches of this size.
+REPLAY_LEDGER_BATCH = 500
+
+# /api/synthetic_bars query per (has start_ts, has end_ts): one fixed SQL text per shape, so
+# the connection's statement cache reuses the prepared statement.
+_SYNTH_BARS_SQL = {
+    (has_start, has_end): f"""
+        SELECT ts_start, open, high, low, close, volume
+        FROM bars_synth
+        WHERE symbol = ? AND scenario = ? AND timeframe = ?{" AND ts_ms >= ?" if has_start else ""}{" AND ts_ms <= ?" if has_end else ""}
+        ORDER BY ts_start ASC
+        LIMIT ?
+    """
+    for has_start in (False, True)
+    for has_end in (False, True)
+}
+_SYNTH_L2_SQL = """
+    SELECT
+        b.ts_start,
+        l.dbi,
+        l.ofi,
+        l.spr,
+        l.microprice
+    FROM bars_synth b
+    LEFT JOIN l2_state l
+        ON l.bar_id = b.id
+    WHERE b.symbol = ?
+      AND b.scenario = ?
+      AND b.timeframe = ?
+    ORDER BY b.ts_start ASC
+"""
 
 # In-memory replay sessions (v1). Persist logs to SQLite; sessions are ephemeral.
-_REPLAY_SESSIONS: Dict[str, ReplaySession] = {}
+# session_id -> (last_used_monotonic, session) in LRU order. Registering a session ends and drops
+# any idle longer than _REPLAY_SESSION_TTL_S, then the least recently used beyond the cap, so
+# abandoned sessions (never sent /replay/end) don't accumulate over a long uptime.
+_REPLAY_SESSION_TTL_S = 3600.0
+_REPLAY_SESSIONS_MAX = 1024
+_REPLAY_SESSIONS: "OrderedDict[str, Tuple[float, ReplaySession]]" = OrderedDict()
+_REPLAY_SESSIONS_LOCK = threading.Lock()
+# Anchor picks for unseeded replay sessions. Seeded once from os.urandom at import; the anchor
+# isn't security-sensitive, so there's no need for a SystemRandom syscall per session.
+_REPLAY_ANCHOR_RNG = random.Random()
+
+# /window series keys: OHLCV arrays, plus the indicator arrays real datasets carry.
+_OHLCV_KEYS = ("t_ms", "o", "h", "l", "c", "v")
+_WINDOW_INDICATOR_KEYS = ("ema_9", "ema_21", "ema_50", "ema_200", "vwap")
+_WINDOW_SERIES_KEYS = _OHLCV_KEYS + _WINDOW_INDICATOR_KEYS
+
+# Dataset MIN/MAX timestamp bounds, keyed by ("real", ticker, interval) or
+# ("synthetic", SYMBOL, scenario, timeframe) -> (expires_at_monotonic, min_ts, max_ts).
+# Short TTL so out-of-process ingestion (ingest_data.py) shows up; in-app writers invalidate.
+_DATASET_BOUNDS_TTL_S = 60.0
+_DATASET_BOUNDS_CACHE: Dict[tuple, Tuple[float, Optional[str], Optional[str]]] = {}
+_DATASET_BOUNDS_LOCK = threading.Lock()
+
+# Ticker/dataset listings for `/`, /api/symbols and /api/synthetic_datasets, plus per-ticker
+# latest prices: name -> (expires_at_monotonic, value). Same invalidation story as the bounds
+# cache; LRU-bounded, since the latest-price names come from caller-supplied tickers.
+_LISTING_CACHE_TTL_S = 30.0
+_LISTING_CACHE_MAX = 256
+_LISTING_CACHE: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_LISTING_LOCK = threading.Lock()
+
+# Serialized /window responses: (SYMBOL, sorted query items) -> (expires_at_monotonic, body,
+# etag, mimetype). LRU-bounded; entries for a symbol are dropped by _invalidate_dataset_bounds.
+_WINDOW_CACHE_TTL_S = 5.0
+_WINDOW_CACHE_MAX = 256
+_WINDOW_CACHE: "OrderedDict[tuple, Tuple[float, bytes, str, str]]" = OrderedDict()
+_WINDOW_CACHE_LOCK = threading.Lock()
+
+# Serialized /replay/session_summaries bodies, keyed by their ETag (_replay_history_etag: the
+# params plus the replay history version, which moves with every replay session/event write,
+# including other processes'). Entries never go stale; LRU-bounded.
+_SUMMARIES_CACHE_MAX = 32
+_SUMMARIES_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_SUMMARIES_CACHE_LOCK = threading.Lock()
+
+# /api/ticker/<ticker>/<interval> indicator series (EMAs, MACD, anchored VWAP), keyed by
+# (TICKER, interval, number of bars, last fetched row). Appending or revising a bar changes the
+# key, so entries never go stale; LRU-bounded and dropped per symbol by _invalidate_dataset_bounds.
+_INDICATOR_CACHE_MAX = 256
+_INDICATOR_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+# Worker pool for /window strategy signals: the strategies are independent and spend most of
+# their time in pandas/NumPy kernels, so they overlap instead of running back to back.
+_STRATEGY_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="strategy")
+
+# Background synthetic generation (POST /api/synthetic_generate with "async": true). The
+# generators are CPU-bound Python, so jobs run in worker processes (created on first use) and
+# are polled via /api/synthetic_generate/status/<job_id>. job_id -> (response info, future);
+# the oldest finished jobs are dropped past _SYNTH_JOBS_MAX.
+_SYNTH_GEN_POOL: Optional[ProcessPoolExecutor] = None
+_SYNTH_GEN_POOL_LOCK = threading.Lock()
+_SYNTH_JOBS_MAX = 64
+_SYNTH_JOBS: "OrderedDict[str, Tuple[Dict[str, Any], Future]]" = OrderedDict()
+_SYNTH_JOBS_LOCK = threading.Lock()
+
+# Strategy backtests (/api/strategy/<name>/backtest, /api/backtests) are CPU-bound pandas work.
+# With NTREE_BACKTEST_WORKERS > 0 they run in that many spawned worker processes (created on first
+# use), so concurrent requests use more than one core; 0 (default) runs them on the request thread.
+try:
+    BACKTEST_WORKERS = max(0, int(os.environ.get('NTREE_BACKTEST_WORKERS') or 0))
+except ValueError:
+    BACKTEST_WORKERS = 0
+_BACKTEST_POOL: Optional[ProcessPoolExecutor] = None
+_BACKTEST_POOL_LOCK = threading.Lock()
+
+# chart.html as served by /chart.html and cache-busted by /ticker/<sym>?band:
+# {"expires": monotonic deadline, "mtime_ns", "body", "etag"}. Re-stat'd at most every
+# _CHART_FILE_TTL_S and re-read only when the mtime changes; replaced wholesale, never mutated.
+_CHART_FILE_TTL_S = 2.0
+_CHART_FILE_CACHE: Dict[str, Any] = {"expires": 0.0, "mtime_ns": None, "body": None, "etag": None}
+
+# Alpaca market data for /api/fetch-latest. Credentials come from ALPACA_API_KEY /
+# ALPACA_API_SECRET / ALPACA_BASE_URL (the names test_env.py checks), defaulting to the paper
+# account. One REST client (and its keep-alive session) is shared across requests; calls are
+# spaced at least _ALPACA_MIN_INTERVAL_S apart (Alpaca allows 200 requests/minute).
+ALPACA_API_KEY = os.environ.get('ALPACA_API_KEY') or 'PK57P4EYJODEZTVL7QYOX7J53W'
+ALPACA_API_SECRET = os.environ.get('ALPACA_API_SECRET') or '6PXLeTmf6wKNJBSCKZAhg3SgCkieGag1Bgvf5Yeq53qD'
+ALPACA_BASE_URL = os.environ.get('ALPACA_BASE_URL') or 'https://paper-api.alpaca.markets/v2'
+_ALPACA_MIN_INTERVAL_S = 60.0 / 200
+_ALPACA_CLIENT: Optional[Any] = None
+_ALPACA_LOCK = threading.Lock()
+_ALPACA_LAST_CALL = 0.0
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STRATEGIES_DIR = os.path.join(BASE_DIR, 'strategies')
 
+# Source written by POST /api/strategies/create when no `code` is supplied (str.format fields:
+# display_name, description, compute_fn_name).
+_STRATEGY_SKELETON = """\"\"\"{display_name}
+
+{description}
+
+Strategy contract:
+- Input: pandas.DataFrame with index timestamps and columns: open, high, low, close, volume
+- Output: dict of same-length arrays. Minimum required by engine/UI:
+  - long_entry: list[bool]
+  - direction: list['bullish'|'bearish'|None]
+Optional UI fields:
+  - cross_y (entry marker y), exit_y, long_exit, exit_direction
+\"\"\"
+
+import pandas as pd
+
+
+def {compute_fn_name}(df_prices, rth_mask=None):
+    \"\"\"Skeleton strategy: no entries by default.\"\"\"
+    if df_prices is None or getattr(df_prices, 'empty', False):
+        return {{}}
+
+    df = df_prices.copy()
+    df.index = pd.to_datetime(df.index)
+
+    n = len(df)
+    # TODO: replace with real logic
+    long_entry = [False] * n
+    direction = [None] * n
+
+    return {{
+        'long_entry': long_entry,
+        'direction': direction,
+        'timestamp': [ts.isoformat() for ts in df.index],
+    }}
+"""
+
 
 _STRAT_NAME_RE = re.compile(r"^[a-z][a-z0-9_]{2,50}$")
 
 
+@functools.lru_cache(maxsize=64)
 def _is_valid_strategy_name(name: str) -> bool:
     try:
         nm = (name or "").strip()
@@ -81,124 +317,68 @@ def _is_valid_strategy_name(name: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=64)
 def _strategy_file_path(name: str) -> str:
     return os.path.join(STRATEGIES_DIR, f"{name}.py")
 
 
-def _ensure_strategy_registered_in_init(strategy_name: str, compute_fn_name: str) -> None:
+def _ensure_strategy_registered_in_manifest(strategy_name: str, compute_fn_name: str) -> None:
     """
-    Best-effort persistence: patch `strategies/__init__.py` to import + export the new strategy and
-    add it to STRATEGY_REGISTRY. Keeps existing file structure intact.
+    Persist a strategy in `strategies/_registry.json` so it is registered again on restart.
     """
-    init_path = os.path.join(STRATEGIES_DIR, "__init__.py")
-    if not os.path.exists(init_path):
+    manifest = load_registry_manifest()
+    target = f"strategies.{strategy_name}:{compute_fn_name}"
+    if manifest.get(strategy_name) == target:
         return
-    try:
-        with open(init_path, "r", encoding="utf-8") as f:
-            src = f.read()
-    except Exception:
-        return
-
-    # Skip if already present
-    if f"'{strategy_name}'" in src or f"strategies.{strategy_name}" in src:
-        return
-
-    lines = src.splitlines(True)
+    manifest[strategy_name] = target
+    write_registry_manifest(manifest)
 
-    # Insert import after existing strategy compute imports.
-    import_line = f"from strategies.{strategy_name} import {compute_fn_name}\n"
-    insert_at = 0
-    for i, ln in enumerate(lines):
-        if ln.startswith("from strategies.") and " import compute_" in ln and ".utils" not in ln and ".contracts" not in ln:
-            insert_at = i + 1
-    lines.insert(insert_at, import_line)
 
-    # Insert into __all__ before clean_series (keeps grouping)
-    try:
-        for i, ln in enumerate(lines):
-            if ln.strip() == "'clean_series'," or ln.strip() == '"clean_series",':
-                lines.insert(i, f"    '{compute_fn_name}',\n")
-                break
-    except Exception:
-        pass
-
-    # Insert into STRATEGY_REGISTRY dict before closing brace
-    try:
-        reg_start = None
-        reg_end = None
-        for i, ln in enumerate(lines):
-            if "STRATEGY_REGISTRY" in ln and "{" in ln:
-                reg_start = i
-            if reg_start is not None and reg_end is None and ln.strip() == "}":
-                reg_end = i
-                break
-        if reg_end is not None:
-            # Ensure previous entry has trailing comma (avoid breaking dict syntax)
-            j = reg_end - 1
-            while j >= 0 and (lines[j].strip() == "" or lines[j].strip().startswith("#")):
-                j -= 1
-            if j >= 0:
-                prev = lines[j].rstrip()
-                if prev and not prev.endswith(",") and not prev.endswith("{"):
-                    lines[j] = prev + ",\n"
-            lines.insert(reg_end, f"    '{strategy_name}': {compute_fn_name},\n")
-    except Exception:
-        pass
-
-    try:
-        with open(init_path, "w", encoding="utf-8") as f:
-            f.write("".join(lines))
-    except Exception:
-        return
-
-
-def _remove_strategy_from_init(strategy_name: str, compute_fn_name: str) -> None:
+def _remove_strategy_from_manifest(strategy_name: str) -> None:
     """
-    Opposite of _ensure_strategy_registered_in_init: remove strategy from import, __all__, and registry.
+    Opposite of _ensure_strategy_registered_in_manifest: drop the strategy's manifest entry.
     """
-    init_path = os.path.join(STRATEGIES_DIR, "__init__.py")
-    if not os.path.exists(init_path):
-        return
-    try:
-        with open(init_path, "r", encoding="utf-8") as f:
-            src = f.read()
-    except Exception:
-        return
-
-    lines = src.splitlines(True)
-    new_lines = []
-    
-    # Simple line-by-line filtering for imports and __all__
-    # For STRATEGY_REGISTRY we need to be a bit more careful about trailing commas.
-    for ln in lines:
-        # Remove import
-        if ln.startswith(f"from strategies.{strategy_name} import"):
-            continue
-        # Remove from __all__
-        if f"'{compute_fn_name}'" in ln or f'"{compute_fn_name}"' in ln:
-            if "__all__" not in ln: # don't remove the __all__ definition line itself
-                continue
-        # Remove from STRATEGY_REGISTRY
-        if f"'{strategy_name}':" in ln or f'"{strategy_name}":' in ln:
-            continue
-        
-        new_lines.append(ln)
-
-    # Post-process registry to fix trailing commas if we removed the last entry
-    # (Though Python's dict allows trailing commas, so this is mostly cosmetic)
-    
-    try:
-        with open(init_path, "w", encoding="utf-8") as f:
-            f.write("".join(new_lines))
-    except Exception:
-        return
+    manifest = load_registry_manifest()
+    if manifest.pop(strategy_name, None) is not None:
+        write_registry_manifest(manifest)
 
 
 def _get_replay_session(session_id: str) -> Optional[ReplaySession]:
     sid = (session_id or "").strip()
     if not sid:
         return None
-    return _REPLAY_SESSIONS.get(sid)
+    with _REPLAY_SESSIONS_LOCK:
+        hit = _REPLAY_SESSIONS.get(sid)
+        if hit is None:
+            return None
+        _REPLAY_SESSIONS[sid] = (time.monotonic(), hit[1])
+        _REPLAY_SESSIONS.move_to_end(sid)
+    return hit[1]
+
+
+def _add_replay_session(sess: ReplaySession) -> None:
+    """Register `sess`, ending and dropping idle or over-cap sessions (see _REPLAY_SESSIONS)."""
+    now = time.monotonic()
+    evicted: List[ReplaySession] = []
+    with _REPLAY_SESSIONS_LOCK:
+        _REPLAY_SESSIONS[sess.session_id] = (now, sess)
+        _REPLAY_SESSIONS.move_to_end(sess.session_id)
+        while len(_REPLAY_SESSIONS) > 1:
+            sid, (last_used, old) = next(iter(_REPLAY_SESSIONS.items()))
+            if now - last_used < _REPLAY_SESSION_TTL_S and len(_REPLAY_SESSIONS) <= _REPLAY_SESSIONS_MAX:
+                break
+            del _REPLAY_SESSIONS[sid]
+            evicted.append(old)
+    # Outside the lock: ending writes the session row and a SESSION_END event.
+    for old in evicted:
+        old.end()
+    _sync_replay_session_stats(*evicted)
+
+
+def _pop_replay_session(session_id: str) -> Optional[ReplaySession]:
+    with _REPLAY_SESSIONS_LOCK:
+        hit = _REPLAY_SESSIONS.pop(session_id, None)
+    return hit[1] if hit is not None else None
 
 
 def _bad_request(code: str, message: str, **extra):
@@ -208,25 +388,65 @@ def _bad_request(code: str, message: str, **extra):
     return jsonify(payload), 400
 
 
-def _parse_iso_ts(value: str) -> Optional[str]:
-    """Parse an ISO timestamp to UTC ISO string with Z, or return None on failure."""
-    try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+def _orjson_default(value: Any) -> Any:
+    # orjson would write dates as ISO-8601; keep Flask's JSON provider format (HTTP date).
+    if isinstance(value, date):
+        return http_date(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=timezone.utc)
-    else:
-        parsed = parsed.astimezone(timezone.utc)
 
-    return parsed.isoformat().replace("+00:00", "Z")
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME) if ORJSON_AVAILABLE else 0
+
+
+def _json_bytes(payload: Any) -> bytes:
+    """Compact JSON encoding of `payload` (orjson when installed, else stdlib json)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=_orjson_default, option=_ORJSON_OPTIONS)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    """
+    Decode JSON text with orjson when installed, else stdlib json. Falls back to stdlib for
+    input orjson rejects but json.dumps can write (NaN/Infinity, integers beyond 64 bits).
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def _json_response(payload: Any, status: int = 200):
+    """
+    Serialize `payload` with orjson when installed (C encoder, native NumPy arrays),
+    otherwise with Flask's jsonify (same wire format). Use for large or per-step payloads.
+    """
+    if ORJSON_AVAILABLE:
+        return app.response_class(
+            orjson.dumps(payload, default=_orjson_default, option=_ORJSON_OPTIONS),
+            status=status,
+            mimetype="application/json",
+        )
+    resp = jsonify(payload)
+    resp.status_code = status
+    return resp
+
+
+# datetime.fromisoformat accepts a trailing "Z" from Python 3.11; older interpreters need "+00:00".
+try:
+    datetime.fromisoformat("2000-01-01T00:00:00Z")
+    _fromisoformat = datetime.fromisoformat
+except ValueError:
+    def _fromisoformat(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
 
 def _parse_iso_to_epoch_ms(value: str) -> Optional[int]:
     """Parse an ISO timestamp into epoch ms (UTC). Returns None if parsing fails."""
     try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        parsed = _fromisoformat(value)
     except Exception:
         return None
     if parsed.tzinfo is None:
@@ -238,18 +458,23 @@ def _parse_iso_to_epoch_ms(value: str) -> Optional[int]:
 
 def _epoch_ms_to_iso_z(ms: int) -> str:
     """Convert epoch ms to compact ISO Z."""
+    if ms % 1000 == 0:
+        # Whole seconds (every bar timestamp): format the gmtime tuple, skipping the datetime.
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ms // 1000))
     return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
 
 
 def _aggregate_ohlcv(
-    rows: List[Tuple[int, float, float, float, float, float]],
+    rows: Sequence[Tuple[int, float, float, float, float, float]],
     target_bar_s: int,
+    limit: Optional[int] = None,
 ) -> Dict[str, List[float]]:
     """
     Aggregate base OHLCV rows (epoch_ms, o,h,l,c,v) into a larger bar size.
     Aligns buckets relative to the first timestamp for stability (same as demo chart).
+    With `limit`, only the newest `limit` buckets are returned (still in ascending order).
     """
-    if not rows:
+    if len(rows) == 0:
         return {"t_ms": [], "o": [], "h": [], "l": [], "c": [], "v": []}
 
     tgt = int(target_bar_s)
@@ -258,66 +483,122 @@ def _aggregate_ohlcv(
     bucket_ms = tgt * 1000
     t0 = int(rows[0][0])
 
+    if NUMPY_AVAILABLE:
+        return _aggregate_ohlcv_np(rows, t0, bucket_ms, limit=limit)
+
+    # Pure-Python fallback: one pass with pre-bound appends and inline compares (no closure,
+    # no max()/min() calls). Rows from SQLite already carry float prices, so those are not re-cast;
+    # the volume sum starts from float() so integer volumes come out as floats like the other paths.
     out_t: List[int] = []
     out_o: List[float] = []
     out_h: List[float] = []
     out_l: List[float] = []
     out_c: List[float] = []
     out_v: List[float] = []
-
-    cur_bucket: Optional[int] = None
-    bo = 0.0
-    bh = float("-inf")
-    bl = float("inf")
-    bc = 0.0
-    bv = 0.0
-    bt = 0
-
-    def flush() -> None:
-        nonlocal cur_bucket, bo, bh, bl, bc, bv, bt
-        if cur_bucket is None:
-            return
-        out_t.append(bt)
-        out_o.append(float(bo))
-        out_h.append(float(bh))
-        out_l.append(float(bl))
-        out_c.append(float(bc))
-        out_v.append(float(bv))
-
+    t_append = out_t.append
+    o_append = out_o.append
+    h_append = out_h.append
+    l_append = out_l.append
+    c_append = out_c.append
+    v_append = out_v.append
+
+    cur_bucket = None
+    bo = bh = bl = bc = bv = 0.0
     for (t_ms, o, h, l, c, v) in rows:
-        ti = int(t_ms)
-        b = (ti - t0) // bucket_ms
-        if cur_bucket is None:
-            cur_bucket = int(b)
-            bt = int(t0 + cur_bucket * bucket_ms)
-            bo = float(o)
-            bh = float(h)
-            bl = float(l)
-            bc = float(c)
-            bv = float(v or 0.0)
-            continue
-        if int(b) != cur_bucket:
-            flush()
-            cur_bucket = int(b)
-            bt = int(t0 + cur_bucket * bucket_ms)
-            bo = float(o)
-            bh = float(h)
-            bl = float(l)
-            bc = float(c)
+        b = (t_ms - t0) // bucket_ms
+        if b != cur_bucket:
+            if cur_bucket is not None:
+                o_append(bo)
+                h_append(bh)
+                l_append(bl)
+                c_append(bc)
+                v_append(bv)
+            cur_bucket = b
+            t_append(t0 + b * bucket_ms)
+            bo = o
+            bh = h
+            bl = l
+            bc = c
             bv = float(v or 0.0)
             continue
         # same bucket
-        bh = max(bh, float(h))
-        bl = min(bl, float(l))
-        bc = float(c)
-        bv += float(v or 0.0)
+        if h > bh:
+            bh = h
+        if l < bl:
+            bl = l
+        bc = c
+        if v:
+            bv += v
+
+    o_append(bo)
+    h_append(bh)
+    l_append(bl)
+    c_append(bc)
+    v_append(bv)
+    out = {"t_ms": out_t, "o": out_o, "h": out_h, "l": out_l, "c": out_c, "v": out_v}
+    if limit is not None and len(out_t) > limit:
+        for series in out.values():
+            del series[:-limit]
+    return out
 
-    flush()
-    return {"t_ms": out_t, "o": out_o, "h": out_h, "l": out_l, "c": out_c, "v": out_v}
+
+def _aggregate_ohlcv_np(
+    rows: Sequence[Sequence[Any]],
+    t0: int,
+    bucket_ms: int,
+    last_cols: Sequence[str] = (),
+    limit: Optional[int] = None,
+) -> Dict[str, List[Any]]:
+    """
+    NumPy path for `_aggregate_ohlcv`: rows become one float64 matrix in a single conversion
+    pass (no per-column generators), bucket ids are computed once, then each bucket is reduced with `reduceat`
+    (h/l/v) or direct indexing at bucket edges (o/c).
+    Columns after (t_ms,o,h,l,c,v) are named by `last_cols` and take the last row of each bucket
+    (NULL -> None). With `limit`, the bucket edges are sliced to the newest `limit` buckets before
+    any list conversion, so dropped buckets are never materialized.
+    """
+    n, k = len(rows), len(rows[0])
+    try:
+        arr = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=n * k).reshape(n, k)
+    except TypeError:
+        # NULL (None) cells: the slower asarray conversion maps them to NaN.
+        arr = np.asarray(rows, dtype=np.float64)
+    t = arr[:, 0].astype(np.int64)
+    v = np.nan_to_num(arr[:, 5])
+
+    b = (t - t0) // bucket_ms
+    # A new bucket starts wherever the bucket id changes (rows are time-ordered).
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    ends = np.r_[starts[1:] - 1, len(t) - 1]
+    if limit is not None and len(starts) > limit:
+        # Views; the reductions below then only cover rows from the first kept bucket on.
+        starts = starts[-limit:]
+        ends = ends[-limit:]
+
+    out: Dict[str, List[Any]] = {
+        "t_ms": (t0 + b[starts] * bucket_ms).tolist(),
+        "o": arr[starts, 1].tolist(),
+        "h": np.maximum.reduceat(arr[:, 2], starts).tolist(),
+        "l": np.minimum.reduceat(arr[:, 3], starts).tolist(),
+        "c": arr[ends, 4].tolist(),
+        "v": np.add.reduceat(v, starts).tolist(),
+    }
+    for j, name in enumerate(last_cols, start=6):
+        out[name] = [None if x != x else x for x in arr[ends, j].tolist()]
+    return out
 
 
 def _clean_series(series):
     """Normalize series to JSON-serializable list (replace NaN/NA with None)."""
+    if NUMPY_AVAILABLE and isinstance(series, (np.ndarray, pd.Series)):
+        # Vectorized: one NA mask, and a plain tolist() when there is nothing to replace.
+        values = series.to_numpy() if isinstance(series, pd.Series) else series
+        mask = pd.isna(values)
+        if not mask.any():
+            return values.tolist()
+        values = values.astype(object)
+        values[mask] = None
+        return values.tolist()
     cleaned = []
     for v in series:
         if v is None:
@@ -329,76 +610,210 @@ def _clean_series(series):
     return cleaned
 
 
-def _fetch_stock_data_ohlcv(
+_STOCK_COLUMN_KEYS = ("ts", "o", "h", "l", "c", "v")
+
+
+def _fetch_stock_data_columns(
     cursor,
     *,
     ticker: str,
     interval: str,
     start_iso: str | None = None,
     end_iso: str | None = None,
-) -> List[Tuple[str, float, float, float, float, float]]:
+) -> Dict[str, Any]:
     """
-    Fetch OHLCV rows from `stock_data` as:
-      (timestamp_iso, close, open, high, low, volume)
+    Fetch OHLCV bars from `stock_data` as columns, oldest first:
+      {"ts": [timestamp_iso, ...], "o"/"h"/"l"/"c"/"v": values}
+
+    Missing open/high/low fall back to close and missing volume to 0 in SQL, so the rows are
+    transposed once with zip(*rows). With NumPy the price/volume columns are float64 arrays that
+    `_stock_columns_frame` hands to pandas without per-row conversion; otherwise they are lists.
 
     Note:
     - In the current Alpaca-only setup, we expect 1-minute data to be stored as `interval='1Min'`.
     """
-    if start_iso and end_iso:
+    select_sql = """
+        SELECT timestamp, COALESCE(open_price, price), COALESCE(high_price, price),
+               COALESCE(low_price, price), price, COALESCE(volume, 0)
+        FROM stock_data
+    """
+    s_ms = _parse_iso_to_epoch_ms(start_iso) if (start_iso and end_iso) else None
+    e_ms = _parse_iso_to_epoch_ms(end_iso) if (start_iso and end_iso) else None
+    if s_ms is None or e_ms is None:
+        cursor.execute(
+            select_sql + "WHERE ticker = ? AND interval = ? ORDER BY timestamp ASC",
+            (ticker, interval),
+        )
+    else:
         # IMPORTANT:
         # Do not compare timestamp strings directly; DB rows may be stored with/without 'T'/'Z'.
         # Use epoch-seconds filtering consistent with `/window`.
-        s_ms = _parse_iso_to_epoch_ms(start_iso)
-        e_ms = _parse_iso_to_epoch_ms(end_iso)
-        if s_ms is None or e_ms is None:
-            cursor.execute(
+        cursor.execute(
+            select_sql + "WHERE ticker = ? AND interval = ? AND ts_ms >= ? AND ts_ms <= ? ORDER BY timestamp ASC",
+            (ticker, interval, int(s_ms // 1000) * 1000, int(e_ms // 1000) * 1000),
+        )
+    rows = cursor.fetchall()
+    ts, *values = zip(*rows) if rows else ((),) * len(_STOCK_COLUMN_KEYS)
+    if NUMPY_AVAILABLE:
+        cols = [np.asarray(col, dtype=np.float64) for col in values]
+    else:
+        cols = [[float(x) for x in col] for col in values]
+    return {"ts": list(ts), **dict(zip(_STOCK_COLUMN_KEYS[1:], cols))}
+
+
+def _stock_columns_frame(cols: Dict[str, Any]) -> pd.DataFrame:
+    """Strategy input frame (open/high/low/close/volume) for `_fetch_stock_data_columns` output, indexed by timestamp."""
+    df = pd.DataFrame({
+        "open": cols["o"],
+        "high": cols["h"],
+        "low": cols["l"],
+        "close": cols["c"],
+        "volume": cols["v"],
+    }, copy=False)
+    try:
+        df.index = pd.to_datetime(cols["ts"])
+    except Exception:
+        pass
+    return df
+
+
+def _ohlcv_frame(agg: Dict[str, List[Any]]) -> pd.DataFrame:
+    """
+    Build the strategy input frame (open/high/low/close/volume, DatetimeIndex) from /window's
+    aggregated series: the per-column lists `_aggregate_ohlcv_np` produces (`.tolist()`, since the
+    same lists go out in the JSON payload). With NumPy the five columns go in as one float64
+    block, so pandas skips per-column list conversion and dtype inference.
+    """
+    if NUMPY_AVAILABLE:
+        block = np.array([agg["o"], agg["h"], agg["l"], agg["c"], agg["v"]], dtype=np.float64).T
+        index = pd.to_datetime(np.asarray(agg["t_ms"], dtype=np.int64), unit="ms")
+        return pd.DataFrame(block, index=index, columns=["open", "high", "low", "close", "volume"])
+    df = pd.DataFrame({
+        "open": agg["o"],
+        "high": agg["h"],
+        "low": agg["l"],
+        "close": agg["c"],
+        "volume": agg["v"],
+    })
+    df.index = pd.to_datetime(agg["t_ms"], unit="ms")
+    return df
+
+
+def _dataset_bounds(
+    cur: sqlite3.Cursor,
+    key: tuple,
+    sql: str,
+    params: Sequence[Any],
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return (min_ts, max_ts) for a dataset, memoized for `_DATASET_BOUNDS_TTL_S` seconds.
+    `sql` must select exactly (min, max). A (None, None) result means "no rows".
+    """
+    now = time.monotonic()
+    with _DATASET_BOUNDS_LOCK:
+        hit = _DATASET_BOUNDS_CACHE.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1], hit[2]
+    cur.execute(sql, tuple(params))
+    row = cur.fetchone()
+    lo, hi = (row[0], row[1]) if row else (None, None)
+    with _DATASET_BOUNDS_LOCK:
+        _DATASET_BOUNDS_CACHE[key] = (now + _DATASET_BOUNDS_TTL_S, lo, hi)
+    return lo, hi
+
+
+def _real_dataset_bounds(cur: sqlite3.Cursor, ticker: str, interval: str) -> Tuple[Optional[str], Optional[str]]:
+    return _dataset_bounds(
+        cur,
+        ("real", ticker, interval),
+        # Two LIMIT 1 probes at either end of idx_ticker_interval_timestamp: SQLite only
+        # short-circuits a bare MIN()/MAX(), so the pair with a WHERE walks every matching entry.
+        """
+        SELECT
+            (SELECT timestamp FROM stock_data WHERE ticker = ? AND interval = ?
+             ORDER BY timestamp ASC LIMIT 1) AS min_ts,
+            (SELECT timestamp FROM stock_data WHERE ticker = ? AND interval = ?
+             ORDER BY timestamp DESC LIMIT 1) AS max_ts
+        """,
+        (ticker, interval, ticker, interval),
+    )
+
+
+def _cached_listing(name: str, loader: Callable[[], List[Any]]) -> List[Any]:
+    """Return `loader()` memoized for `_LISTING_CACHE_TTL_S` seconds (as a fresh shallow copy)."""
+    now = time.monotonic()
+    with _LISTING_LOCK:
+        hit = _LISTING_CACHE.get(name)
+        if hit is not None:
+            _LISTING_CACHE.move_to_end(name)
+    if hit is not None and hit[0] > now:
+        return list(hit[1])
+    value = loader()
+    with _LISTING_LOCK:
+        _LISTING_CACHE[name] = (now + _LISTING_CACHE_TTL_S, value)
+        _LISTING_CACHE.move_to_end(name)
+        while len(_LISTING_CACHE) > _LISTING_CACHE_MAX:
+            _LISTING_CACHE.popitem(last=False)
+    return list(value)
+
+
+def _cached_chart_tickers() -> List[str]:
+    return _cached_listing("chart_tickers", list_chart_tickers)
+
+
+def _cached_synthetic_datasets() -> List[Dict[str, Any]]:
+    return _cached_listing("synthetic_datasets", get_synthetic_datasets)
+
+
+def _cached_latest_price(ticker: str) -> Optional[float]:
+    """Latest stored 1Min price for `ticker`, memoized with the listings (dropped on ingest)."""
+
+    def load() -> List[Optional[float]]:
+        with db_connection() as conn:
+            # Backward seek on idx_ticker_interval_timestamp; no sort.
+            row = conn.execute(
                 """
-                SELECT timestamp, price, open_price, high_price, low_price, volume
+                SELECT price
                 FROM stock_data
-                WHERE ticker = ? AND interval = ?
-                ORDER BY timestamp ASC
+                WHERE ticker = ? AND interval = '1Min'
+                ORDER BY timestamp DESC
+                LIMIT 1
                 """,
-                (ticker, interval),
-            )
+                (ticker,),
+            ).fetchone()
+        return [float(row[0]) if row and row[0] is not None else None]
+
+    return _cached_listing(f"latest_price:{ticker}", load)[0]
+
+
+def _invalidate_dataset_bounds(symbol: Optional[str] = None) -> None:
+    """
+    Drop cached bounds for `symbol` (case-insensitive), or everything when symbol is None.
+    Cached ticker/dataset listings are always dropped; cached /window responses and ticker
+    indicator series follow `symbol`.
+    """
+    with _DATASET_BOUNDS_LOCK:
+        if symbol is None:
+            _DATASET_BOUNDS_CACHE.clear()
         else:
-            start_sec = str(int(s_ms // 1000))
-            end_sec = str(int(e_ms // 1000))
-            cursor.execute(
-                """
-                SELECT timestamp, price, open_price, high_price, low_price, volume
-                FROM stock_data
-                WHERE ticker = ?
-                  AND interval = ?
-                  AND strftime('%s', timestamp) >= ?
-                  AND strftime('%s', timestamp) <= ?
-                ORDER BY timestamp ASC
-                """,
-                (ticker, interval, start_sec, end_sec),
-            )
-    else:
-        cursor.execute(
-            """
-            SELECT timestamp, price, open_price, high_price, low_price, volume
-            FROM stock_data
-            WHERE ticker = ? AND interval = ?
-            ORDER BY timestamp ASC
-            """,
-            (ticker, interval),
-        )
-    results = cursor.fetchall()
-    out: List[Tuple[str, float, float, float, float, float]] = []
-    for (ts, c, o, h, l, v) in results:
-        out.append(
-            (
-                ts,
-                float(c),
-                float(o) if o is not None else float(c),
-                float(h) if h is not None else float(c),
-                float(l) if l is not None else float(c),
-                float(v) if v is not None else 0.0,
-            )
-        )
-    return out
+            sym = symbol.upper()
+            for key in [k for k in _DATASET_BOUNDS_CACHE if k[1] == sym]:
+                _DATASET_BOUNDS_CACHE.pop(key, None)
+    # A dataset changed, so the ticker/dataset listings may have too.
+    with _LISTING_LOCK:
+        _LISTING_CACHE.clear()
+    with _WINDOW_CACHE_LOCK:
+        if symbol is None:
+            _WINDOW_CACHE.clear()
+        else:
+            for key in [k for k in _WINDOW_CACHE if k[0] == sym]:
+                _WINDOW_CACHE.pop(key, None)
+    with _INDICATOR_CACHE_LOCK:
+        if symbol is None:
+            _INDICATOR_CACHE.clear()
+        else:
+            for key in [k for k in _INDICATOR_CACHE if k[0] == sym]:
+                _INDICATOR_CACHE.pop(key, None)
 
 
 @app.route("/window")
@@ -406,11 +821,43 @@ def api_window():
     """
     Chart contract endpoint (bandchart-style).
     Returns arrays: t_ms,o,h,l,c,v plus dataset_start/dataset_end and served start/end.
+
+    Successful responses are cached for `_WINDOW_CACHE_TTL_S` seconds per query string and
+    carry an ETag, so polling clients get a dict hit (or a 304) instead of a rebuild.
     """
+    symbol = (request.args.get("symbol") or "").strip().upper()
+    key = (symbol, tuple(sorted(request.args.items(multi=True))))
+    now = time.monotonic()
+    with _WINDOW_CACHE_LOCK:
+        hit = _WINDOW_CACHE.get(key)
+        if hit is not None and hit[0] > now:
+            _WINDOW_CACHE.move_to_end(key)
+        else:
+            hit = None
+    if hit is None:
+        resp = app.make_response(_build_window_response())
+        if resp.status_code != 200:
+            return resp
+        body = resp.get_data()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with _WINDOW_CACHE_LOCK:
+            _WINDOW_CACHE[key] = (now + _WINDOW_CACHE_TTL_S, body, etag, resp.mimetype)
+            _WINDOW_CACHE.move_to_end(key)
+            while len(_WINDOW_CACHE) > _WINDOW_CACHE_MAX:
+                _WINDOW_CACHE.popitem(last=False)
+    else:
+        _, body, etag, mimetype = hit
+        resp = app.response_class(body, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.cache_control.max_age = int(_WINDOW_CACHE_TTL_S)
+    return resp.make_conditional(request)
+
+
+def _build_window_response():
+    """Uncached body of /window; see api_window for the response contract."""
     # NOTE:
-    # - For real tickers we normalize to uppercase.
-    # - For synthetic dataset "symbol" we allow mixed-case names, so we keep both the raw and an
-    #   uppercased variant for case-insensitive lookup.
+    # - Symbols are normalized to uppercase (synthetic symbols are stored uppercase too);
+    #   `symbol_raw` is only used for the missing-param check.
     symbol_raw = (request.args.get("symbol") or "").strip()
     symbol = symbol_raw.upper()
     if not symbol_raw:
@@ -442,13 +889,16 @@ def api_window():
     source = (request.args.get("source") or "auto").strip().lower()
     scenario_q = (request.args.get("scenario") or "").strip()
     timeframe_q = (request.args.get("timeframe") or "").strip()
+    # Strategy signals are opt-in (`strategies=1`): building the strategy DataFrame is the most
+    # allocation-heavy part of a /window response and most chart loads never render markers.
+    want_strategies = (request.args.get("strategies") or "").strip().lower() in ("1", "true", "yes", "on")
 
     conn = get_db_connection()
     try:
         cur = conn.cursor()
 
         def respond_empty(dataset_start=None, dataset_end=None):
-            return jsonify(
+            return _json_response(
                 {
                     "symbol": symbol,
                     "bar_s": int(bar_s),
@@ -467,23 +917,17 @@ def api_window():
             )
 
         # Auto-detect whether this symbol is present in real stock_data at 1Min.
-        # If not, fall back to synthetic (bars_synth).
+        # If not, fall back to synthetic (bars_synth). The (cached) bounds lookup doubles as
+        # the existence probe: a non-null MIN means the dataset exists.
+        real_bounds = None
         use_real = True
         if source == "synthetic":
             use_real = False
         elif source == "real":
             use_real = True
         else:
-            cur.execute(
-                """
-                SELECT 1
-                FROM stock_data
-                WHERE ticker = ? AND interval = '1Min'
-                LIMIT 1
-                """,
-                (symbol,),
-            )
-            use_real = cur.fetchone() is not None
+            real_bounds = _real_dataset_bounds(cur, symbol, "1Min")
+            use_real = real_bounds[0] is not None
 
         if not use_real:
             # -------- Synthetic datasets (bars_synth) --------
@@ -496,12 +940,12 @@ def api_window():
                     """
                     SELECT timeframe
                     FROM bars_synth
-                    WHERE UPPER(symbol) = UPPER(?)
+                    WHERE symbol = ?
                       AND scenario = ?
                     ORDER BY ts_start DESC
                     LIMIT 1
                     """,
-                    (symbol_raw, scenario_q),
+                    (symbol, scenario_q),
                 )
                 r = cur.fetchone()
                 timeframe_q = r[0] if r else ""
@@ -511,12 +955,12 @@ def api_window():
                     """
                     SELECT scenario, timeframe, MIN(ts_start) AS ts_min, MAX(ts_start) AS ts_max
                     FROM bars_synth
-                    WHERE UPPER(symbol) = UPPER(?)
+                    WHERE symbol = ?
                     GROUP BY scenario, timeframe
                     ORDER BY ts_max DESC
                     LIMIT 1
                     """,
-                    (symbol_raw,),
+                    (symbol,),
                 )
                 pick = cur.fetchone()
                 if not pick:
@@ -527,24 +971,24 @@ def api_window():
                     timeframe_q = pick[1] or ""
 
             # Map timeframe to base duration.
-            tf_to_s = {"1m": 60, "5m": 300, "15m": 900}
-            base_bar_s = tf_to_s.get(timeframe_q, 60)
+            base_bar_s = SYNTH_TIMEFRAME_SECONDS.get(timeframe_q, 60)
 
             if int(bar_s) < int(base_bar_s):
                 bar_s = int(base_bar_s)
 
             # Dataset bounds
-            cur.execute(
+            row = _dataset_bounds(
+                cur,
+                ("synthetic", symbol, scenario_q, timeframe_q),
                 """
                 SELECT MIN(ts_start) AS min_ts, MAX(ts_start) AS max_ts
                 FROM bars_synth
-                WHERE UPPER(symbol) = UPPER(?)
+                WHERE symbol = ?
                   AND scenario = ?
                   AND timeframe = ?
                 """,
-                (symbol_raw, scenario_q, timeframe_q),
+                (symbol, scenario_q, timeframe_q),
             )
-            row = cur.fetchone()
             if not row or not row[0] or not row[1]:
                 return respond_empty()
 
@@ -575,41 +1019,39 @@ def api_window():
 
             start_sec = int(start_ms // 1000)
             end_sec = int(end_ms // 1000)
+            range_params = (symbol, scenario_q, timeframe_q, start_sec * 1000, end_sec * 1000)
             cur.execute(
                 """
-                SELECT ts_start, open, high, low, close, COALESCE(volume, 0) AS v
+                SELECT ts_ms, open, high, low, close, COALESCE(volume, 0) AS v
                 FROM bars_synth
-                WHERE UPPER(symbol) = UPPER(?)
+                WHERE symbol = ?
                   AND scenario = ?
                   AND timeframe = ?
-                  AND strftime('%s', ts_start) >= ?
-                  AND strftime('%s', ts_start) <= ?
+                  AND ts_ms >= ?
+                  AND ts_ms <= ?
                 ORDER BY ts_start ASC
                 """,
-                (symbol_raw, scenario_q, timeframe_q, str(start_sec), str(end_sec)),
+                range_params,
             )
-            base_rows = cur.fetchall()
-            parsed: List[Tuple[int, float, float, float, float, float]] = []
-            for (ts, o, h, l, c, v) in base_rows:
-                t_ms = _parse_iso_to_epoch_ms(ts)
-                if t_ms is None:
-                    continue
-                parsed.append((t_ms, float(o), float(h), float(l), float(c), float(v or 0.0)))
-
-            agg = _aggregate_ohlcv(parsed, int(bar_s))
+            # ts_ms is INTEGER epoch-ms and the price columns are REAL (volume COALESCEd), so
+            # the fetched tuples feed the aggregator as-is with no per-row re-casting. Synthetic bars
+            # carry no indicators (no EMA warm-up to keep), so only the newest buckets are built;
+            # one extra tells us whether the window was truncated.
+            agg = _aggregate_ohlcv(cur.fetchall(), int(bar_s), limit=eff_max_bars + 1)
             truncated = False
             if len(agg["t_ms"]) > eff_max_bars:
                 truncated = True
                 keep = eff_max_bars
-                for k in ["t_ms", "o", "h", "l", "c", "v"]:
-                    agg[k] = agg[k][-keep:]
+                for k in _OHLCV_KEYS:
+                    # Trim in place rather than allocating a sliced copy of every series.
+                    del agg[k][:-keep]
                 if agg["t_ms"]:
                     start_ms = int(agg["t_ms"][0])
 
             served_start = _epoch_ms_to_iso_z(int(start_ms)) if start_ms is not None else None
             served_end = _epoch_ms_to_iso_z(int(end_ms)) if end_ms is not None else None
 
-            return jsonify(
+            return _json_response(
                 {
                     "symbol": symbol,
                     "bar_s": int(bar_s),
@@ -641,16 +1083,8 @@ def api_window():
         if int(bar_s) < int(base_bar_s):
             bar_s = int(base_bar_s)
 
-        # Find dataset bounds from the base store.
-        cur.execute(
-            """
-            SELECT MIN(timestamp) AS min_ts, MAX(timestamp) AS max_ts
-            FROM stock_data
-            WHERE ticker = ? AND interval = ?
-            """,
-            (symbol, base_interval),
-        )
-        row = cur.fetchone()
+        # Find dataset bounds from the base store (reuses the auto-detect lookup when available).
+        row = real_bounds if real_bounds is not None else _real_dataset_bounds(cur, symbol, base_interval)
         if not row or not row[0] or not row[1]:
             return respond_empty()
 
@@ -694,7 +1128,7 @@ def api_window():
             cur.execute(
                 """
                 SELECT
-                    timestamp,
+                    ts_ms,
                     COALESCE(open_price, price)  AS o,
                     COALESCE(high_price, price)  AS h,
                     COALESCE(low_price, price)   AS l,
@@ -704,18 +1138,18 @@ def api_window():
                 FROM stock_data
                 WHERE ticker = ?
                   AND interval = ?
-                  AND strftime('%s', timestamp) >= ?
-                  AND strftime('%s', timestamp) <= ?
+                  AND ts_ms >= ?
+                  AND ts_ms <= ?
                 ORDER BY timestamp ASC
                 """,
-                (symbol, base_interval, str(start_sec), str(end_sec)),
+                (symbol, base_interval, start_sec * 1000, end_sec * 1000),
             )
         except Exception:
             # Fallback when ema_200 (or other indicator column) does not exist
             cur.execute(
                 """
                 SELECT
-                    timestamp,
+                    ts_ms,
                     COALESCE(open_price, price)  AS o,
                     COALESCE(high_price, price)  AS h,
                     COALESCE(low_price, price)  AS l,
@@ -725,62 +1159,73 @@ def api_window():
                 FROM stock_data
                 WHERE ticker = ?
                   AND interval = ?
-                  AND strftime('%s', timestamp) >= ?
-                  AND strftime('%s', timestamp) <= ?
+                  AND ts_ms >= ?
+                  AND ts_ms <= ?
                 ORDER BY timestamp ASC
                 """,
-                (symbol, base_interval, str(start_sec), str(end_sec)),
+                (symbol, base_interval, start_sec * 1000, end_sec * 1000),
             )
         base_rows = cur.fetchall()
-
-        # Each row is either 11 cols (with ema_200) or 10 cols (without: ema_9, ema_21, ema_50, vwap only)
-        parsed: List[Tuple[int, float, float, float, float, float, Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]]] = []
-        for row in base_rows:
-            ts, o, h, l, c, v = row[0], row[1], row[2], row[3], row[4], row[5]
-            e9 = row[6] if len(row) > 6 else None
-            e21 = row[7] if len(row) > 7 else None
-            e50 = row[8] if len(row) > 8 else None
-            # When 10 cols: row[9] is vwap; when 11 cols: row[9] is ema_200, row[10] is vwap
-            e200 = row[9] if len(row) > 10 else None
-            vw = row[10] if len(row) > 10 else (row[9] if len(row) > 9 else None)
-            t_ms = _parse_iso_to_epoch_ms(ts)
-            if t_ms is None:
-                continue
-            parsed.append((t_ms, float(o), float(h), float(l), float(c), float(v or 0.0), e9, e21, e50, e200, vw))
-
-        # Aggregate to bar_s.
-        # Note: _aggregate_ohlcv currently only handles OHLCV. 
-        # For now, we will handle aggregation of indicators by taking the last value in the bucket.
-        agg = _aggregate_ohlcv([p[:6] for p in parsed], int(bar_s))
+        agg = None
+
+        if agg is None and NUMPY_AVAILABLE:
+            # One float64 matrix for all columns; indicators take the last row of each bucket,
+            # matching the per-row loop below.
+            if base_rows:
+                # 11 cols with ema_200, 10 cols on older DBs without it.
+                ind_cols = _WINDOW_INDICATOR_KEYS if len(base_rows[0]) > 10 else ("ema_9", "ema_21", "ema_50", "vwap")
+                agg = _aggregate_ohlcv_np(base_rows, int(base_rows[0][0]), int(bar_s) * 1000, last_cols=ind_cols)
+                agg.setdefault("ema_200", [None] * len(agg["t_ms"]))
+            else:
+                agg = _aggregate_ohlcv(base_rows, int(bar_s))
+
+        if agg is None:
+            # Each row is either 11 cols (with ema_200) or 10 cols (without: ema_9, ema_21, ema_50, vwap only).
+            # The first column is the stored integer ts_ms, so no per-row ISO parsing is needed.
+            parsed: List[Tuple[int, float, float, float, float, float, Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]]] = []
+            for row in base_rows:
+                t_ms, o, h, l, c, v = row[0], row[1], row[2], row[3], row[4], row[5]
+                e9 = row[6] if len(row) > 6 else None
+                e21 = row[7] if len(row) > 7 else None
+                e50 = row[8] if len(row) > 8 else None
+                # When 10 cols: row[9] is vwap; when 11 cols: row[9] is ema_200, row[10] is vwap
+                e200 = row[9] if len(row) > 10 else None
+                vw = row[10] if len(row) > 10 else (row[9] if len(row) > 9 else None)
+                parsed.append((int(t_ms), float(o), float(h), float(l), float(c), float(v or 0.0), e9, e21, e50, e200, vw))
+
+            # Aggregate to bar_s.
+            # Note: _aggregate_ohlcv currently only handles OHLCV. 
+            # For now, we will handle aggregation of indicators by taking the last value in the bucket.
+            agg = _aggregate_ohlcv([p[:6] for p in parsed], int(bar_s))
         
-        # Aggregate indicators (last value in bucket)
-        if parsed:
-            # We want to ensure agg has the indicator keys even if they are empty
-            for k in ["ema_9", "ema_21", "ema_50", "ema_200", "vwap"]:
-                agg[k] = []
+            # Aggregate indicators (last value in bucket)
+            if parsed:
+                # We want to ensure agg has the indicator keys even if they are empty
+                for k in _WINDOW_INDICATOR_KEYS:
+                    agg[k] = []
             
-            if bar_s > 60:
-                step = int(bar_s) * 1000
-                if agg["t_ms"]:
-                    curr_idx = 0
-                    for target_t in agg["t_ms"]:
-                        last_match = (None, None, None, None, None)
-                        while curr_idx < len(parsed) and parsed[curr_idx][0] < target_t + step:
-                            p = parsed[curr_idx]
-                            # index 6=e9, 7=e21, 8=e50, 9=e200, 10=vw
-                            last_match = (p[6], p[7], p[8], p[9], p[10])
-                            curr_idx += 1
-                        agg["ema_9"].append(last_match[0])
-                        agg["ema_21"].append(last_match[1])
-                        agg["ema_50"].append(last_match[2])
-                        agg["ema_200"].append(last_match[3])
-                        agg["vwap"].append(last_match[4])
-            else:
-                agg["ema_9"] = [p[6] for p in parsed]
-                agg["ema_21"] = [p[7] for p in parsed]
-                agg["ema_50"] = [p[8] for p in parsed]
-                agg["ema_200"] = [p[9] for p in parsed]
-                agg["vwap"] = [p[10] for p in parsed]
+                if bar_s > 60:
+                    step = int(bar_s) * 1000
+                    if agg["t_ms"]:
+                        curr_idx = 0
+                        for target_t in agg["t_ms"]:
+                            last_match = (None, None, None, None, None)
+                            while curr_idx < len(parsed) and parsed[curr_idx][0] < target_t + step:
+                                p = parsed[curr_idx]
+                                # index 6=e9, 7=e21, 8=e50, 9=e200, 10=vw
+                                last_match = (p[6], p[7], p[8], p[9], p[10])
+                                curr_idx += 1
+                            agg["ema_9"].append(last_match[0])
+                            agg["ema_21"].append(last_match[1])
+                            agg["ema_50"].append(last_match[2])
+                            agg["ema_200"].append(last_match[3])
+                            agg["vwap"].append(last_match[4])
+                else:
+                    agg["ema_9"] = [p[6] for p in parsed]
+                    agg["ema_21"] = [p[7] for p in parsed]
+                    agg["ema_50"] = [p[8] for p in parsed]
+                    agg["ema_200"] = [p[9] for p in parsed]
+                    agg["vwap"] = [p[10] for p in parsed]
 
         # Always recalculate EMA 200 from aggregated close prices if we have enough data
         # This ensures accurate EMA 200 even when database has partial NULLs
@@ -803,11 +1248,11 @@ def api_window():
                         FROM stock_data
                         WHERE ticker = ?
                           AND interval = '1Min'
-                          AND strftime('%s', timestamp) < ?
+                          AND ts_ms < ?
                         ORDER BY timestamp DESC
                         LIMIT 30000
                         """,
-                        (symbol, str(start_sec)),
+                        (symbol, start_sec * 1000),
                     )
                     history_rows = cur.fetchall()
                     if history_rows:
@@ -840,43 +1285,35 @@ def api_window():
             truncated = True
             # Keep last max_bars (most relevant for chart) and adjust served start.
             keep = eff_max_bars
-            for k in ["t_ms", "o", "h", "l", "c", "v", "ema_9", "ema_21", "ema_50", "ema_200", "vwap"]:
+            for k in _WINDOW_SERIES_KEYS:
                 if k in agg:
-                    agg[k] = agg[k][-keep:]
+                    # Trim in place rather than allocating a sliced copy of every series.
+                    del agg[k][:-keep]
             if agg["t_ms"]:
                 start_ms = int(agg["t_ms"][0])
 
         served_start = _epoch_ms_to_iso_z(int(start_ms)) if start_ms is not None else None
         served_end = _epoch_ms_to_iso_z(int(end_ms)) if end_ms is not None else None
 
-        # Build strategy signals... (rest of the function)
-
-        # Build strategy signals for the aggregated window.
+        # Build strategy signals for the aggregated window (only when requested).
         # This ensures strategy markers appear when using /window (e.g. chart.html?mode=api).
         strategy_payload = {}
-        try:
-            df_strategy = pd.DataFrame({
-                "open": agg["o"],
-                "high": agg["h"],
-                "low": agg["l"],
-                "close": agg["c"],
-                "volume": agg["v"]
-            })
-            df_strategy.index = pd.to_datetime(agg["t_ms"], unit="ms")
-            
-            # Use the same signal compute functions as get_ticker_data
-            signals_vwap_ema_cross = compute_vwap_ema_crossover_signals(df_strategy, rth_mask=None)
-            if signals_vwap_ema_cross:
-                strategy_payload["vwap_ema_crossover_v1"] = normalize_signals(signals_vwap_ema_cross, df_strategy)
-            
-            signals_fools_paradise = compute_fools_paradise_signals(df_strategy, rth_mask=None)
-            if signals_fools_paradise:
-                strategy_payload["fools_paradise"] = normalize_signals(signals_fools_paradise, df_strategy)
-        except Exception as e:
-            # print(f"Strategy compute in /window failed: {e}")
-            strategy_payload = {}
+        if want_strategies:
+            try:
+                df_strategy = _ohlcv_frame(agg)
+
+                # Same strategies as get_ticker_data; EMA/VWAP pre-processing is shared across them.
+                strategy_payload = compute_signals_batch(
+                    df_strategy,
+                    ("vwap_ema_crossover_v1", "fools_paradise"),
+                    rth_mask=None,
+                    executor=_STRATEGY_POOL,
+                )
+            except Exception as e:
+                # print(f"Strategy compute in /window failed: {e}")
+                strategy_payload = {}
 
-        return jsonify(
+        return _json_response(
             {
                 "symbol": symbol,
                 "bar_s": int(bar_s),
@@ -914,58 +1351,44 @@ def index():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Pre-compute per-ticker date ranges (min/max timestamps) for the dashboard's real symbols.
-    # The dashboard uses 1-minute data as the canonical "real" series (see list_chart_tickers()).
-    per_ticker_range = {}
-    try:
+    # Latest price plus the 1-minute date range for every chart ticker in one statement: the
+    # VALUES list drives correlated subqueries that each seek an index, and the LEFT JOIN keeps
+    # tickers without rows. (A ROW_NUMBER() window or GROUP BY over stock_data would scan every
+    # row instead.) The dashboard uses 1-minute data as the canonical "real" series (see
+    # list_chart_tickers()).
+    tickers_data = []
+    real_tickers = _cached_chart_tickers()
+    latest_rows = []
+    if real_tickers:
+        values_sql = ", ".join("(?)" for _ in real_tickers)
         cursor.execute(
-            """
-            SELECT ticker, MIN(timestamp) AS ts_min, MAX(timestamp) AS ts_max
-            FROM stock_data
-            WHERE interval = '1Min'
-            GROUP BY ticker
-            """
+            f"""
+            WITH t(ticker) AS (VALUES {values_sql})
+            SELECT
+                t.ticker, sd.price, sd.timestamp, sd.interval,
+                (SELECT MIN(timestamp) FROM stock_data WHERE ticker = t.ticker AND interval = '1Min'),
+                (SELECT MAX(timestamp) FROM stock_data WHERE ticker = t.ticker AND interval = '1Min')
+            FROM t
+            LEFT JOIN stock_data sd ON sd.id = (
+                SELECT id
+                FROM stock_data
+                WHERE ticker = t.ticker
+                ORDER BY timestamp DESC
+                LIMIT 1
+            )
+            """,
+            real_tickers,
         )
-        for (t, ts_min, ts_max) in cursor.fetchall():
-            if not t:
-                continue
-            per_ticker_range[str(t).strip().upper()] = (ts_min, ts_max)
-    except Exception:
-        # If anything goes wrong, keep ranges empty and fall back to '-' in the UI.
-        per_ticker_range = {}
-
-    # Get latest price for each ticker
-    tickers_data = []
-    real_tickers = list_chart_tickers()
-    for ticker in real_tickers:
-        cursor.execute('''
-            SELECT ticker, price, timestamp, interval
-            FROM stock_data
-            WHERE ticker = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        ''', (ticker,))
-        
-        result = cursor.fetchone()
-        ts_min, ts_max = per_ticker_range.get(str(ticker).strip().upper(), (None, None))
-        if result:
-            tickers_data.append({
-                'ticker': result[0],
-                'price': result[1],
-                'timestamp': result[2],
-                'interval': result[3],
-                'range_start': ts_min,
-                'range_end': ts_max,
-            })
-        else:
-            tickers_data.append({
-                'ticker': ticker,
-                'price': None,
-                'timestamp': None,
-                'interval': None,
-                'range_start': ts_min,
-                'range_end': ts_max,
-            })
+        latest_rows = cursor.fetchall()
+    for (ticker, price, ts, interval, ts_min, ts_max) in latest_rows:
+        tickers_data.append({
+            'ticker': ticker,
+            'price': price,
+            'timestamp': ts,
+            'interval': interval,
+            'range_start': ts_min,
+            'range_end': ts_max,
+        })
     
     # Get date range of imported data
     cursor.execute('''
@@ -1001,7 +1424,7 @@ def index():
 @app.route("/api/symbols")
 def api_symbols():
     """List real symbols available in the SQLite DB (matches dashboard 'Real Symbols')."""
-    syms = list_chart_tickers()
+    syms = _cached_chart_tickers()
     # chart.html expects items shaped like {dataset,symbol}; we set dataset=symbol
     # so the single dropdown can show the symbols directly.
     return jsonify([{"dataset": s, "symbol": s} for s in syms])
@@ -1009,14 +1432,14 @@ def api_symbols():
 @app.route("/api/synthetic_datasets")
 def api_synthetic_datasets():
     """List available synthetic datasets (symbol/scenario/timeframe groups)."""
-    datasets = get_synthetic_datasets()
+    datasets = _cached_synthetic_datasets()
     return jsonify(datasets)
 
 
 @app.route("/api/synthetic_dataset", methods=["DELETE"])
 def api_synthetic_dataset_delete():
     """Delete an entire synthetic dataset group (symbol + scenario + timeframe)."""
-    symbol = (request.args.get("symbol") or "").strip()
+    symbol = (request.args.get("symbol") or "").strip().upper()
     scenario = (request.args.get("scenario") or "").strip()
     timeframe = (request.args.get("timeframe") or "").strip()
 
@@ -1042,7 +1465,7 @@ def api_synthetic_dataset_delete():
             """
             DELETE FROM bars
             WHERE data_source = 'synthetic'
-              AND UPPER(symbol) = UPPER(?)
+              AND symbol = ?
               AND scenario = ?
               AND timeframe = ?
             """,
@@ -1052,10 +1475,54 @@ def api_synthetic_dataset_delete():
         conn.commit()
     finally:
         conn.close()
+    _invalidate_dataset_bounds(symbol)
 
     return jsonify({"ok": True, "deleted_bars": int(deleted), "symbol": symbol, "scenario": scenario, "timeframe": timeframe})
 
 
+@functools.lru_cache(maxsize=None)
+def _synth_param_spec(generator_name: str) -> Optional[Tuple[Any, Tuple[str, ...]]]:
+    """
+    (DEFAULT_PARAMS, whitelisted `params` keys) for generators configured through a params
+    dataclass, or None for legacy generators. Resolved (and checked against the dataclass
+    fields) once per generator.
+    """
+    spec = SYNTH_PARAM_GENERATORS.get(generator_name)
+    if spec is None:
+        return None
+    module_name, keys = spec
+    defaults = importlib.import_module(module_name).DEFAULT_PARAMS
+    unknown = set(keys) - {f.name for f in dataclasses.fields(defaults)}
+    if unknown:
+        raise RuntimeError(f"{generator_name} params has no fields {sorted(unknown)}")
+    return defaults, keys
+
+
+def _synth_params_from_body(params_in: Dict[str, Any], defaults: Any, keys: Sequence[str]) -> Any:
+    """
+    Return `defaults` (a trend-regime params dataclass) with the whitelisted numeric overrides
+    from a /api/synthetic_generate `params` object applied.
+    Raises ValueError(message, key) when a supplied value is not a number.
+    """
+    def num(key: str, default: float) -> float:
+        if key not in params_in:
+            return default
+        try:
+            return float(params_in[key])
+        except (TypeError, ValueError):
+            raise ValueError(f"params.{key} must be a number", key) from None
+
+    regimes = {}
+    for name in ("UP", "DOWN", "CHOP"):
+        prefix = name.lower()
+        regimes[name] = {
+            "drift": num(f"{prefix}_drift", defaults.regimes[name]["drift"]),
+            "vol": num(f"{prefix}_vol", defaults.regimes[name]["vol"]),
+        }
+    overrides = {key: num(key, getattr(defaults, key)) for key in keys}
+    return dataclasses.replace(defaults, regimes=regimes, **overrides)
+
+
 @app.route("/api/synthetic_generate", methods=["POST"])
 def api_synthetic_generate():
     """
@@ -1067,7 +1534,7 @@ def api_synthetic_generate():
     """
     body = request.get_json(silent=True) or {}
 
-    dataset_name = str(body.get("dataset_name") or "").strip()
+    dataset_name = str(body.get("dataset_name") or "").strip().upper()
     if not dataset_name:
         return _bad_request("missing_params", "dataset_name is required", fields=["dataset_name"])
 
@@ -1116,24 +1583,7 @@ def api_synthetic_generate():
     if start_price is None or str(start_price).strip() == "":
         # Convenience: if user picked a ref_symbol, default to its latest stored price.
         if ref_symbol:
-            conn = get_db_connection()
-            try:
-                cur = conn.cursor()
-                cur.execute(
-                    """
-                    SELECT price
-                    FROM stock_data
-                    WHERE ticker = ? AND interval = '1Min'
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                    """,
-                    (ref_symbol,),
-                )
-                row = cur.fetchone()
-            finally:
-                conn.close()
-            if row and row[0] is not None:
-                start_price = float(row[0])
+            start_price = _cached_latest_price(ref_symbol)
         if start_price is None:
             start_price = 100.0
     try:
@@ -1149,278 +1599,216 @@ def api_synthetic_generate():
         return _bad_request("invalid_params", "params must be an object if provided")
 
     # Generate (v2 supports market hours, gaps, diurnal volume).
-    try:
-        if generator_name in ("trend_regime_v2", "trend_regime_v3"):
-            from dataclasses import replace
-            if generator_name == "trend_regime_v2":
-                from synthetic_generators.trend_regime_v2 import DEFAULT_PARAMS as D, TrendRegimeV2Params
-
-                regimes = {
-                    "UP": {"drift": float(params_in.get("up_drift", D.regimes["UP"]["drift"])), "vol": float(params_in.get("up_vol", D.regimes["UP"]["vol"]))},
-                    "DOWN": {"drift": float(params_in.get("down_drift", D.regimes["DOWN"]["drift"])), "vol": float(params_in.get("down_vol", D.regimes["DOWN"]["vol"]))},
-                    "CHOP": {"drift": float(params_in.get("chop_drift", D.regimes["CHOP"]["drift"])), "vol": float(params_in.get("chop_vol", D.regimes["CHOP"]["vol"]))},
-                }
-
-                p: TrendRegimeV2Params = replace(
-                    D,
-                    regimes=regimes,
-                    stay_prob=float(params_in.get("stay_prob", D.stay_prob)),
-                    overnight_gap_sigma=float(params_in.get("overnight_gap_sigma", D.overnight_gap_sigma)),
-                    overnight_gap_mu=float(params_in.get("overnight_gap_mu", D.overnight_gap_mu)),
-                    diurnal_volume_strength=float(params_in.get("diurnal_volume_strength", D.diurnal_volume_strength)),
-                    diurnal_vol_strength=float(params_in.get("diurnal_vol_strength", D.diurnal_vol_strength)),
-                    base_volume=float(params_in.get("base_volume", D.base_volume)),
-                    base_spread=float(params_in.get("base_spread", D.base_spread)),
-                    spread_diurnal_strength=float(params_in.get("spread_diurnal_strength", D.spread_diurnal_strength)),
-                    depth_scale=float(params_in.get("depth_scale", D.depth_scale)),
-                )
-
-                bars, l2 = gen(
-                    dataset_name=dataset_name,
-                    ref_symbol=ref_symbol,
-                    start_price=start_price_f,
-                    n_trading_days=trading_days,
-                    timeframe=timeframe,
-                    scenario=generator_name,
-                    start_date_local=start_date_local,
-                    seed=seed,
-                    params=p,
-                )
-            else:
-                from synthetic_generators.trend_regime_v3 import DEFAULT_PARAMS as D, TrendRegimeV3Params
-
-                regimes = {
-                    "UP": {"drift": float(params_in.get("up_drift", D.regimes["UP"]["drift"])), "vol": float(params_in.get("up_vol", D.regimes["UP"]["vol"]))},
-                    "DOWN": {"drift": float(params_in.get("down_drift", D.regimes["DOWN"]["drift"])), "vol": float(params_in.get("down_vol", D.regimes["DOWN"]["vol"]))},
-                    "CHOP": {"drift": float(params_in.get("chop_drift", D.regimes["CHOP"]["drift"])), "vol": float(params_in.get("chop_vol", D.regimes["CHOP"]["vol"]))},
-                }
-
-                p: TrendRegimeV3Params = replace(
-                    D,
-                    regimes=regimes,
-                    stay_prob=float(params_in.get("stay_prob", D.stay_prob)),
-                    overnight_gap_sigma=float(params_in.get("overnight_gap_sigma", D.overnight_gap_sigma)),
-                    overnight_gap_mu=float(params_in.get("overnight_gap_mu", D.overnight_gap_mu)),
-                    diurnal_volume_strength=float(params_in.get("diurnal_volume_strength", D.diurnal_volume_strength)),
-                    diurnal_vol_strength=float(params_in.get("diurnal_vol_strength", D.diurnal_vol_strength)),
-                    base_volume=float(params_in.get("base_volume", D.base_volume)),
-                    base_spread=float(params_in.get("base_spread", D.base_spread)),
-                    spread_diurnal_strength=float(params_in.get("spread_diurnal_strength", D.spread_diurnal_strength)),
-                    depth_scale=float(params_in.get("depth_scale", D.depth_scale)),
-                    daily_vol_sigma=float(params_in.get("daily_vol_sigma", D.daily_vol_sigma)),
-                    daily_vol_rho=float(params_in.get("daily_vol_rho", D.daily_vol_rho)),
-                    daily_vol_mu=float(params_in.get("daily_vol_mu", D.daily_vol_mu)),
-                    event_prob=float(params_in.get("event_prob", D.event_prob)),
-                    event_sigma=float(params_in.get("event_sigma", D.event_sigma)),
-                    vol_ret_coupling=float(params_in.get("vol_ret_coupling", D.vol_ret_coupling)),
-                )
-
-                bars, l2 = gen(
-                    dataset_name=dataset_name,
-                    ref_symbol=ref_symbol,
-                    start_price=start_price_f,
-                    n_trading_days=trading_days,
-                    timeframe=timeframe,
-                    scenario=generator_name,
-                    start_date_local=start_date_local,
-                    seed=seed,
-                    params=p,
-                )
-        else:
-            # Legacy generators: best-effort mapping.
-            # NOTE: these do not implement market-hours/overnight-gap semantics.
+    param_spec = _synth_param_spec(generator_name)
+    if param_spec is not None:
+        D, param_keys = param_spec
+        try:
+            p = _synth_params_from_body(params_in, D, param_keys)
+        except ValueError as e:
+            return _bad_request("invalid_params", e.args[0], field=e.args[1])
+
+        gen_kwargs = dict(
+            dataset_name=dataset_name,
+            ref_symbol=ref_symbol,
+            start_price=start_price_f,
+            n_trading_days=trading_days,
+            timeframe=timeframe,
+            scenario=generator_name,
+            start_date_local=start_date_local,
+            seed=seed,
+            params=p,
+        )
+    else:
+        # Legacy generators: best-effort mapping.
+        # NOTE: these do not implement market-hours/overnight-gap semantics.
+        try:
             n_bars = int(body.get("n_bars") or 500)
-            n_bars = max(1, min(200_000, n_bars))
-            bars, l2 = gen(
-                symbol=dataset_name,
-                start_price=start_price_f,
-                n_bars=n_bars,
-                timeframe=timeframe,
-                duration_sec={"1m": 60, "5m": 300, "15m": 900}[timeframe],
-                scenario=generator_name,
-                seed=seed,
-            )
-    except Exception as e:
-        return _bad_request("generation_failed", str(e))
-
-    try:
-        write_synthetic_series_to_db(bars, l2)
-    except Exception as e:
-        # Most common: unique constraint violation when reusing the same name/timeframe/timestamps.
-        return _bad_request("persist_failed", str(e))
+        except Exception as e:
+            return _bad_request("generation_failed", str(e))
+        n_bars = max(1, min(200_000, n_bars))
+        gen_kwargs = dict(
+            symbol=dataset_name,
+            start_price=start_price_f,
+            n_bars=n_bars,
+            timeframe=timeframe,
+            duration_sec=SYNTH_TIMEFRAME_SECONDS[timeframe],
+            scenario=generator_name,
+            seed=seed,
+        )
 
     # Return the dataset group info (what the dashboard expects).
-    ts_start_min = bars[0].ts_start.isoformat().replace("+00:00", "Z") if bars else None
-    ts_start_max = bars[-1].ts_start.isoformat().replace("+00:00", "Z") if bars else None
-    return jsonify(
-        {
-            "ok": True,
-            "symbol": dataset_name,
-            "scenario": generator_name,
-            "timeframe": timeframe,
-            "ref_symbol": ref_symbol,
-            "bar_count": len(bars),
-            "ts_start_min": ts_start_min,
-            "ts_start_max": ts_start_max,
-        }
-    )
-
+    info = {
+        "symbol": dataset_name,
+        "scenario": generator_name,
+        "timeframe": timeframe,
+        "ref_symbol": ref_symbol,
+    }
 
-@app.route("/api/synthetic_bars")
-def api_synthetic_bars():
-    """Fetch synthetic OHLCV bars with validation, optional time bounds, and limits."""
-    symbol = request.args.get("symbol")
-    scenario = request.args.get("scenario")
-    timeframe = request.args.get("timeframe", "1m")
+    if body.get("async"):
+        job_id = uuid.uuid4().hex
+        fut = _synth_gen_pool().submit(generate_and_store, generator_name, gen_kwargs, database.DB_NAME)
+        fut.add_done_callback(lambda _f: _invalidate_dataset_bounds(dataset_name))
+        with _SYNTH_JOBS_LOCK:
+            _SYNTH_JOBS[job_id] = (info, fut)
+            for old_id in [k for k, (_, f) in _SYNTH_JOBS.items() if f.done()]:
+                if len(_SYNTH_JOBS) <= _SYNTH_JOBS_MAX:
+                    break
+                del _SYNTH_JOBS[old_id]
+        return jsonify({"ok": True, "job_id": job_id, "status": "pending", **info}), 202
+
+    summary, err = generate_and_store(generator_name, gen_kwargs)
+    if err is not None:
+        return _bad_request(*err)
+    _invalidate_dataset_bounds(dataset_name)
+    return jsonify({"ok": True, **info, **summary})
+
+
+def _synth_gen_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for background synthetic generation (spawned workers, created lazily). Workers
+    re-import this module's dependencies but never call init_database(); their only database
+    access is generate_and_store's own connection to the parent's DB_NAME.
+    """
+    global _SYNTH_GEN_POOL
+    with _SYNTH_GEN_POOL_LOCK:
+        if _SYNTH_GEN_POOL is None:
+            # spawn, not fork: this process already runs server and strategy threads.
+            _SYNTH_GEN_POOL = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _SYNTH_GEN_POOL
+
+
+@app.route("/api/synthetic_generate/status/<job_id>")
+def api_synthetic_generate_status(job_id: str):
+    """Poll a background synthetic generation job started with `"async": true`."""
+    with _SYNTH_JOBS_LOCK:
+        job = _SYNTH_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": {"code": "unknown_job", "message": "unknown job_id", "job_id": job_id}}), 404
+    info, fut = job
+    if not fut.done():
+        status = "running" if fut.running() else "pending"
+        return jsonify({"ok": True, "job_id": job_id, "status": status, **info})
+    exc = fut.exception()
+    summary, err = (None, ("generation_failed", str(exc))) if exc is not None else fut.result()
+    if err is not None:
+        code, message = err
+        return jsonify({"ok": False, "job_id": job_id, "status": "failed", "error": {"code": code, "message": message}, **info})
+    return jsonify({"ok": True, "job_id": job_id, "status": "done", **info, **summary})
+
+
+def _synthetic_group_args() -> Tuple[Optional[Tuple[str, str, str]], Any]:
+    """
+    Validate the symbol/scenario/timeframe query args shared by the synthetic GET endpoints.
+    Returns ((SYMBOL, scenario, timeframe), None) or (None, error_response).
+    """
+    args = request.args
+    symbol = (args.get("symbol") or "").strip().upper()
+    scenario = args.get("scenario")
+    timeframe = args.get("timeframe", "1m")
 
     if not symbol or not scenario:
-        return _bad_request("missing_params", "symbol and scenario are required")
-
+        return None, _bad_request(
+            "missing_params",
+            "symbol and scenario are required",
+            fields=["symbol", "scenario"],
+        )
     if timeframe not in VALID_SYNTH_TIMEFRAMES:
-        return _bad_request(
+        return None, _bad_request(
             "invalid_timeframe",
             "timeframe is not allowed",
             allowed=sorted(VALID_SYNTH_TIMEFRAMES),
         )
+    return (symbol, scenario, timeframe), None
+
+
+@app.route("/api/synthetic_bars")
+def api_synthetic_bars():
+    """Fetch synthetic OHLCV bars with validation, optional time bounds, and limits."""
+    group, err = _synthetic_group_args()
+    if err is not None:
+        return err
+    symbol, scenario, timeframe = group
 
     start_raw = request.args.get("start_ts")
     end_raw = request.args.get("end_ts")
     limit = request.args.get("limit", type=int) or SYNTH_DEFAULT_LIMIT
     limit = max(1, min(SYNTH_MAX_LIMIT, limit))
 
-    start_ts = _parse_iso_ts(start_raw) if start_raw else None
-    end_ts = _parse_iso_ts(end_raw) if end_raw else None
+    # Bounds are parsed once to epoch ms and compared against the indexed integer `ts_ms`
+    # (the stored ISO text uses "+00:00", so comparing it to a "Z" string is off at the edges).
+    start_ms = _parse_iso_to_epoch_ms(start_raw) if start_raw else None
+    end_ms = _parse_iso_to_epoch_ms(end_raw) if end_raw else None
 
-    if start_raw and not start_ts:
+    if start_raw and start_ms is None:
         return _bad_request("invalid_start_ts", "start_ts must be ISO-8601 (e.g. 2025-01-01T09:30:00Z)")
-    if end_raw and not end_ts:
+    if end_raw and end_ms is None:
         return _bad_request("invalid_end_ts", "end_ts must be ISO-8601 (e.g. 2025-01-01T16:00:00Z)")
-    if start_ts and end_ts and start_ts > end_ts:
+    if start_ms is not None and end_ms is not None and start_ms > end_ms:
         return _bad_request("invalid_range", "start_ts must be <= end_ts")
 
-    where_clauses = [
-        "symbol = ?",
-        "scenario = ?",
-        "timeframe = ?",
-    ]
-    params = [symbol, scenario, timeframe]
-
-    if start_ts:
-        where_clauses.append("ts_start >= ?")
-        params.append(start_ts)
-    if end_ts:
-        where_clauses.append("ts_start <= ?")
-        params.append(end_ts)
-
-    where_sql = " AND ".join(where_clauses)
-
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            f"""
-            SELECT ts_start, open, high, low, close, volume
-            FROM bars_synth
-            WHERE {where_sql}
-            ORDER BY ts_start ASC
-            LIMIT ?
-            """,
-            (*params, limit),
-        )
-        rows = cur.fetchall()
-    finally:
-        conn.close()
+    sql = _SYNTH_BARS_SQL[(start_ms is not None, end_ms is not None)]
+    sql_params = (
+        symbol,
+        scenario,
+        timeframe,
+        *((start_ms,) if start_ms is not None else ()),
+        *((end_ms,) if end_ms is not None else ()),
+        limit,
+    )
 
-    bars = [
-        {
-            "ts_start": ts,
-            "open": o,
-            "high": h,
-            "low": l,
-            "close": c,
-            "volume": v,
-        }
-        for (ts, o, h, l, c, v) in rows
-    ]
-    return jsonify(bars)
+    def generate():
+        # Encode the JSON array batch by batch straight from the cursor instead of holding
+        # every row and its dict in memory before serializing.
+        with db_connection() as conn:
+            cur = conn.execute(sql, sql_params)
+            yield b"["
+            sep = b""
+            while True:
+                rows = cur.fetchmany(SYNTH_STREAM_BATCH)
+                if not rows:
+                    break
+                # Literal dicts over unpacked rows build ~2.5x faster than dict(zip(keys, row)).
+                chunk = _json_bytes([
+                    {"ts_start": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+                    for ts, o, h, l, c, v in rows
+                ])
+                yield sep + chunk[1:-1]
+                sep = b","
+            yield b"]"
+
+    return app.response_class(stream_with_context(generate()), mimetype="application/json")
 
 
 @app.route("/api/synthetic_l2")
 def api_synthetic_l2():
     """Depth imbalance + related L2 fields aligned to synthetic bars."""
-    symbol = request.args.get("symbol")
-    scenario = request.args.get("scenario")
-    timeframe = request.args.get("timeframe", "1m")
+    group, err = _synthetic_group_args()
+    if err is not None:
+        return err
+    symbol, scenario, timeframe = group
 
-    if not symbol or not scenario:
-        return _bad_request(
-            "missing_params",
-            "symbol and scenario are required",
-            fields=["symbol", "scenario"],
-        )
+    with db_connection() as conn:
+        rows = conn.execute(_SYNTH_L2_SQL, (symbol, scenario, timeframe)).fetchall()
 
-    if timeframe not in VALID_SYNTH_TIMEFRAMES:
-        return _bad_request(
-            "invalid_timeframe",
-            "timeframe is not allowed",
-            allowed=sorted(VALID_SYNTH_TIMEFRAMES),
-        )
+    return _json_response([
+        {"ts_start": ts, "dbi": dbi, "ofi": ofi, "spr": spr, "microprice": mp}
+        for ts, dbi, ofi, spr, mp in rows
+    ])
 
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT
-                b.ts_start,
-                l.dbi,
-                l.ofi,
-                l.spr,
-                l.microprice
-            FROM bars_synth b
-            LEFT JOIN l2_state l
-                ON l.bar_id = b.id
-            WHERE b.symbol = ?
-              AND b.scenario = ?
-              AND b.timeframe = ?
-            ORDER BY b.ts_start ASC
-            """,
-            (symbol, scenario, timeframe),
-        )
-        rows = cur.fetchall()
-    finally:
-        conn.close()
 
-    data = [
-        {
-            "ts_start": ts,
-            "dbi": dbi,
-            "ofi": ofi,
-            "spr": spr,
-            "microprice": microprice,
-        }
-        for (ts, dbi, ofi, spr, microprice) in rows
-    ]
-
-    return jsonify(data)
+_TIMEFRAME_TO_INTERVAL = {"1m": "1Min", "5m": "5Min", "15m": "15Min"}
+_INTERVAL_TO_TIMEFRAME = {v: k for k, v in _TIMEFRAME_TO_INTERVAL.items()}
 
 
 def _interval_from_timeframe(timeframe: str) -> str:
-    mapping = {
-        "1m": "1Min",
-        "5m": "5Min",
-        "15m": "15Min",
-    }
-    return mapping.get(timeframe, timeframe)
+    return _TIMEFRAME_TO_INTERVAL.get(timeframe, timeframe)
 
 
 def _timeframe_from_interval(interval: str) -> str:
-    mapping = {
-        "1Min": "1m",
-        "5Min": "5m",
-        "15Min": "15m",
-    }
-    return mapping.get(interval, interval.lower())
+    return _INTERVAL_TO_TIMEFRAME.get(interval, interval.lower())
 
 
 @app.route("/synthetic/<symbol>")
@@ -1450,6 +1838,37 @@ def synthetic_detail(symbol: str):
     )
 
 
+def _chart_file() -> Dict[str, Any]:
+    """Current chart.html entry of _CHART_FILE_CACHE; raises OSError if the file is missing."""
+    global _CHART_FILE_CACHE
+    cached = _CHART_FILE_CACHE
+    now = time.monotonic()
+    if cached["body"] is not None and now < cached["expires"]:
+        return cached
+    st = os.stat("chart.html")
+    if st.st_mtime_ns != cached["mtime_ns"] or cached["body"] is None:
+        with open("chart.html", "rb") as f:
+            body = f.read()
+        cached = {
+            "mtime_ns": st.st_mtime_ns,
+            "body": body,
+            "etag": hashlib.blake2b(body, digest_size=8).hexdigest(),
+        }
+    else:
+        cached = dict(cached)
+    cached["expires"] = now + _CHART_FILE_TTL_S
+    _CHART_FILE_CACHE = cached
+    return cached
+
+
+def _chart_cache_bust() -> str:
+    """chart.html mtime (epoch seconds) as a string, for the ?v= cache-buster."""
+    try:
+        return str(_chart_file()["mtime_ns"] // 1_000_000_000)
+    except OSError:
+        return str(int(time.time()))
+
+
 @app.route('/ticker/<ticker>')
 def ticker_detail(ticker):
     """Detail view for a specific ticker."""
@@ -1460,20 +1879,13 @@ def ticker_detail(ticker):
         # necessary and made debugging/caching confusing. Redirect directly to the demo page.
         #
         # Preserve any relevant query params (bar_s/span/etc), but force API mode and symbol.
-        try:
-            cache_bust = int(os.path.getmtime("chart.html"))
-        except Exception:
-            cache_bust = int(time.time())
-
-        params = dict(request.args)
+        params = request.args.to_dict(flat=True)
         params.pop("band", None)
         params["mode"] = "api"
         params["symbol"] = ticker
-        params["v"] = str(cache_bust)
+        params["v"] = _chart_cache_bust()
 
         # Rebuild query string without importing url_for (keep it simple).
-        from urllib.parse import urlencode
-
         return redirect("/chart.html?" + urlencode(params), code=302)
     interval = request.args.get('interval', '1Min')
     return render_template(
@@ -1489,21 +1901,23 @@ def ticker_detail(ticker):
 @app.route("/chart.html")
 def chart_page():
     """Serve the standalone band/candle canvas demo (also used by /ticker/<sym>?band)."""
-    resp = send_file("chart.html", mimetype="text/html", max_age=0)
-    # Avoid sticky caching in Chrome during rapid iteration.
-    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    resp.headers["Pragma"] = "no-cache"
-    resp.headers["Expires"] = "0"
-    return resp
+    try:
+        chart = _chart_file()
+    except OSError:
+        abort(404)
+    resp = app.response_class(chart["body"], mimetype="text/html")
+    # Avoid sticky caching in Chrome during rapid iteration: the browser must revalidate every
+    # load, but an unchanged file comes back as a bodyless 304 via the ETag.
+    resp.set_etag(chart["etag"])
+    resp.headers["Cache-Control"] = "no-cache, must-revalidate, max-age=0"
+    return resp.make_conditional(request)
 
 
 @app.route("/demo_static.html")
 def demo_static_page():
     """Back-compat: redirect old demo_static.html URL to /chart.html (preserve query string)."""
     try:
-        from urllib.parse import urlencode
-
-        qs = urlencode(dict(request.args)) if request.args else ""
+        qs = urlencode(request.args.to_dict(flat=True)) if request.args else ""
         return redirect("/chart.html" + (("?" + qs) if qs else ""), code=302)
     except Exception:
         return redirect("/chart.html", code=302)
@@ -1521,62 +1935,74 @@ def backtest_config():
         default_ticker='SPY'
     )
 
-@app.route('/api/strategies', methods=['GET'])
-def list_strategies():
-    """Return strategy metadata (name, display_name, description, enabled, indicators)."""
-    defaults = {
-        'vwap_ema_crossover_v1': {
-            'display_name': 'VWAP / EMA Crossover (v1)',
-            'description': 'Entry on sign change of (VWAP - EMA21). Bullish when VWAP < EMA21, bearish otherwise.',
-            'indicators': 'vwap,ema21'
-        },
-        'fools_paradise': {
-            'display_name': 'Fools Paradise',
-            'description': 'EMA9/21/50 alignment + VWAP bias; enter on first candle in trend. Emits exits for visualization.',
-            'indicators': 'vwap,ema9,ema21,ema50'
-        }
+_STRATEGY_META_DEFAULTS = {
+    'vwap_ema_crossover_v1': {
+        'display_name': 'VWAP / EMA Crossover (v1)',
+        'description': 'Entry on sign change of (VWAP - EMA21). Bullish when VWAP < EMA21, bearish otherwise.',
+        'indicators': 'vwap,ema21'
+    },
+    'fools_paradise': {
+        'display_name': 'Fools Paradise',
+        'description': 'EMA9/21/50 alignment + VWAP bias; enter on first candle in trend. Emits exits for visualization.',
+        'indicators': 'vwap,ema9,ema21,ema50'
     }
+}
 
-    reg_names = sorted(list(STRATEGY_REGISTRY.keys()))
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT name, display_name, description, enabled, indicators FROM strategies_meta")
-    rows = {r[0]: {'display_name': r[1], 'description': r[2], 'enabled': int(r[3]) if r[3] is not None else 1, 'indicators': r[4]} for r in cur.fetchall()}
+# (registry names, encoded /api/strategies body); None until built, reset on meta/registry edits.
+_STRATEGIES_JSON_CACHE: Optional[Tuple[Tuple[str, ...], bytes]] = None
 
-    out = []
+
+def _invalidate_strategies_cache() -> None:
+    global _STRATEGIES_JSON_CACHE
+    _STRATEGIES_JSON_CACHE = None
+
+
+def _sync_strategies_meta(conn, reg_names: Sequence[str]) -> None:
+    """Insert default strategies_meta rows for registered strategies that have none (one commit)."""
     for name in reg_names:
-        meta = rows.get(name)
-        dflt = defaults.get(name, {})
-        
-        if not meta:
-            display_name = dflt.get('display_name', name)
-            description = dflt.get('description', '')
-            indicators = dflt.get('indicators', '')
-            cur.execute(
-                """
-                INSERT OR IGNORE INTO strategies_meta (name, display_name, description, enabled, indicators)
-                VALUES (?, ?, ?, 1, ?)
-                """,
-                (name, display_name, description, indicators)
-            )
-            meta = {'display_name': display_name, 'description': description, 'enabled': 1, 'indicators': indicators}
-        elif not meta.get('indicators') and dflt.get('indicators'):
+        dflt = _STRATEGY_META_DEFAULTS.get(name, {})
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO strategies_meta (name, display_name, description, enabled, indicators)
+            VALUES (?, ?, ?, 1, ?)
+            """,
+            (name, dflt.get('display_name', name), dflt.get('description', ''), dflt.get('indicators', ''))
+        )
+        if dflt.get('indicators'):
             # Migration: if indicators are empty but we have a hardcoded default, fill it in.
-            indicators = dflt.get('indicators')
-            cur.execute("UPDATE strategies_meta SET indicators = ? WHERE name = ?", (indicators, name))
-            meta['indicators'] = indicators
-
-        out.append({
-            'name': name,
-            'display_name': meta.get('display_name') or name,
-            'description': meta.get('description') or '',
-            'enabled': bool(meta.get('enabled', 1)),
-            'indicators': meta.get('indicators') or ''
-        })
-
+            conn.execute(
+                "UPDATE strategies_meta SET indicators = ? WHERE name = ? AND (indicators IS NULL OR indicators = '')",
+                (dflt['indicators'], name)
+            )
     conn.commit()
-    conn.close()
-    return jsonify(out)
+
+
+@app.route('/api/strategies', methods=['GET'])
+def list_strategies():
+    """Return strategy metadata (name, display_name, description, enabled, indicators)."""
+    global _STRATEGIES_JSON_CACHE
+    reg_names = tuple(sorted(STRATEGY_REGISTRY.keys()))
+    cached = _STRATEGIES_JSON_CACHE
+    if cached is None or cached[0] != reg_names:
+        with db_connection() as conn:
+            _sync_strategies_meta(conn, reg_names)
+            rows = {
+                r[0]: r[1:]
+                for r in conn.execute("SELECT name, display_name, description, enabled, indicators FROM strategies_meta")
+            }
+        out = []
+        for name in reg_names:
+            display_name, description, enabled, indicators = rows.get(name, (None, None, None, None))
+            out.append({
+                'name': name,
+                'display_name': display_name or name,
+                'description': description or '',
+                'enabled': bool(int(enabled) if enabled is not None else 1),
+                'indicators': indicators or ''
+            })
+        cached = (reg_names, _json_bytes(out))
+        _STRATEGIES_JSON_CACHE = cached
+    return app.response_class(cached[1], mimetype="application/json")
 
 @app.route('/api/strategy/<name>/code', methods=['GET', 'POST'])
 def strategy_code(name):
@@ -1618,7 +2044,7 @@ def create_strategy():
     - creates strategies/<name>.py
     - inserts/updates strategies_meta
     - dynamically imports and registers in STRATEGY_REGISTRY (available immediately)
-    - patches strategies/__init__.py for persistence across restarts
+    - records it in strategies/_registry.json for persistence across restarts
     """
     payload = request.get_json(silent=True) or {}
     name = (payload.get('name') or '').strip()
@@ -1641,46 +2067,16 @@ def create_strategy():
 
     compute_fn_name = f"compute_{name}_signals"
 
-    template = f"""\"\"\"{display_name}
-
-{description or 'TODO: Describe this strategy.'}
-
-Strategy contract:
-- Input: pandas.DataFrame with index timestamps and columns: open, high, low, close, volume
-- Output: dict of same-length arrays. Minimum required by engine/UI:
-  - long_entry: list[bool]
-  - direction: list['bullish'|'bearish'|None]
-Optional UI fields:
-  - cross_y (entry marker y), exit_y, long_exit, exit_direction
-\"\"\"
-
-import pandas as pd
-
-
-def {compute_fn_name}(df_prices, rth_mask=None):
-    \"\"\"Skeleton strategy: no entries by default.\"\"\"
-    if df_prices is None or getattr(df_prices, 'empty', False):
-        return {{}}
-
-    df = df_prices.copy()
-    df.index = pd.to_datetime(df.index)
-
-    n = len(df)
-    # TODO: replace with real logic
-    long_entry = [False] * n
-    direction = [None] * n
-
-    return {{
-        'long_entry': long_entry,
-        'direction': direction,
-        'timestamp': [ts.isoformat() for ts in df.index],
-    }}
-"""
-
-    code_to_write = template if code_override is None else str(code_override)
+    if code_override is None:
+        code_to_write = _STRATEGY_SKELETON.format(
+            display_name=display_name,
+            description=description or 'TODO: Describe this strategy.',
+            compute_fn_name=compute_fn_name,
+        )
+    else:
+        code_to_write = str(code_override)
 
     try:
-        os.makedirs(STRATEGIES_DIR, exist_ok=True)
         with open(path, 'w', encoding='utf-8') as f:
             f.write(code_to_write)
     except Exception as e:
@@ -1688,27 +2084,27 @@ def {compute_fn_name}(df_prices, rth_mask=None):
 
     # Insert/Update metadata
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO strategies_meta (name, display_name, description, enabled, indicators)
-            VALUES (?, ?, ?, 1, ?)
-            ON CONFLICT(name) DO UPDATE SET
-              display_name=excluded.display_name,
-              description=excluded.description,
-              enabled=excluded.enabled,
-              indicators=excluded.indicators,
-              updated_at=CURRENT_TIMESTAMP
-            """,
-            (name, display_name, description, indicators)
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO strategies_meta (name, display_name, description, enabled, indicators)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                  display_name=excluded.display_name,
+                  description=excluded.description,
+                  enabled=excluded.enabled,
+                  indicators=excluded.indicators,
+                  updated_at=CURRENT_TIMESTAMP
+                """,
+                (name, display_name, description, indicators)
+            )
+            conn.commit()
     except Exception:
         # Don't fail creation if metadata insert fails; file exists and can be edited.
         pass
 
+    _invalidate_strategies_cache()
+
     # Dynamically import and register in-memory
     try:
         importlib.invalidate_caches()
@@ -1720,9 +2116,9 @@ def {compute_fn_name}(df_prices, rth_mask=None):
     except Exception as e:
         return jsonify({'error': f'Created file but failed to import/register: {e}'}), 500
 
-    # Persist in strategies/__init__.py best-effort
+    # Persist in strategies/_registry.json best-effort
     try:
-        _ensure_strategy_registered_in_init(name, compute_fn_name)
+        _ensure_strategy_registered_in_manifest(name, compute_fn_name)
     except Exception:
         pass
 
@@ -1736,7 +2132,7 @@ def delete_strategy(name):
     - removes strategies/<name>.py
     - deletes from strategies_meta table
     - removes from STRATEGY_REGISTRY (in-memory)
-    - un-patches strategies/__init__.py
+    - removes it from strategies/_registry.json
     """
     nm = (name or '').strip()
     if not nm:
@@ -1766,18 +2162,16 @@ def delete_strategy(name):
     except Exception:
         pass # Not fatal if metadata delete fails
 
-    # 5. Un-patch strategies/__init__.py
+    # 5. Remove from the registry manifest
     try:
-        # Note: we need the function name to clean up __all__. 
-        # By convention it is compute_{name}_signals
-        fn_name = f"compute_{nm}_signals"
-        _remove_strategy_from_init(nm, fn_name)
+        _remove_strategy_from_manifest(nm)
     except Exception:
         pass
 
     # 6. Remove from in-memory registry
     if nm in STRATEGY_REGISTRY:
         del STRATEGY_REGISTRY[nm]
+    _invalidate_strategies_cache()
 
     return jsonify({'ok': True, 'name': nm})
 
@@ -1802,23 +2196,22 @@ def update_strategy_meta(name):
         display_name = nm
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO strategies_meta (name, display_name, description, enabled, indicators)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(name) DO UPDATE SET
-              display_name=excluded.display_name,
-              description=excluded.description,
-              enabled=excluded.enabled,
-              indicators=excluded.indicators,
-              updated_at=CURRENT_TIMESTAMP
-            """,
-            (nm, display_name, description, enabled_i, indicators)
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO strategies_meta (name, display_name, description, enabled, indicators)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                  display_name=excluded.display_name,
+                  description=excluded.description,
+                  enabled=excluded.enabled,
+                  indicators=excluded.indicators,
+                  updated_at=CURRENT_TIMESTAMP
+                """,
+                (nm, display_name, description, enabled_i, indicators)
+            )
+            conn.commit()
+        _invalidate_strategies_cache()
         return jsonify({'ok': True, 'name': nm, 'display_name': display_name, 'description': description, 'enabled': bool(enabled_i), 'indicators': indicators})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1841,80 +2234,54 @@ def perform_strategy_backtest(name, ticker, interval, fee_bp, risk_percent, rewa
         '1Min': 60, '5Min': 300, '15Min': 900,
         '1h': 3600, '4h': 14400, '1d': 86400
     }
-    
+
     # Try to determine target bar_s. If interval looks like a number, use it.
     try:
         target_bar_s = int(interval)
     except (ValueError, TypeError):
         target_bar_s = interval_map.get(interval, 60)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Strategy: 
-    # 1. Try fetching exact interval requested.
-    # 2. If no data, fetch 1Min data and aggregate to target_bar_s.
-    fetched = _fetch_stock_data_ohlcv(cursor, ticker=ticker, interval=interval, start_iso=start, end_iso=end)
-    
-    if not fetched and target_bar_s != 60:
-        # Fallback: fetch 1Min data and aggregate
-        fetched_1m = _fetch_stock_data_ohlcv(cursor, ticker=ticker, interval='1Min', start_iso=start, end_iso=end)
-        if fetched_1m:
-            # _fetch_stock_data_ohlcv returns (ts, c, o, h, l, v)
-            # _aggregate_ohlcv expects (epoch_ms, o, h, l, v, c) - wait, check order!
-            # Let's check _aggregate_ohlcv signature again.
-            
-            # From _aggregate_ohlcv: 
-            # rows: List[Tuple[int, float, float, float, float, float]] (epoch_ms, o,h,l,c,v)
-            
-            agg_input = []
-            for (ts_iso, c, o, h, l, v) in fetched_1m:
-                try:
-                    dt = datetime.fromisoformat(ts_iso.replace('Z', '+00:00'))
-                    ms = int(dt.timestamp() * 1000)
-                    agg_input.append((ms, o, h, l, c, v))
-                except Exception:
-                    continue
-            
-            if agg_input:
-                agg = _aggregate_ohlcv(agg_input, target_bar_s)
-                # Reconstruct 'fetched' format: (ts_iso, c, o, h, l, v)
-                fetched = []
-                for i in range(len(agg['t_ms'])):
-                    ts_iso = datetime.fromtimestamp(agg['t_ms'][i]/1000, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
-                    fetched.append((
-                        ts_iso,
-                        agg['c'][i],
-                        agg['o'][i],
-                        agg['h'][i],
-                        agg['l'][i],
-                        agg['v'][i]
-                    ))
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    conn.close()
+        # Strategy:
+        # 1. Try fetching exact interval requested.
+        # 2. If no data, fetch 1Min data and aggregate to target_bar_s.
+        cols = _fetch_stock_data_columns(cursor, ticker=ticker, interval=interval, start_iso=start, end_iso=end)
+
+        if not cols['ts'] and target_bar_s != 60:
+            # Fallback: aggregate 1Min data to target_bar_s from the stored integer ts_ms, so no
+            # timestamps are parsed.
+            s_ms = _parse_iso_to_epoch_ms(start) if (start and end) else None
+            e_ms = _parse_iso_to_epoch_ms(end) if (start and end) else None
+            range_sql = ""
+            params: Tuple[Any, ...] = (ticker,)
+            if s_ms is not None and e_ms is not None:
+                range_sql = " AND ts_ms >= ? AND ts_ms <= ?"
+                params = (ticker, int(s_ms // 1000) * 1000, int(e_ms // 1000) * 1000)
+            cursor.execute(
+                f"""
+                SELECT ts_ms, COALESCE(open_price, price), COALESCE(high_price, price),
+                       COALESCE(low_price, price), price, COALESCE(volume, 0)
+                FROM stock_data
+                WHERE ticker = ? AND interval = '1Min'{range_sql}
+                ORDER BY ts_ms ASC
+                """,
+                params,
+            )
+            agg = _aggregate_ohlcv(cursor.fetchall(), target_bar_s)
+            # Same columnar shape as _fetch_stock_data_columns.
+            cols = {'ts': [_epoch_ms_to_iso_z(t) for t in agg['t_ms']]}
+            for key in ('o', 'h', 'l', 'c', 'v'):
+                cols[key] = np.asarray(agg[key], dtype=np.float64) if NUMPY_AVAILABLE else agg[key]
 
-    if not fetched:
+    if not cols['ts']:
         raise LookupError('no data')
 
-    timestamps = [row[0] for row in fetched]
+    timestamps = cols['ts']
     market_hours = get_market_hours_info(timestamps)
-    regular_mask = build_regular_mask(timestamps, market_hours)
-    ohlc = [
-        {
-            'open': row[2],
-            'high': row[3],
-            'low': row[4],
-            'close': row[1],
-            'volume': row[5] if row[5] is not None else 0,
-        }
-        for row in fetched
-    ]
-
-    try:
-        df = pd.DataFrame(ohlc)
-        df.index = pd.to_datetime(timestamps)
-    except Exception:
-        df = pd.DataFrame(ohlc)
+    regular_mask = build_regular_mask(timestamps, market_hours)
+    df = _stock_columns_frame(cols)
 
     # Allow off-hours for VWAP/EMA crossover and Fools Paradise
     if name in ['vwap_ema_crossover_v1', 'fools_paradise']:
@@ -1937,147 +2304,213 @@ def perform_strategy_backtest(name, ticker, interval, fee_bp, risk_percent, rewa
         'generated_at': datetime.now(timezone.utc).isoformat()
     }
 
+def _ema(x, span: int):
+    """
+    EMA of a float array with pandas' `ewm(span=span, adjust=False)` semantics, as an array.
+
+    With SciPy, NaN-free input runs through `lfilter` as the first-order IIR
+    y[t] = alpha*x[t] + (1-alpha)*y[t-1], seeded so y[0] = x[0]; pandas (which skips NaNs) is
+    the fallback.
+    """
+    if SCIPY_AVAILABLE and NUMPY_AVAILABLE and len(x) and not np.isnan(x).any():
+        alpha = 2.0 / (span + 1.0)
+        y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])
+        return y
+    return pd.Series(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _emas_and_macd(close) -> Dict[str, Any]:
+    """
+    EMA 9/21/50/200 and MACD(12, 26, 9) line/signal of a close-price array, as float arrays.
+
+    Works on the bare array so the EMAs share one float64 buffer instead of re-reading a
+    DataFrame column per span; MACD reuses its line for the signal EMA.
+    """
+    macd = _ema(close, 12) - _ema(close, 26)
+    return {
+        'ema_9': _ema(close, 9),
+        'ema_21': _ema(close, 21),
+        'ema_50': _ema(close, 50),
+        'ema_200': _ema(close, 200),
+        'macd': macd,
+        'macd_signal': _ema(macd, 9),
+    }
+
+
+def _json_float_series(series) -> Any:
+    """
+    `series` ready for `_json_response`: a float64 array with NaN intact under orjson (which
+    writes NaN as null), otherwise a `_clean_series` list.
+    """
+    if ORJSON_AVAILABLE and NUMPY_AVAILABLE:
+        if isinstance(series, pd.Series):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.asarray(series, dtype=np.float64)
+    return _clean_series(series)
+
+
+def _compute_ticker_indicators(df_prices: pd.DataFrame) -> Dict[str, Any]:
+    """
+    EMA 9/21/50/200, MACD/signal and per-trading-day anchored VWAP for /api/ticker, in
+    `_json_float_series` form. Callers share the result, so it must not be mutated.
+    """
+    # Indicator columns go on a shallow copy; `df_prices` is shared with the other overlays.
+    df = df_prices.copy(deep=False)
+
+    if ta:
+        df['ema_9'] = ta.ema(df['close'], length=9)
+        df['ema_21'] = ta.ema(df['close'], length=21)
+        df['ema_50'] = ta.ema(df['close'], length=50)
+        df['ema_200'] = ta.ema(df['close'], length=200)
+        macd_df = ta.macd(df['close'])
+        if macd_df is not None and not macd_df.empty:
+            df['macd'] = macd_df.iloc[:, 0]
+            df['macd_signal'] = macd_df.iloc[:, 1]
+            df['macd_histogram'] = macd_df.iloc[:, 2]
+        else:
+            df['macd'] = df['macd_signal'] = df['macd_histogram'] = None
+    else:
+        # Fallback using pandas only
+        for col, values in _emas_and_macd(df['close'].to_numpy(dtype=float)).items():
+            df[col] = values
+
+    # VWAP anchored per trading day to match Alpaca anchor logic (reused if the caller's frame
+    # already has it, e.g. from add_shared_indicators)
+    vwap_series = df['vwap'] if 'vwap' in df.columns else calculate_vwap_per_trading_day(df)
+
+    missing = [float('nan')] * len(df)
+    return {
+        'ema_9': _json_float_series(df['ema_9']),
+        'ema_21': _json_float_series(df['ema_21']),
+        'ema_50': _json_float_series(df['ema_50']),
+        'ema_200': _json_float_series(df['ema_200']),
+        'vwap': _json_float_series(vwap_series),
+        'macd': _json_float_series(df['macd'] if 'macd' in df else missing),
+        'macd_signal': _json_float_series(df['macd_signal'] if 'macd_signal' in df else missing),
+    }
+
+
+# Optional /api/ticker/<ticker>/<interval> sections, selectable with ?include=a,b (default: all).
+# `labels` and `prices` are always sent.
+_TICKER_SECTIONS = frozenset(
+    {'ohlc', 'indicators', 'strategies', 'market_hours', 'market_opens', 'candle_bias'}
+)
+
+
 @app.route('/api/ticker/<ticker>/<interval>')
 def get_ticker_data(ticker, interval):
-    """API endpoint to get ticker data for charting."""
+    """
+    API endpoint to get ticker data for charting.
+
+    `include` (optional, comma-separated subset of _TICKER_SECTIONS; default all) limits which
+    sections are computed. Omitted sections keep their key with an empty value.
+    """
+    include_raw = (request.args.get('include') or '').strip()
+    if include_raw:
+        include = {part.strip().lower() for part in include_raw.split(',') if part.strip()}
+        unknown = sorted(include - _TICKER_SECTIONS)
+        if unknown:
+            return _bad_request(
+                "invalid_include",
+                f"Unknown include section(s): {', '.join(unknown)}",
+                allowed=sorted(_TICKER_SECTIONS),
+            )
+    else:
+        include = _TICKER_SECTIONS
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Get all data for the ticker and interval (OHLC + volume only)
-    fetched = _fetch_stock_data_ohlcv(cursor, ticker=ticker, interval=interval)
+    # Get all data for the ticker and interval (OHLC + volume only), as columns
+    cols = _fetch_stock_data_columns(cursor, ticker=ticker, interval=interval)
     conn.close()
     
-    timestamps = [row[0] for row in fetched]
-    market_hours = get_market_hours_info(timestamps)
-    market_opens = get_market_open_times(timestamps)
-
-    ohlc = [
-        {
-            'open': row[2],
-            'high': row[3],
-            'low': row[4],
-            'close': row[1],
-            'volume': row[5] if row[5] is not None else 0,
-        }
-        for row in fetched
-    ]
+    timestamps = cols['ts']
+    market_hours = get_market_hours_info(timestamps) if 'market_hours' in include else []
+    market_opens = get_market_open_times(timestamps) if 'market_opens' in include else []
+
+    # One frame for indicators, strategies and candle bias (each callee copies before writing);
+    # the index is the timestamps, as VWAP anchoring per trading day needs.
+    df_base = _stock_columns_frame(cols)
+
+    # Strategy signals and candle bias only read df_base: run them on the strategy pool while
+    # this thread computes (or looks up) the indicators.
+    strategy_futures = []
+    df_strategy = None
+    if 'strategies' in include and isinstance(df_base.index, pd.DatetimeIndex):
+        # EMA/VWAP columns the strategies look for, computed once for both of them; the
+        # indicators below reuse the same anchored VWAP.
+        df_strategy = add_shared_indicators(df_base)
+        # Allow off-hours for the simple VWAP/EMA crossover
+        strategy_futures = [
+            (name, _STRATEGY_POOL.submit(fn, df_strategy, rth_mask=None))
+            for name, fn in (
+                ('vwap_ema_crossover_v1', compute_vwap_ema_crossover_signals),
+                ('fools_paradise', compute_fools_paradise_signals),
+            )
+        ]
+    candle_future = None
+    if 'candle_bias' in include and timestamps:
+        candle_future = _STRATEGY_POOL.submit(compute_candlestick_bias, df_base)
 
-    # Compute pandas_ta indicators on the fly (always)
+    # Indicator series depend only on the fetched bars, so identical refreshes reuse them.
     indicators_ta = {}
-    if len(ohlc) > 0:
-        df = pd.DataFrame(ohlc)
-        # set index to timestamps to match VWAP anchoring per trading day
-        try:
-            df.index = pd.to_datetime(timestamps)
-        except Exception:
-            pass
-
-        if ta:
-            df['ema_9'] = ta.ema(df['close'], length=9)
-            df['ema_21'] = ta.ema(df['close'], length=21)
-            df['ema_50'] = ta.ema(df['close'], length=50)
-            df['ema_200'] = ta.ema(df['close'], length=200)
-            macd_df = ta.macd(df['close'])
-            if macd_df is not None and not macd_df.empty:
-                df['macd'] = macd_df.iloc[:, 0]
-                df['macd_signal'] = macd_df.iloc[:, 1]
-                df['macd_histogram'] = macd_df.iloc[:, 2]
-            else:
-                df['macd'] = df['macd_signal'] = df['macd_histogram'] = None
-        else:
-            # Fallback using pandas only
-            df['ema_9'] = df['close'].ewm(span=9, adjust=False).mean()
-            df['ema_21'] = df['close'].ewm(span=21, adjust=False).mean()
-            df['ema_50'] = df['close'].ewm(span=50, adjust=False).mean()
-            df['ema_200'] = df['close'].ewm(span=200, adjust=False).mean()
-            macd_line = df['close'].ewm(span=12, adjust=False).mean() - df['close'].ewm(span=26, adjust=False).mean()
-            df['macd'] = macd_line
-            df['macd_signal'] = macd_line.ewm(span=9, adjust=False).mean()
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
-
-        # VWAP anchored per trading day to match Alpaca anchor logic
-        vwap_series = calculate_vwap_per_trading_day(df.rename(columns={
-            'open': 'open',
-            'high': 'high',
-            'low': 'low',
-            'close': 'close',
-            'volume': 'volume'
-        }))
-        df['vwap'] = vwap_series
-
-        # Normalize to JSON-serializable lists (replace NaN/NA with None)
-        indicators_ta = {
-            'ema_9': df['ema_9'].where(pd.notna(df['ema_9']), None).tolist(),
-            'ema_21': df['ema_21'].where(pd.notna(df['ema_21']), None).tolist(),
-            'ema_50': df['ema_50'].where(pd.notna(df['ema_50']), None).tolist(),
-            'ema_200': df['ema_200'].where(pd.notna(df['ema_200']), None).tolist(),
-            'vwap': vwap_series.where(pd.notna(vwap_series), None).tolist(),
-            'macd': df['macd'].where(pd.notna(df['macd']), None).tolist() if 'macd' in df else [None]*len(df),
-            'macd_signal': df['macd_signal'].where(pd.notna(df['macd_signal']), None).tolist() if 'macd_signal' in df else [None]*len(df)
-        }
-
-    # Always align pandas_ta VWAP to anchored calculation if we have timestamps
-    if len(ohlc) > 0:
-        df_vwap = pd.DataFrame(ohlc)
-        try:
-            df_vwap.index = pd.to_datetime(timestamps)
-        except Exception:
-            pass
-        vwap_anchored = calculate_vwap_per_trading_day(df_vwap.rename(columns={
-            'open': 'open',
-            'high': 'high',
-            'low': 'low',
-            'close': 'close',
-            'volume': 'volume'
-        }))
-        indicators_ta['vwap'] = vwap_anchored.where(pd.notna(vwap_anchored), None).tolist()
-
-    # Build strategy signals
+    if 'indicators' in include and timestamps:
+        last_bar = tuple(float(cols[k][-1]) for k in ('o', 'h', 'l', 'c', 'v'))
+        fingerprint = (ticker.upper(), interval, len(timestamps), timestamps[-1], last_bar)
+        with _INDICATOR_CACHE_LOCK:
+            indicators_ta = _INDICATOR_CACHE.get(fingerprint)
+            if indicators_ta is not None:
+                _INDICATOR_CACHE.move_to_end(fingerprint)
+        if indicators_ta is None:
+            indicators_ta = _compute_ticker_indicators(df_strategy if df_strategy is not None else df_base)
+            with _INDICATOR_CACHE_LOCK:
+                _INDICATOR_CACHE[fingerprint] = indicators_ta
+                while len(_INDICATOR_CACHE) > _INDICATOR_CACHE_MAX:
+                    _INDICATOR_CACHE.popitem(last=False)
+
+    # Gather strategy signals
     strategy_payload = {}
     try:
-        df_strategy = pd.DataFrame(ohlc)
-        df_strategy.index = pd.to_datetime(timestamps)
-        # Allow off-hours for the simple VWAP/EMA crossover
-        signals_vwap_ema_cross = compute_vwap_ema_crossover_signals(df_strategy, rth_mask=None)
-        if signals_vwap_ema_cross:
-            strategy_payload['vwap_ema_crossover_v1'] = normalize_signals(signals_vwap_ema_cross, df_strategy)
-        
-        # Compute Fools Paradise strategy signals
-        signals_fools_paradise = compute_fools_paradise_signals(df_strategy, rth_mask=None)
-        if signals_fools_paradise:
-            strategy_payload['fools_paradise'] = normalize_signals(signals_fools_paradise, df_strategy)
+        for name, fut in strategy_futures:
+            signals = fut.result()
+            if signals:
+                strategy_payload[name] = normalize_signals(signals, df_strategy)
     except Exception as e:
         # Keep strategies empty if anything fails; don't break main payload
         strategy_payload = {}
     
-    # Compute candlestick bias overlay (educational tool, not a strategy)
+    # Candlestick bias overlay (educational tool, not a strategy)
     candle_bias = []
     pattern_counts = {}
     try:
-        if len(ohlc) > 0:
-            df_candles = pd.DataFrame(ohlc)
-            candle_bias = compute_candlestick_bias(df_candles)
+        if candle_future is not None:
+            candle_bias = candle_future.result()
             pattern_counts = count_pattern_instances(candle_bias)
     except Exception as e:
         # Keep candle_bias empty if computation fails; don't break main payload
         candle_bias = []
         pattern_counts = {}
 
+    # Row dicts are only materialized here, for the JSON payload. orjson writes NaN as null, so
+    # the prices only need a NaN -> None pass for the jsonify fallback.
+    if ORJSON_AVAILABLE and NUMPY_AVAILABLE:
+        opens, highs, lows, closes = (cols[k].tolist() for k in ('o', 'h', 'l', 'c'))
+    else:
+        opens, highs, lows, closes = (_clean_series(cols[k]) for k in ('o', 'h', 'l', 'c'))
+    volumes = cols['v'].tolist() if NUMPY_AVAILABLE else cols['v']
+    ohlc = []
+    if 'ohlc' in include:
+        ohlc = [
+            {'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for o, h, l, c, v in zip(opens, highs, lows, closes, volumes)
+        ]
     data = {
         'labels': timestamps,
-        'prices': _clean_series([row[1] for row in fetched]),
-        'ohlc': [
-            {
-                'open': None if (entry['open'] is None or (isinstance(entry['open'], float) and math.isnan(entry['open']))) else entry['open'],
-                'high': None if (entry['high'] is None or (isinstance(entry['high'], float) and math.isnan(entry['high']))) else entry['high'],
-                'low': None if (entry['low'] is None or (isinstance(entry['low'], float) and math.isnan(entry['low']))) else entry['low'],
-                'close': None if (entry['close'] is None or (isinstance(entry['close'], float) and math.isnan(entry['close']))) else entry['close'],
-                'volume': entry['volume'] if entry['volume'] is not None else 0
-            }
-            for entry in ohlc
-        ],
+        'prices': closes,
+        'ohlc': ohlc,
         'indicators': {},  # deprecated: alpaca imports removed
-        'indicators_ta': {k: _clean_series(v) for k, v in indicators_ta.items()},
+        'indicators_ta': indicators_ta,
         'market_hours': [
             {
                 'start': period['start'].isoformat() if isinstance(period['start'], datetime) else period['start'],
@@ -2095,7 +2528,63 @@ def get_ticker_data(ticker, interval):
         'pattern_counts': pattern_counts
     }
     
-    return jsonify(data)
+    return _json_response(data)
+
+
+def _backtest_job(db_path: str, strategy_target: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker-process side of `_run_backtest`: point at the parent's database, register the
+    strategy if it was created after this worker started, then run the backtest.
+    """
+    database.DB_NAME = db_path
+    name = kwargs['name']
+    if name not in STRATEGY_REGISTRY:
+        module_path, _, fn_name = strategy_target.partition(':')
+        STRATEGY_REGISTRY[name] = getattr(importlib.import_module(module_path), fn_name)
+    return perform_strategy_backtest(**kwargs)
+
+
+def _run_backtest(**kwargs) -> Dict[str, Any]:
+    """
+    `perform_strategy_backtest(**kwargs)`, in the backtest process pool when BACKTEST_WORKERS > 0.
+    Exceptions (ValueError/LookupError/...) propagate to the caller either way.
+    """
+    fn = STRATEGY_REGISTRY.get(kwargs.get('name'))
+    if BACKTEST_WORKERS <= 0 or fn is None:
+        return perform_strategy_backtest(**kwargs)
+    target = f"{fn.__module__}:{fn.__name__}"
+    return _backtest_pool().submit(_backtest_job, database.DB_NAME, target, kwargs).result()
+
+
+def _backtest_pool() -> ProcessPoolExecutor:
+    global _BACKTEST_POOL
+    with _BACKTEST_POOL_LOCK:
+        if _BACKTEST_POOL is None:
+            # spawn, not fork: this process already runs server and strategy threads.
+            _BACKTEST_POOL = ProcessPoolExecutor(
+                max_workers=BACKTEST_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _BACKTEST_POOL
+
+
+def _backtest_worker_ready() -> int:
+    return os.getpid()
+
+
+def warm_backtest_pool() -> None:
+    """
+    Start the backtest workers in the background so the first backtest doesn't pay for
+    spawning them (each one re-imports app, pandas and the strategies: ~2s).
+    No-op when BACKTEST_WORKERS is 0. Call from server start-up, never at import time:
+    spawned workers import this module themselves.
+    """
+    if BACKTEST_WORKERS <= 0:
+        return
+    pool = _backtest_pool()
+    # One job per worker: the executor spawns a new process whenever none is idle.
+    for _ in range(BACKTEST_WORKERS):
+        pool.submit(_backtest_worker_ready)
 
 
 @app.route('/api/strategy/<name>/backtest', methods=['POST'])
@@ -2110,7 +2599,7 @@ def run_strategy_backtest(name):
     risk_percent = float(payload.get('risk_percent', 0.5) or 0.5)  # Default 0.5% risk
     reward_multiple = float(payload.get('reward_multiple', 2.0) or 2.0)  # Default 2:1
     try:
-        result = perform_strategy_backtest(
+        result = _run_backtest(
             name=name,
             ticker=ticker,
             interval=interval,
@@ -2120,7 +2609,7 @@ def run_strategy_backtest(name):
             start=start,
             end=end,
         )
-        return jsonify(result)
+        return _json_response(result)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except LookupError as e:
@@ -2129,15 +2618,50 @@ def run_strategy_backtest(name):
         return jsonify({'error': str(e)}), 500
 
 
+# Part of every backtest input key: metrics stored by an earlier process (possibly older app or
+# engine code) are never reused.
+_BACKTEST_KEY_TOKEN = uuid.uuid4().hex
+
+
+def _backtest_input_key(cursor, strategy: str, ticker: str, interval: str) -> Optional[str]:
+    """
+    Fingerprint of what a saved backtest's metrics depend on besides its stored parameters: the
+    bars it can read (row count and newest rowid over `interval` and the 1Min bars it may be
+    aggregated from; INSERT OR REPLACE gives a revised bar a new rowid), the strategy module's
+    mtime and this process. None for an unknown strategy.
+    """
+    fn = STRATEGY_REGISTRY.get(strategy)
+    if fn is None:
+        return None
+    try:
+        mtime_ns = os.stat(importlib.import_module(fn.__module__).__file__).st_mtime_ns
+    except (ImportError, OSError, TypeError):
+        return None
+    cursor.execute(
+        "SELECT COUNT(*), MAX(id) FROM stock_data WHERE ticker = ? AND interval IN (?, '1Min')",
+        ((ticker or '').upper(), interval),
+    )
+    n_rows, max_id = cursor.fetchone()
+    return f"{_BACKTEST_KEY_TOKEN}:{n_rows}:{max_id}:{fn.__module__}:{fn.__name__}:{mtime_ns}"
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_metrics_json(raw: str) -> Any:
+    """
+    Parsed `backtests.metrics_json` (None if invalid). Memoized on the stored text, so listing
+    /api/backtests does not re-parse unchanged rows; the result is shared and must not be mutated.
+    """
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
 def _row_to_backtest(row):
     """Convert a DB row from backtests into a dict."""
     if not row:
         return None
-    metrics = None
-    try:
-        metrics = json.loads(row[8]) if row[8] else None
-    except Exception:
-        metrics = None
+    metrics = _parse_metrics_json(row[8]) if row[8] else None
     return {
         'id': row[0],
         'name': row[1],
@@ -2167,7 +2691,7 @@ def backtests():
         ''')
         rows = cursor.fetchall()
         conn.close()
-        return jsonify([_row_to_backtest(r) for r in rows])
+        return _json_response([_row_to_backtest(r) for r in rows])
 
     # POST: create and persist a named backtest
     payload = request.get_json(silent=True) or {}
@@ -2192,9 +2716,13 @@ def backtests():
         'generated_at': None
     }
 
+    input_key = None
     if run_backtest:
+        # Taken before the run: bars arriving meanwhile make the next re-run recompute.
+        with db_connection() as conn:
+            input_key = _backtest_input_key(conn.cursor(), strategy, ticker, interval)
         try:
-            result = perform_strategy_backtest(
+            result = _run_backtest(
                 name=strategy,
                 ticker=ticker,
                 interval=interval,
@@ -2215,9 +2743,10 @@ def backtests():
     now_iso = datetime.now(timezone.utc).isoformat()
     metrics_json = json.dumps(result.get('metrics', {})) if run_backtest else None
     cursor.execute('''
-        INSERT INTO backtests (name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, now_iso, now_iso))
+        INSERT INTO backtests (name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, created_at, updated_at, input_key, n_bars)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, now_iso, now_iso,
+          input_key, result.get('n_bars')))
     backtest_id = cursor.lastrowid
     conn.commit()
     conn.close()
@@ -2242,7 +2771,7 @@ def get_backtest(bt_id):
     conn.close()
     if not row:
         return jsonify({'error': 'not found'}), 404
-    return jsonify(_row_to_backtest(row))
+    return _json_response(_row_to_backtest(row))
 
 
 @app.route('/api/backtests/<int:bt_id>/run', methods=['POST'])
@@ -2251,7 +2780,8 @@ def rerun_backtest(bt_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('''
-        SELECT id, name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, created_at, updated_at
+        SELECT id, name, strategy, ticker, interval, risk_percent, reward_multiple, fee_bp, metrics_json, created_at, updated_at,
+               input_key, n_bars
         FROM backtests
         WHERE id = ?
     ''', (bt_id,))
@@ -2261,8 +2791,25 @@ def rerun_backtest(bt_id):
         return jsonify({'error': 'not found'}), 404
 
     bt = _row_to_backtest(row)
+    stored_key, stored_n_bars = row[11], row[12]
+    input_key = _backtest_input_key(cursor, bt['strategy'], bt['ticker'], bt['interval'])
+    if input_key is not None and input_key == stored_key and bt['metrics'] is not None:
+        # Same bars, strategy code and process as the stored run: its metrics still hold.
+        conn.close()
+        return _json_response({
+            'strategy': bt['strategy'],
+            'ticker': bt['ticker'].upper(),
+            'interval': bt['interval'],
+            'metrics': bt['metrics'],
+            'n_bars': stored_n_bars,
+            'generated_at': bt['updated_at'],
+            'id': bt_id,
+            'name': bt['name'],
+            'cached': True,
+        })
+
     try:
-        result = perform_strategy_backtest(
+        result = _run_backtest(
             name=bt['strategy'],
             ticker=bt['ticker'],
             interval=bt['interval'],
@@ -2285,15 +2832,16 @@ def rerun_backtest(bt_id):
     metrics_json = json.dumps(result.get('metrics', {}))
     cursor.execute('''
         UPDATE backtests
-        SET metrics_json = ?, updated_at = ?
+        SET metrics_json = ?, updated_at = ?, input_key = ?, n_bars = ?
         WHERE id = ?
-    ''', (metrics_json, updated_iso, bt_id))
+    ''', (metrics_json, updated_iso, input_key, result.get('n_bars'), bt_id))
     conn.commit()
     conn.close()
 
     result_with_id = dict(result)
     result_with_id['id'] = bt_id
     result_with_id['name'] = bt['name']
+    result_with_id['cached'] = False
     return jsonify(result_with_id)
 
 
@@ -2416,9 +2964,34 @@ def short_link_redirect(code: str):
     return redirect(url)
 
 
+def _alpaca_client():
+    """The shared Alpaca REST client, created on first use."""
+    global _ALPACA_CLIENT
+    with _ALPACA_LOCK:
+        if _ALPACA_CLIENT is None:
+            _ALPACA_CLIENT = tradeapi.REST(ALPACA_API_KEY, ALPACA_API_SECRET, ALPACA_BASE_URL, api_version='v2')
+        return _ALPACA_CLIENT
+
+
+def _alpaca_throttle() -> None:
+    """
+    Rate limiting for Alpaca calls: wait until _ALPACA_MIN_INTERVAL_S has passed since the
+    previous call started. A single fetch never waits, and time spent processing the previous
+    symbol counts toward the gap. The caller's slot is reserved under the lock and the sleep
+    happens after releasing it, so _alpaca_client() is never blocked behind a throttled wait.
+    """
+    global _ALPACA_LAST_CALL
+    with _ALPACA_LOCK:
+        now = time.monotonic()
+        slot = max(now, _ALPACA_LAST_CALL + _ALPACA_MIN_INTERVAL_S)
+        _ALPACA_LAST_CALL = slot
+    if slot > now:
+        time.sleep(slot - now)
+
+
 @app.route('/api/fetch-latest', methods=['POST'])
 def fetch_latest_data():
-    """Fetch latest data from Alpaca API starting from the last timestamp in database."""
+    """Fetch latest data from Alpaca API starting from each symbol's last timestamp in the database."""
     try:
         payload = request.get_json(silent=True) or {}
         req_ticker = (payload.get("ticker") or payload.get("symbol") or "").strip().upper()
@@ -2447,7 +3020,7 @@ def fetch_latest_data():
                 pass
             # ISO timestamp
             try:
-                dt = datetime.fromisoformat(s0.replace("Z", "+00:00"))
+                dt = _fromisoformat(s0)
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
                 else:
@@ -2459,21 +3032,7 @@ def fetch_latest_data():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get the latest timestamp from database
-        cursor.execute('''
-            SELECT MAX(timestamp) as latest_timestamp
-            FROM stock_data
-        ''')
-        
-        result = cursor.fetchone()
-        latest_timestamp = result[0] if result and result[0] else None
-        
-        # Initialize Alpaca API
-        API_KEY = 'PK57P4EYJODEZTVL7QYOX7J53W'
-        API_SECRET = '6PXLeTmf6wKNJBSCKZAhg3SgCkieGag1Bgvf5Yeq53qD'
-        BASE_URL = 'https://paper-api.alpaca.markets/v2'
-        
-        api = tradeapi.REST(API_KEY, API_SECRET, BASE_URL, api_version='v2')
+        api = _alpaca_client()
         
         # Calculate time range
         end_time = datetime.now(timezone.utc)
@@ -2485,16 +3044,29 @@ def fetch_latest_data():
             conn.close()
             return jsonify({"success": False, "error": "Invalid range: end_date must be >= start_date"}), 400
 
+        range_start_str = None
         if req_start or req_end:
             # If only one side provided, clamp the other to "now" or same day.
             start_time = req_start or (req_end or end_time) - timedelta(days=5)
             end_time = req_end or end_time
-        else:
-            # Default behavior: incremental update from max timestamp.
+            range_start_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        # Format as RFC3339 strings
+        end_str = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        def _incremental_start_str(ticker: str, interval: str) -> str:
+            """
+            Default behavior: incremental update from this symbol's latest stored bar (an index
+            seek on (ticker, interval, timestamp)), or the last 5 days if it has none.
+            """
+            cursor.execute(
+                'SELECT MAX(timestamp) FROM stock_data WHERE ticker = ? AND interval = ?',
+                (ticker, interval),
+            )
+            latest_timestamp = cursor.fetchone()[0]
             if latest_timestamp:
-                # Start from the latest timestamp (add 1 minute to avoid duplicates)
                 try:
-                    start_time = datetime.fromisoformat(latest_timestamp.replace('Z', '+00:00'))
+                    start_time = _fromisoformat(latest_timestamp)
                     if start_time.tzinfo is None:
                         start_time = start_time.replace(tzinfo=timezone.utc)
                     else:
@@ -2506,10 +3078,7 @@ def fetch_latest_data():
             else:
                 # No data exists, fetch last 5 days
                 start_time = end_time - timedelta(days=5)
-        
-        # Format as RFC3339 strings
-        start_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        end_str = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+            return start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         
         # Determine which tickers to fetch:
         # - If user provided a ticker: only fetch that ticker (lets you add new symbols).
@@ -2527,7 +3096,10 @@ def fetch_latest_data():
         for ticker in TICKERS:
             for interval in INTERVALS:
                 try:
+                    start_str = range_start_str or _incremental_start_str(ticker, interval)
+
                     # Fetch bars from Alpaca
+                    _alpaca_throttle()
                     bars = api.get_bars(
                         ticker,
                         interval,
@@ -2576,12 +3148,7 @@ def fetch_latest_data():
                         bars['ema_50'] = bars['close'].ewm(span=50, adjust=False).mean()
                         bars['ema_200'] = bars['close'].ewm(span=200, adjust=False).mean()
                         
-                        # Simple RSI fallback
-                        delta = bars['close'].diff()
-                        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                        rs = gain / loss
-                        bars['rsi'] = 100 - (100 / (1 + rs))
+                        bars['rsi'] = wilder_rsi(bars['close'], length=14)
                         
                         ema12 = bars['close'].ewm(span=12, adjust=False).mean()
                         ema26 = bars['close'].ewm(span=26, adjust=False).mean()
@@ -2600,50 +3167,14 @@ def fetch_latest_data():
                     
                     bars['vwap'] = calculate_vwap_per_trading_day(bars)
 
-                    # Insert data into database (OHLCV + indicators)
-                    for timestamp, row in bars.iterrows():
-                        try:
-                            cursor.execute('''
-                                INSERT OR REPLACE INTO stock_data 
-                                (ticker, timestamp, price, open_price, high_price, low_price, volume, 
-                                 interval, ema_9, ema_21, ema_50, ema_200, vwap, rsi, macd, macd_signal, macd_histogram, 
-                                 bb_upper, bb_middle, bb_lower, sma_20, sma_50, sma_200)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                ticker,
-                                timestamp.isoformat(),
-                                float(row['close']),
-                                float(row['open']),
-                                float(row['high']),
-                                float(row['low']),
-                                float(row['volume']) if 'volume' in row and pd.notna(row['volume']) else None,
-                                interval,
-                                float(row['ema_9']) if pd.notna(row['ema_9']) else None,
-                                float(row['ema_21']) if pd.notna(row['ema_21']) else None,
-                                float(row['ema_50']) if pd.notna(row['ema_50']) else None,
-                                float(row['ema_200']) if pd.notna(row['ema_200']) else None,
-                                float(row['vwap']) if pd.notna(row['vwap']) else None,
-                                float(row['rsi']) if pd.notna(row['rsi']) else None,
-                                float(row['macd']) if pd.notna(row['macd']) else None,
-                                float(row['macd_signal']) if pd.notna(row['macd_signal']) else None,
-                                float(row['macd_histogram']) if pd.notna(row['macd_histogram']) else None,
-                                float(row['bb_upper']) if pd.notna(row['bb_upper']) else None,
-                                float(row['bb_middle']) if pd.notna(row['bb_middle']) else None,
-                                float(row['bb_lower']) if pd.notna(row['bb_lower']) else None,
-                                float(row['sma_20']) if pd.notna(row['sma_20']) else None,
-                                float(row['sma_50']) if pd.notna(row['sma_50']) else None,
-                                float(row['sma_200']) if pd.notna(row['sma_200']) else None
-                            ))
-                            total_records += 1
-                            last_timestamp = timestamp.isoformat()
-                        except Exception as e:
-                            print(f"Error inserting data point: {e}")
-                            continue
+                    # Insert data into database (OHLCV + indicators), one executemany per symbol
+                    rows = stock_data_rows(ticker, interval, bars)
+                    cursor.executemany(STOCK_DATA_UPSERT_SQL, rows)
+                    total_records += len(rows)
+                    last_timestamp = rows[-1][1]
                     
                     conn.commit()
-                    # Rate limiting: if you're fetching many symbols, keep this gentle.
-                    # For single-symbol range loads, it's usually fine, but we keep the old behavior.
-                    time.sleep(0.5)
+                    _invalidate_dataset_bounds(ticker)
                     
                 except Exception as e:
                     print(f"Error fetching data for {ticker} at {interval} interval: {e}")
@@ -2745,7 +3276,6 @@ def package_poc():
                              scipy_available=SCIPY_AVAILABLE,
                              statsmodels_available=STATSMODELS_AVAILABLE)
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return render_template('package_poc.html',
                              error=str(e),
@@ -2759,6 +3289,65 @@ def package_poc():
 # Replay (practice-field) API
 # ---------------------------
 
+def _coerce_int(value: Any, default: Optional[int], lo: Optional[int] = None, hi: Optional[int] = None) -> Optional[int]:
+    """
+    `int(value)` clamped to [lo, hi]; `default` (as is) when value is None or not int-convertible.
+    Plain ints (the usual JSON case) skip the conversion and its exception handling.
+    """
+    if type(value) is not int:
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            return default
+    if lo is not None and value < lo:
+        return lo
+    if hi is not None and value > hi:
+        return hi
+    return value
+
+
+def _choose_replay_anchor_ms(
+    start_ms: int,
+    end_ms: int,
+    *,
+    disp_ms: int,
+    hist_bars: int,
+    fut_bars: int,
+    min_age_days: int,
+    seed: Optional[int],
+) -> int:
+    """
+    Replay anchor (epoch ms) for a dataset spanning [start_ms, end_ms]: room for `hist_bars`
+    display bars of history before it and `fut_bars` after it, and at least `min_age_days`
+    before the end when the data allows. Plain integer math; the pick is uniform in whole
+    seconds from random.Random(seed), or the shared _REPLAY_ANCHOR_RNG when unseeded.
+    """
+    # Require enough history and future around anchor.
+    hist_ms = disp_ms * max(1, hist_bars)
+    fut_ms = disp_ms * max(1, fut_bars)
+
+    # Enforce that the anchor is at least N days before the dataset end (when possible),
+    # but never at the cost of pushing the start all the way back to the dataset beginning.
+    latest_anchor_by_age = end_ms - min_age_days * 86_400_000
+    latest_anchor_by_future = end_ms - fut_ms
+    latest_anchor = min(latest_anchor_by_age, latest_anchor_by_future)
+    if latest_anchor <= start_ms:
+        # Can't satisfy age constraint; fall back to "as late as we can while still having future".
+        latest_anchor = max(start_ms, latest_anchor_by_future)
+
+    low = start_ms + hist_ms
+    high = min(latest_anchor, end_ms - fut_ms)
+    if high <= low:
+        # If we can't satisfy both "history" + "future" windows, bias toward a useful start
+        # near the end of available data (still future-blind for the UI).
+        return max(start_ms, end_ms - fut_ms)
+    # Whole-second picks keep seeded anchors stable.
+    rnd = random.Random(seed) if seed is not None else _REPLAY_ANCHOR_RNG
+    return low + rnd.randint(0, (high - low) // 1000) * 1000
+
+
 @app.route("/replay/start", methods=["POST"])
 def replay_start():
     payload = request.get_json(silent=True) or {}
@@ -2771,29 +3360,12 @@ def replay_start():
     if snap_to_disp_boundary is None:
         snap_to_disp_boundary = True
     snap_to_disp_boundary = bool(snap_to_disp_boundary)
-    seed = payload.get("seed")
-    try:
-        seed_int = int(seed) if seed is not None else None
-    except Exception:
-        seed_int = None
-    initial_history_bars = payload.get("initial_history_bars")
-    min_future_disp_bars = payload.get("min_future_disp_bars")
-    min_anchor_age_days = payload.get("min_anchor_age_days")
+    seed_int = _coerce_int(payload.get("seed"), None)
     delta_mode = bool(payload.get("delta_mode") or payload.get("delta") or False)
 
-    try:
-        initial_history_bars_int = int(initial_history_bars) if initial_history_bars is not None else 200
-    except Exception:
-        initial_history_bars_int = 200
-    try:
-        min_future_disp_bars_int = int(min_future_disp_bars) if min_future_disp_bars is not None else 3
-    except Exception:
-        min_future_disp_bars_int = 3
-    try:
-        min_anchor_age_days_int = int(min_anchor_age_days) if min_anchor_age_days is not None else 30
-    except Exception:
-        min_anchor_age_days_int = 30
-    min_anchor_age_days_int = max(0, min(3650, min_anchor_age_days_int))
+    initial_history_bars_int = _coerce_int(payload.get("initial_history_bars"), 200)
+    min_future_disp_bars_int = _coerce_int(payload.get("min_future_disp_bars"), 3)
+    min_anchor_age_days_int = _coerce_int(payload.get("min_anchor_age_days"), 30, lo=0, hi=3650)
 
     if not symbol:
         return _bad_request("missing_params", "symbol is required", fields=["symbol"])
@@ -2802,16 +3374,7 @@ def replay_start():
     if not t_start or not t_end:
         conn = get_db_connection()
         try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT MIN(timestamp), MAX(timestamp)
-                FROM stock_data
-                WHERE ticker = ? AND interval = '1Min'
-                """,
-                (symbol,),
-            )
-            lo, hi = cur.fetchone()
+            lo, hi = _real_dataset_bounds(conn.cursor(), symbol, "1Min")
         finally:
             conn.close()
         if not lo or not hi:
@@ -2821,38 +3384,20 @@ def replay_start():
 
     # Choose a deterministic anchor time so replay starts with history + some future.
     try:
-        from datetime import timedelta
-        import random
-
-        start_dt = datetime.fromisoformat(t_start.replace("Z", "+00:00")).astimezone(timezone.utc)
-        end_dt = datetime.fromisoformat(t_end.replace("Z", "+00:00")).astimezone(timezone.utc)
-        disp_s = max(60, int(disp_tf_sec))
-        # Require enough history and future around anchor.
-        hist_span = timedelta(seconds=disp_s * max(1, initial_history_bars_int))
-        fut_span = timedelta(seconds=disp_s * max(1, min_future_disp_bars_int))
-
-        # Enforce that the anchor is at least N days before the dataset end (when possible),
-        # but never at the cost of pushing the start all the way back to the dataset beginning.
-        latest_anchor_by_age = end_dt - timedelta(days=min_anchor_age_days_int)
-        latest_anchor_by_future = end_dt - fut_span
-        latest_anchor = min(latest_anchor_by_age, latest_anchor_by_future)
-        if latest_anchor <= start_dt:
-            # Can't satisfy age constraint; fall back to "as late as we can while still having future".
-            latest_anchor = max(start_dt, latest_anchor_by_future)
-
-        low = start_dt + hist_span
-        high = min(latest_anchor, end_dt - fut_span)
-        if high <= low:
-            # If we can't satisfy both "history" + "future" windows, bias toward a useful start
-            # near the end of available data (still future-blind for the UI).
-            anchor_dt = max(start_dt, end_dt - fut_span)
-        else:
-            # If seed isn't provided, randomize per-session.
-            rnd = random.Random(seed_int) if seed_int is not None else random.SystemRandom()
-            span_sec = int((high - low).total_seconds())
-            pick = rnd.randint(0, max(0, span_sec))
-            anchor_dt = low + timedelta(seconds=pick)
-        t_anchor = anchor_dt.isoformat().replace("+00:00", "Z")
+        start_ms = _parse_iso_to_epoch_ms(t_start)
+        end_ms = _parse_iso_to_epoch_ms(t_end)
+        if start_ms is None or end_ms is None:
+            raise ValueError("unparseable t_start/t_end")
+        anchor_ms = _choose_replay_anchor_ms(
+            start_ms,
+            end_ms,
+            disp_ms=max(60, int(disp_tf_sec)) * 1000,
+            hist_bars=initial_history_bars_int,
+            fut_bars=min_future_disp_bars_int,
+            min_age_days=min_anchor_age_days_int,
+            seed=seed_int,
+        )
+        t_anchor = _epoch_ms_to_iso_z(anchor_ms)
     except Exception:
         t_anchor = None
 
@@ -2873,27 +3418,23 @@ def replay_start():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-    _REPLAY_SESSIONS[sess.session_id] = sess
+    _add_replay_session(sess)
     # Default: keep existing snapshot payload for backwards compatibility.
     # Delta mode (opt-in): return a fixed-length window snapshot aligned with delta-only stepping.
     state_payload = sess.get_state_payload_delta() if delta_mode else sess.get_state_payload()
-    return jsonify({"session_id": sess.session_id, "state": state_payload})
+    return _json_response({"session_id": sess.session_id, "state": state_payload})
 
 
 @app.route("/replay/step", methods=["POST"])
 def replay_step():
     payload = request.get_json(silent=True) or {}
     session_id = (payload.get("session_id") or "").strip()
-    disp_steps = int(payload.get("disp_steps") or 1)
+    disp_steps = _coerce_int(payload.get("disp_steps") or 1, 1)
     return_states = bool(payload.get("return_states") or payload.get("batch") or False)
     delta_only = bool(payload.get("delta_only") or (str(payload.get("mode") or "").lower() == "delta"))
     # Resync controls (delta mode only)
     force_state = bool(payload.get("force_state") or payload.get("resync") or False)
-    try:
-        resync_every = int(payload.get("resync_every") or payload.get("resync_interval") or 0)
-    except Exception:
-        resync_every = 0
-    resync_every = max(0, min(5000, resync_every))
+    resync_every = _coerce_int(payload.get("resync_every") or payload.get("resync_interval") or 0, 0, lo=0, hi=5000)
     return_deltas = bool(payload.get("return_deltas") or payload.get("deltas") or False)
     sess = _get_replay_session(session_id)
     if not sess:
@@ -2907,19 +3448,19 @@ def replay_step():
             deltas = sess.step_delta_payloads(disp_steps=steps, resync_every=resync_every, force_state=force_state)
             last = deltas[-1] if deltas else None
             # Convenience: also include the last state if it was included (helps some callers).
-            return jsonify({"deltas": deltas, "state": (last or {}).get("state")})
+            return _json_response({"deltas": deltas, "state": (last or {}).get("state")})
         d = sess.step_delta(resync_every=resync_every, force_state=force_state)
-        return jsonify(d)
+        return _json_response(d)
 
     # For smooth browser playback we optionally return one state payload per display step.
     # Backwards-compatible: if return_states is false (or disp_steps==1), return a single state.
     if return_states and disp_steps > 1:
         states = sess.step_payloads(disp_steps=disp_steps)
         last_state = states[-1] if states else sess.get_state_payload()
-        return jsonify({"state": last_state, "states": states, "delta": {}})
+        return _json_response({"state": last_state, "states": states, "delta": {}})
 
     sess.step(disp_steps=disp_steps)
-    return jsonify({"state": sess.get_state_payload(), "delta": {}})
+    return _json_response({"state": sess.get_state_payload(), "delta": {}})
 
 
 @app.route("/replay/order/place", methods=["POST"])
@@ -2952,7 +3493,7 @@ def replay_order_place():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-    return jsonify({"state": sess.get_state_payload(), "delta": {}})
+    return _json_response({"state": sess.get_state_payload(), "delta": {}})
 
 
 @app.route("/replay/flatten", methods=["POST"])
@@ -2966,7 +3507,7 @@ def replay_flatten():
         sess.flatten_now(tag="ui")
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    return jsonify({"state": sess.get_state_payload(), "delta": {}})
+    return _json_response({"state": sess.get_state_payload(), "delta": {}})
 
 
 @app.route("/replay/order/cancel", methods=["POST"])
@@ -3014,8 +3555,9 @@ def replay_end():
         sess.end()
     except Exception:
         pass
+    _sync_replay_session_stats(sess)
     # Remove from in-memory sessions (events remain in SQLite).
-    _REPLAY_SESSIONS.pop(session_id, None)
+    _pop_replay_session(session_id)
     return jsonify({"ended": session_id})
 
 
@@ -3024,6 +3566,217 @@ def replay_end():
 # ---------------------------
 
 
+def _replay_history_version(cur: sqlite3.Cursor) -> tuple:
+    """
+    Cheap fingerprint of the replay history: session count, latest session updated_at and latest
+    event id. Events only append and session upserts stamp updated_at, so any write moves it.
+    Separate scalar subqueries keep each one an index-edge lookup.
+    """
+    cur.execute(
+        """
+        SELECT
+          (SELECT COUNT(*) FROM replay_sessions),
+          (SELECT MAX(updated_at) FROM replay_sessions),
+          (SELECT MAX(id) FROM replay_events)
+        """
+    )
+    return tuple(cur.fetchone())
+
+
+def _replay_history_etag(cur: sqlite3.Cursor, *params: Any) -> str:
+    """ETag for a replay history view: `params` plus the current _replay_history_version."""
+    key = repr((params, _replay_history_version(cur))).encode("utf-8")
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def _replay_history_response(body: Union[bytes, Iterable[bytes]], etag: str):
+    """
+    JSON `body` (bytes, or an iterable of chunks to stream) with a weak ETag; a matching
+    If-None-Match becomes an empty 304.
+    """
+    resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag, weak=True)
+    resp.cache_control.private = True
+    resp.cache_control.max_age = 5
+    return resp.make_conditional(request)
+
+
+def _replay_fill_rows(
+    cur: sqlite3.Cursor,
+    session_ids: Sequence[str],
+    payload_fields: Optional[Sequence[str]] = None,
+) -> Dict[str, List[tuple]]:
+    """
+    FILL events for `session_ids` in one query, as {session_id: [(id, ts_exec, payload_json), ...]}
+    in id order (every requested id is present, possibly with an empty list).
+    With `payload_fields`, rows are (id, ts_exec, *values) instead: SQLite extracts those top-level
+    payload keys (None when missing or undecodable), so callers skip json.loads. Payloads SQLite
+    rejects, such as json.dumps' NaN/Infinity, are decoded here instead.
+    """
+    fills: Dict[str, List[tuple]] = {sid: [] for sid in session_ids}
+    if not fills:
+        return fills
+    placeholders = ", ".join("?" for _ in fills)
+    if payload_fields:
+        payload_sql = ", ".join(
+            "CASE WHEN json_valid(payload_json) THEN json_extract(payload_json, ?) END" for _ in payload_fields
+        )
+        # The raw text too, for just the rows json_valid() rejects.
+        payload_sql += ", CASE WHEN json_valid(payload_json) THEN NULL ELSE payload_json END"
+        params = tuple(f"$.{field}" for field in payload_fields) + tuple(fills)
+    else:
+        payload_sql = "payload_json"
+        params = tuple(fills)
+    cur.execute(
+        f"""
+        SELECT session_id, id, ts_exec, {payload_sql}
+        FROM replay_events
+        WHERE session_id IN ({placeholders}) AND event_type = 'FILL'
+        ORDER BY session_id, id ASC
+        """,
+        params,
+    )
+    if not payload_fields:
+        for sid, *row in cur.fetchall():
+            fills[sid].append(tuple(row))
+        return fills
+    for sid, *row, raw in cur.fetchall():
+        if raw is not None:
+            try:
+                payload = _json_loads(raw)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                payload = {}
+            row[2:] = [payload.get(field) for field in payload_fields]
+        fills[sid].append(tuple(row))
+    return fills
+
+
+# Below this many fills the plain loop beats NumPy's per-call overhead.
+_TRIPS_NUMPY_MIN_FILLS = 256
+
+
+def _replay_fill_trips(positions: Sequence[float], realized: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    Round trips (flat -> position -> flat) over a session's fills, in fill order. `positions` and
+    `realized` are each fill's position qty and cumulative realized PnL. Each trip reports
+    trip_index (1-based), dir (sign of the entry fill), realized (PnL change over the trip),
+    qty_peak (largest |position|) and adds (fills that grew |position| mid-trip). A trip still
+    open at the last fill is left out.
+    """
+    if NUMPY_AVAILABLE and len(positions) >= _TRIPS_NUMPY_MIN_FILLS:
+        pos = np.asarray(positions, dtype=float)
+        pnl = np.asarray(realized, dtype=float)
+        prev = np.concatenate(([0.0], pos[:-1]))
+        was_flat = prev == 0.0
+        is_flat = pos == 0.0
+        entries = np.flatnonzero(was_flat & ~is_flat)
+        exits = np.flatnonzero(~was_flat & is_flat)
+        if not len(exits):
+            return []
+        abs_pos = np.abs(pos)
+        # Trip k (1-based) opens at entries[k - 1]; every exit closes the trip that is open.
+        trip = np.cumsum(was_flat & ~is_flat)[exits]
+        opened = entries[trip - 1]
+        adds = np.cumsum(~was_flat & ~is_flat & (abs_pos > np.abs(prev) + 1e-9))
+        # Fills between an exit and the next entry are flat (0), so they don't move the peak.
+        peaks = np.maximum.reduceat(abs_pos, entries)[trip - 1]
+        return [
+            {"trip_index": k, "dir": "long" if is_long else "short", "realized": r, "qty_peak": q, "adds": a}
+            for k, is_long, r, q, a in zip(
+                trip.tolist(),
+                (pos[opened] > 0).tolist(),
+                (pnl[exits] - pnl[opened]).tolist(),
+                peaks.tolist(),
+                (adds[exits] - adds[opened]).tolist(),
+            )
+        ]
+
+    tally = FillTally()
+    for pos, realized_val in zip(positions, realized):
+        tally.add(0, pos, realized_val)
+    return tally.segments
+
+
+def _replay_fill_stats(positions: Sequence[float], realized: Sequence[float]) -> Dict[str, Any]:
+    """
+    History aggregates over a session's fills (same inputs as _replay_fill_trips): fills,
+    round_trips, adds, max_abs_pos, win_rate (None until a trip closes) and segments (the trips).
+    """
+    segs = _replay_fill_trips(positions, realized)
+    n_trips = len(segs)
+    wins = sum(1 for sg in segs if sg["realized"] > 0)
+    return {
+        "fills": len(positions),
+        "round_trips": n_trips,
+        "adds": sum(sg["adds"] for sg in segs),
+        # Seeded with 0.0 so a NaN position never wins, as with a running max().
+        "max_abs_pos": max(chain((0.0,), map(abs, positions))),
+        "win_rate": (wins / n_trips) if n_trips > 0 else None,
+        "segments": segs,
+    }
+
+
+def _sync_replay_session_stats(*sessions: ReplaySession) -> None:
+    """
+    Upsert the replay_session_stats rows of those `sessions` whose fill tally has FILLs the row
+    doesn't cover yet, in one transaction. Called when a session ends and before
+    /replay/session_summaries reads the table, never per step. Best effort: a missing or stale
+    row only sends session_summaries back to the FILL events.
+    """
+    dirty = [sess for sess in sessions if sess.fill_tally.last_fill_id != sess.stats_fill_id]
+    if not dirty:
+        return
+    rows = []
+    for sess in dirty:
+        tally = sess.fill_tally
+        rows.append((
+            sess.session_id,
+            tally.last_fill_id,
+            tally.fills,
+            len(tally.segments),
+            tally.adds,
+            tally.max_abs_pos,
+            tally.realized,
+            tally.win_rate,
+            tally.segments_json,
+        ))
+    try:
+        with db_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO replay_session_stats (
+                    session_id, last_fill_id, fills, round_trips, adds, max_abs_pos, realized, win_rate,
+                    segments_json, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    last_fill_id = excluded.last_fill_id,
+                    fills = excluded.fills,
+                    round_trips = excluded.round_trips,
+                    adds = excluded.adds,
+                    max_abs_pos = excluded.max_abs_pos,
+                    realized = excluded.realized,
+                    win_rate = excluded.win_rate,
+                    segments_json = excluded.segments_json,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            conn.commit()
+    except sqlite3.Error:
+        return
+    for sess, row in zip(dirty, rows):
+        sess.stats_fill_id = row[1]
+
+
+def _sync_live_replay_session_stats() -> None:
+    """_sync_replay_session_stats over every registered (in-memory) session."""
+    with _REPLAY_SESSIONS_LOCK:
+        live = [sess for _, sess in _REPLAY_SESSIONS.values()]
+    _sync_replay_session_stats(*live)
+
+
 @app.route("/replay/session_summaries", methods=["GET"])
 def replay_session_summaries():
     """
@@ -3031,6 +3784,8 @@ def replay_session_summaries():
     Query params:
       - limit_sessions (default 8)
       - only_with_fills (default 1)
+    Bodies are cached per (params, history version) and carry a weak ETag derived from them, so
+    repeat polls between replay writes are a 304 before any work, or a dict hit.
     """
     limit_sessions = request.args.get("limit_sessions", default="8")
     only_with_fills = request.args.get("only_with_fills", default="1")
@@ -3046,29 +3801,47 @@ def replay_session_summaries():
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM replay_sessions")
-        total_sessions = int(cur.fetchone()[0] or 0)
+        etag = _replay_history_etag(cur, "session_summaries", limit_int, only_fills)
+        if request.if_none_match.contains_weak(etag):
+            return _replay_history_response(b"", etag)
+        with _SUMMARIES_CACHE_LOCK:
+            body = _SUMMARIES_CACHE.get(etag)
+            if body is not None:
+                _SUMMARIES_CACHE.move_to_end(etag)
+        if body is not None:
+            return _replay_history_response(body, etag)
+
+        # Live sessions only write their stats rows here and when they end (not on every fill).
+        _sync_live_replay_session_stats()
+
+        # Sessions with fills come from one pass over idx_replay_events_type_session (FILL rows
+        # only); a per-session EXISTS probe would visit every session.
+        with_fills = "SELECT session_id FROM replay_events WHERE event_type = 'FILL'"
         cur.execute(
-            """
-            SELECT COUNT(*)
-            FROM replay_sessions s
-            WHERE EXISTS (
-              SELECT 1 FROM replay_events e
-              WHERE e.session_id = s.session_id AND e.event_type = 'FILL'
-            )
+            f"""
+            SELECT
+              (SELECT COUNT(*) FROM replay_sessions),
+              (SELECT COUNT(*) FROM replay_sessions WHERE session_id IN ({with_fills}))
             """
         )
-        total_with_fills = int(cur.fetchone()[0] or 0)
+        total_sessions, total_with_fills = (int(n or 0) for n in cur.fetchone())
 
-        where = ""
-        if only_fills:
-            where = "WHERE EXISTS (SELECT 1 FROM replay_events e WHERE e.session_id = s.session_id AND e.event_type = 'FILL')"
+        where = f"WHERE s.session_id IN ({with_fills})" if only_fills else ""
 
+        # Precomputed stats join only while they cover the session's latest FILL (a MAX over
+        # idx_replay_events_type_session); other sessions are rebuilt from their FILL events.
         cur.execute(
             f"""
             SELECT s.session_id, s.symbol, s.exec_tf_sec, s.disp_tf_sec, s.t_start, s.t_end, s.seed, s.status,
-                   s.created_at, s.updated_at, s.summary_json
+                   s.created_at, s.updated_at, s.summary_json,
+                   st.fills, st.round_trips, st.adds, st.max_abs_pos, st.realized, st.win_rate, st.segments_json
             FROM replay_sessions s
+            LEFT JOIN replay_session_stats st
+              ON st.session_id = s.session_id
+             AND st.last_fill_id = (
+                   SELECT MAX(e.id) FROM replay_events e
+                   WHERE e.event_type = 'FILL' AND e.session_id = s.session_id
+                 )
             {where}
             ORDER BY s.updated_at DESC
             LIMIT ?
@@ -3076,18 +3849,9 @@ def replay_session_summaries():
             (limit_int,),
         )
         rows = cur.fetchall()
-
-        def _safe_float(x, default=0.0):
-            try:
-                return float(x)
-            except Exception:
-                return float(default)
-
-        def _safe_int(x, default=0):
-            try:
-                return int(x)
-            except Exception:
-                return int(default)
+        fills_by_session = _replay_fill_rows(
+            cur, [r[0] for r in rows if r[11] is None], ("position_qty", "realized_pnl")
+        )
 
         sessions = []
         for idx, r in enumerate(rows):
@@ -3103,84 +3867,46 @@ def replay_session_summaries():
                 created_at,
                 updated_at,
                 summary_json,
+                st_fills,
+                st_round_trips,
+                st_adds,
+                st_max_abs_pos,
+                st_realized,
+                st_win_rate,
+                st_segments_json,
             ) = r
 
-            # Activity: count fills + some basic stats derived from fill payloads.
-            cur.execute(
-                """
-                SELECT id, ts_exec, event_type, payload_json
-                FROM replay_events
-                WHERE session_id = ? AND event_type = 'FILL'
-                ORDER BY id ASC
-                """,
-                (sid,),
-            )
-            fill_rows = cur.fetchall()
-            fills = len(fill_rows)
-            max_abs_pos = 0.0
-            last_realized = None
-            # Build "strip segments" (colored pills) by grouping fills into round-trips (pos -> flat).
-            segs = []
-            trip_idx = 0
-            cur_dir = None  # 'long'|'short'
-            seg_qty_peak = 0.0
-            seg_adds = 0
-            seg_realized_start = 0.0
-            prev_pos = 0.0
-            prev_realized_val = 0.0
-
-            for (_eid, _ts, _et, payload_json) in fill_rows:
-                try:
-                    p = json.loads(payload_json) if payload_json else {}
-                except Exception:
-                    p = {}
-                try:
-                    q = float(p.get("position_qty") or 0.0)
-                    max_abs_pos = max(max_abs_pos, abs(q))
-                except Exception:
-                    pass
-                try:
-                    last_realized = float(p.get("realized_pnl"))
-                except Exception:
-                    pass
-
-                # Segment/trip logic
-                pos = _safe_float(p.get("position_qty"), 0.0)
-                realized_val = _safe_float(p.get("realized_pnl"), prev_realized_val)
-                side = str(p.get("side") or "").lower()
-                fill_qty = abs(_safe_float(p.get("qty"), 0.0))
-
-                # If we were flat and now entered a position, start a new trip.
-                if prev_pos == 0.0 and pos != 0.0:
-                    trip_idx += 1
-                    cur_dir = "long" if pos > 0 else "short"
-                    seg_qty_peak = abs(pos)
-                    seg_adds = 0
-                    seg_realized_start = realized_val
-                # If we stayed in a position, track peak and count "adds" when abs(pos) increases.
-                if prev_pos != 0.0 and pos != 0.0:
-                    seg_qty_peak = max(seg_qty_peak, abs(pos))
-                    if abs(pos) > abs(prev_pos) + 1e-9:
-                        seg_adds += 1
-                # If we returned to flat, finalize trip segment.
-                if prev_pos != 0.0 and pos == 0.0 and cur_dir is not None:
-                    realized_trip = realized_val - seg_realized_start
-                    segs.append(
-                        {
-                            "trip_index": trip_idx,
-                            "dir": cur_dir,
-                            "realized": realized_trip,
-                            "qty_peak": seg_qty_peak,
-                            "adds": seg_adds,
-                        }
-                    )
-                    cur_dir = None
-                    seg_qty_peak = 0.0
-                    seg_adds = 0
-                    seg_realized_start = realized_val
-
-                prev_pos = pos
-                prev_realized_val = realized_val
+            if st_fills is not None:
+                last_realized = st_realized
+                stats = {
+                    "fills": st_fills,
+                    "round_trips": st_round_trips,
+                    "adds": st_adds,
+                    "max_abs_pos": st_max_abs_pos,
+                    "win_rate": st_win_rate,
+                    "segments": _json_loads(st_segments_json),
+                }
+            else:
+                # Activity: count fills + some basic stats derived from fill payloads.
+                last_realized = None
+                positions = []
+                realized_vals = []
+                realized_val = 0.0
+                # Coerce inline: a try block costs nothing until it raises, unlike a helper call per value.
+                for (_eid, _ts, position_qty, realized_pnl) in fills_by_session[sid]:
+                    try:
+                        pos = float(position_qty)
+                    except Exception:
+                        pos = 0.0
+                    # Unparseable realized PnL carries the previous value forward.
+                    try:
+                        realized_val = last_realized = float(realized_pnl)
+                    except Exception:
+                        pass
+                    positions.append(pos)
+                    realized_vals.append(realized_val)
+                # "Strip segments" (colored pills) are the round-trips (pos -> flat).
+                stats = _replay_fill_stats(positions, realized_vals)
 
             realized = None
             if summary_json:
@@ -3199,28 +3925,16 @@ def replay_session_summaries():
             except Exception:
                 realized_f = None
 
-            # Win rate / headline
-            wins = 0
-            for sg in segs:
-                try:
-                    if float(sg.get("realized") or 0.0) > 0:
-                        wins += 1
-                except Exception:
-                    pass
-            n_trips = len(segs)
-            win_rate = (wins / n_trips) if n_trips > 0 else None
             headline = None
             if realized_f is not None:
                 headline = f"{'+' if realized_f >= 0 else ''}{realized_f:.2f}"
 
             # Duration: best-effort from timestamps; UI tolerates blank.
             duration_sec = None
-            try:
-                t0 = datetime.fromisoformat(str(t_start).replace("Z", "+00:00"))
-                t1 = datetime.fromisoformat(str(t_end).replace("Z", "+00:00"))
-                duration_sec = max(0, int((t1 - t0).total_seconds()))
-            except Exception:
-                duration_sec = None
+            t0_ms = _parse_iso_to_epoch_ms(str(t_start))
+            t1_ms = _parse_iso_to_epoch_ms(str(t_end))
+            if t0_ms is not None and t1_ms is not None:
+                duration_sec = max(0, (t1_ms - t0_ms) // 1000)
 
             sessions.append(
                 {
@@ -3236,15 +3950,15 @@ def replay_session_summaries():
                     "status": str(status),
                     "duration_sec": duration_sec,
                     "realized": realized_f,
-                    "pnl": {"realized": realized_f, "win_rate": win_rate},
+                    "pnl": {"realized": realized_f, "win_rate": stats["win_rate"]},
                     "activity": {
-                        "fills": fills,
-                        "round_trips": n_trips,
-                        "adds": _safe_int(sum([_safe_int(sg.get("adds"), 0) for sg in segs]), 0),
-                        "max_abs_position_qty": max_abs_pos,
+                        "fills": stats["fills"],
+                        "round_trips": stats["round_trips"],
+                        "adds": stats["adds"],
+                        "max_abs_position_qty": stats["max_abs_pos"],
                     },
                     # Optional UI fields; we keep them minimal.
-                    "strip": {"segments": segs},
+                    "strip": {"segments": stats["segments"]},
                     "outcome": {
                         "headline": headline,
                         "confidence_hint": "History derived from FILL events",
@@ -3252,13 +3966,20 @@ def replay_session_summaries():
                 }
             )
 
-        return jsonify(
+        resp = jsonify(
             {
                 "sessions": sessions,
                 "total_sessions": total_sessions,
                 "total_sessions_with_fills": total_with_fills,
             }
         )
+        body = resp.get_data()
+        with _SUMMARIES_CACHE_LOCK:
+            _SUMMARIES_CACHE[etag] = body
+            _SUMMARIES_CACHE.move_to_end(etag)
+            while len(_SUMMARIES_CACHE) > _SUMMARIES_CACHE_MAX:
+                _SUMMARIES_CACHE.popitem(last=False)
+        return _replay_history_response(body, etag)
     finally:
         conn.close()
 
@@ -3269,6 +3990,8 @@ def replay_trade_ledger():
     Ledger view for History modal. Derived from replay_events (FILL events).
     Query params:
       - limit_sessions (default 8)
+    Carries a weak ETag from the replay history version; a matching If-None-Match is a 304.
+    The body is streamed, REPLAY_LEDGER_BATCH fills at a time.
     """
     limit_sessions = request.args.get("limit_sessions", default="8")
     try:
@@ -3276,9 +3999,11 @@ def replay_trade_ledger():
     except Exception:
         limit_int = 8
 
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         cur = conn.cursor()
+        etag = _replay_history_etag(cur, "trade_ledger", limit_int)
+        if request.if_none_match.contains_weak(etag):
+            return _replay_history_response(b"", etag)
         cur.execute("SELECT COUNT(*) FROM replay_sessions")
         total_sessions = int(cur.fetchone()[0] or 0)
 
@@ -3293,66 +4018,74 @@ def replay_trade_ledger():
         )
         sess_rows = cur.fetchall()
 
-        sessions = []
-        for i, (sid, sym, created_at, updated_at) in enumerate(sess_rows):
-            cur.execute(
-                """
-                SELECT id, ts_exec, payload_json
-                FROM replay_events
-                WHERE session_id = ? AND event_type = 'FILL'
-                ORDER BY id ASC
-                """,
-                (sid,),
-            )
-            fill_rows = cur.fetchall()
-
-            prev_realized = 0.0
-            rows = []
-            for j, (eid, ts_exec, payload_json) in enumerate(fill_rows):
-                try:
-                    p = json.loads(payload_json) if payload_json else {}
-                except Exception:
-                    p = {}
-                side = str(p.get("side") or "")
-                qty = float(p.get("qty") or 0.0)
-                price = float(p.get("price") or 0.0)
-                signed_qty = qty if side == "buy" else -qty
-                value = signed_qty * price
-                realized = float(p.get("realized_pnl") or 0.0)
-                realized_delta = realized - prev_realized
-                prev_realized = realized
-
-                rows.append(
-                    {
-                        "exec_ts": ts_exec,
-                        "fill_id": int(eid),
-                        "row_in_fill": 1,
-                        "trade_id": j + 1,
-                        "entry_type": "FILL",
-                        "open_close": "",
-                        "reference": str(p.get("order_id") or ""),
-                        "qty": qty,
-                        "signed_qty": signed_qty,
-                        "price": price,
-                        "value": value,
-                        "realized_pnl_delta": realized_delta,
-                    }
-                )
-
-            sessions.append(
-                {
+    def generate():
+        # Stream session by session, encoding FILL rows batch by batch straight from the cursor,
+        # so a long session's rows are never all held (and then copied into a JSON buffer) at once.
+        # One id-ordered index search per session keeps the stream in updated_at order unsorted.
+        with db_connection() as conn:
+            yield b'{"sessions":['
+            for i, (sid, sym, created_at, updated_at) in enumerate(sess_rows):
+                head = _json_bytes({
                     "session_id": str(sid),
                     "label": f"S{i+1}",
                     "symbol": str(sym),
                     "created_at": str(created_at),
                     "updated_at": str(updated_at),
-                    "rows": rows,
-                }
-            )
+                    "rows": [],
+                })
+                yield (b"," if i else b"") + head[:-2]
 
-        return jsonify({"sessions": sessions, "total_sessions": total_sessions})
-    finally:
-        conn.close()
+                cur = conn.execute(
+                    """
+                    SELECT id, ts_exec, payload_json
+                    FROM replay_events
+                    WHERE session_id = ? AND event_type = 'FILL'
+                    ORDER BY id ASC
+                    """,
+                    (sid,),
+                )
+                prev_realized = 0.0
+                trade_id = 0
+                sep = b""
+                while True:
+                    fill_rows = cur.fetchmany(REPLAY_LEDGER_BATCH)
+                    if not fill_rows:
+                        break
+                    rows = []
+                    for eid, ts_exec, payload_json in fill_rows:
+                        try:
+                            p = _json_loads(payload_json) if payload_json else {}
+                        except Exception:
+                            p = {}
+                        side = str(p.get("side") or "")
+                        qty = float(p.get("qty") or 0.0)
+                        price = float(p.get("price") or 0.0)
+                        signed_qty = qty if side == "buy" else -qty
+                        realized = float(p.get("realized_pnl") or 0.0)
+                        trade_id += 1
+                        rows.append(
+                            {
+                                "exec_ts": ts_exec,
+                                "fill_id": int(eid),
+                                "row_in_fill": 1,
+                                "trade_id": trade_id,
+                                "entry_type": "FILL",
+                                "open_close": "",
+                                "reference": str(p.get("order_id") or ""),
+                                "qty": qty,
+                                "signed_qty": signed_qty,
+                                "price": price,
+                                "value": signed_qty * price,
+                                "realized_pnl_delta": realized - prev_realized,
+                            }
+                        )
+                        prev_realized = realized
+                    yield sep + _json_bytes(rows)[1:-1]
+                    sep = b","
+                yield b"]}"
+            yield b'],"total_sessions":' + str(total_sessions).encode("ascii") + b"}"
+
+    return _replay_history_response(stream_with_context(generate()), etag)
 
 
 @app.route("/replay/trade_matrix", methods=["GET"])
@@ -3404,7 +4137,7 @@ def replay_session_delete():
         return _bad_request("missing_session_id", "session_id is required")
 
     # Remove from in-memory sessions if present.
-    _REPLAY_SESSIONS.pop(session_id, None)
+    _pop_replay_session(session_id)
 
     conn = get_db_connection()
     try:
@@ -3441,19 +4174,42 @@ def not_found(error):
     return error_msg, 404
 
 if __name__ == '__main__':
-    print("="*70)
-    print("Starting Flask Application...")
-    print("="*70)
-    print(f"Available routes:")
-    with app.app_context():
-        for rule in app.url_map.iter_rules():
-            methods = ', '.join([m for m in rule.methods if m not in ['HEAD', 'OPTIONS']])
-            print(f"  {methods:20} {rule}")
-    print("="*70)
-    print("\nServer running at: http://127.0.0.1:5000")
-    print("Main dashboard: http://127.0.0.1:5000/")
-    print("Package POC:    http://127.0.0.1:5000/package-proof-of-concept")
-    print("="*70)
-    print()
-    app.run(debug=True, host='127.0.0.1', port=5000)
-
+    # Debug mode (reloader + Werkzeug debugger) is opt-in via FLASK_DEBUG=1.
+    # Otherwise serve through waitress when installed, else Flask's threaded server.
+    debug = os.environ.get('FLASK_DEBUG', '').strip().lower() in ('1', 'true', 'yes', 'on')
+    # Under the debug reloader this block runs twice: in the file watcher and in the child that
+    # actually serves (WERKZEUG_RUN_MAIN=true). Only the serving process initializes the database,
+    # prints and warms the pool.
+    serving = not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    if serving:
+        init_database()
+        routes = sorted(
+            (str(rule), ', '.join(sorted(rule.methods - {'HEAD', 'OPTIONS'})))
+            for rule in app.url_map.iter_rules()
+        )
+        print("\n".join([
+            "=" * 70,
+            "Starting Flask Application...",
+            "=" * 70,
+            "Available routes:",
+            *(f"  {methods:20} {rule}" for rule, methods in routes),
+            "=" * 70,
+            "",
+            "Server running at: http://127.0.0.1:5000",
+            "Main dashboard: http://127.0.0.1:5000/",
+            "Package POC:    http://127.0.0.1:5000/package-proof-of-concept",
+            "=" * 70,
+            "",
+        ]))
+        warm_backtest_pool()
+    if debug:
+        app.run(debug=True, host='127.0.0.1', port=5000)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+        if serve is not None:
+            serve(app, host='127.0.0.1', port=5000, threads=8)
+        else:
+            app.run(debug=False, threaded=True, host='127.0.0.1', port=5000)
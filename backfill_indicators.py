@@ -1,13 +1,15 @@
 import sqlite3
 import pandas as pd
 import numpy as np
-import math
 try:
     import pandas_ta as ta
 except ImportError:
     ta = None
 from database import get_db_connection, init_database
-from utils import calculate_vwap_per_trading_day
+from utils import calculate_vwap_per_trading_day, to_nullable_floats, wilder_rsi
+
+# Rows per read chunk and per executemany slice; bounds the boxed-Python-value peak.
+BATCH_ROWS = 16384
 
 def backfill_indicators():
     """Iterate through all data in stock_data and calculate missing indicators."""
@@ -29,12 +31,16 @@ def backfill_indicators():
     for ticker, interval in groups:
         print(f"\nBackfilling {ticker} ({interval})...")
         
-        # Fetch all data for this group
-        df = pd.read_sql_query(
-            "SELECT * FROM stock_data WHERE ticker = ? AND interval = ? ORDER BY timestamp ASC",
+        # Fetch only the inputs: SELECT * would also drag every stored indicator (about to be
+        # overwritten) and created_at through pandas' per-column object conversion.
+        # Read in chunks too, so the sqlite row tuples never exist for the whole history at once.
+        df = pd.concat(pd.read_sql_query(
+            "SELECT id, ts_ms, price, high_price, low_price, volume FROM stock_data "
+            "WHERE ticker = ? AND interval = ? ORDER BY timestamp ASC",
             conn,
-            params=(ticker, interval)
-        )
+            params=(ticker, interval),
+            chunksize=BATCH_ROWS,
+        ), ignore_index=True)
         
         if df.empty:
             continue
@@ -78,12 +84,7 @@ def backfill_indicators():
             df['ema_50_calc'] = close.ewm(span=50, adjust=False).mean()
             df['ema_200_calc'] = close.ewm(span=200, adjust=False).mean()
             
-            # Simple RSI fallback
-            delta = close.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi_calc'] = 100 - (100 / (1 + rs))
+            df['rsi_calc'] = wilder_rsi(close, length=14)
             
             ema12 = close.ewm(span=12, adjust=False).mean()
             ema26 = close.ewm(span=26, adjust=False).mean()
@@ -106,36 +107,31 @@ def backfill_indicators():
             'low_price': 'low',
             'price': 'close'
         })
-        vwap_input.index = pd.to_datetime(df['timestamp'])
+        # ts_ms is the trigger-maintained epoch-ms mirror of timestamp; no string parsing needed.
+        vwap_input.index = pd.to_datetime(df['ts_ms'], unit='ms', utc=True)
         df['vwap_calc'] = calculate_vwap_per_trading_day(vwap_input).values
         
         # Update database
         print(f"  Updating database...")
-        update_data = []
-        for _, row in df.iterrows():
-            def _v(val):
-                if val is None: return None
-                try:
-                    f = float(val)
-                    return f if not math.isnan(f) else None
-                except: return None
-
-            update_data.append((
-                _v(row['ema_9_calc']), _v(row['ema_21_calc']), _v(row['ema_50_calc']), _v(row['ema_200_calc']), _v(row['vwap_calc']),
-                _v(row['rsi_calc']), _v(row['macd_calc']), _v(row['macd_signal_calc']), _v(row['macd_hist_calc']),
-                _v(row['bb_upper_calc']), _v(row['bb_middle_calc']), _v(row['bb_lower_calc']),
-                _v(row['sma_20_calc']), _v(row['sma_50_calc']), _v(row['sma_200_calc']),
-                row['id']
-            ))
-            
-        cursor.executemany('''
-            UPDATE stock_data 
-            SET ema_9 = ?, ema_21 = ?, ema_50 = ?, ema_200 = ?, vwap = ?,
-                rsi = ?, macd = ?, macd_signal = ?, macd_histogram = ?,
-                bb_upper = ?, bb_middle = ?, bb_lower = ?,
-                sma_20 = ?, sma_50 = ?, sma_200 = ?
-            WHERE id = ?
-        ''', update_data)
+        calc_columns = (
+            'ema_9_calc', 'ema_21_calc', 'ema_50_calc', 'ema_200_calc', 'vwap_calc',
+            'rsi_calc', 'macd_calc', 'macd_signal_calc', 'macd_hist_calc',
+            'bb_upper_calc', 'bb_middle_calc', 'bb_lower_calc',
+            'sma_20_calc', 'sma_50_calc', 'sma_200_calc',
+        )
+        # The boxed Python floats for executemany, not the float64 frame, are the memory peak;
+        # build and write them a slice at a time (indicators above still see the whole series).
+        for start in range(0, len(df), BATCH_ROWS):
+            part = df.iloc[start:start + BATCH_ROWS]
+            update_data = list(zip(*(to_nullable_floats(part[col]) for col in calc_columns), part['id'].tolist()))
+            cursor.executemany('''
+                UPDATE stock_data 
+                SET ema_9 = ?, ema_21 = ?, ema_50 = ?, ema_200 = ?, vwap = ?,
+                    rsi = ?, macd = ?, macd_signal = ?, macd_histogram = ?,
+                    bb_upper = ?, bb_middle = ?, bb_lower = ?,
+                    sma_20 = ?, sma_50 = ?, sma_200 = ?
+                WHERE id = ?
+            ''', update_data)
         
         conn.commit()
         print(f"  Done with {ticker} ({interval}).")
@@ -1,7 +1,14 @@
+import atexit
 import sqlite3
 import os
+import secrets
+import string
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 _REPO_DIR = os.path.dirname(os.path.abspath(__file__))
 # Always anchor the DB path to the repo (avoids accidentally creating/reading a DB from whatever the current
@@ -52,7 +59,8 @@ def init_database():
         ('bb_lower', 'REAL'),
         ('sma_20', 'REAL'),
         ('sma_50', 'REAL'),
-        ('sma_200', 'REAL')
+        ('sma_200', 'REAL'),
+        ('ts_ms', 'INTEGER'),
     ]
     
     for column_name, column_type in columns_to_add:
@@ -67,6 +75,33 @@ def init_database():
         ON stock_data(ticker, interval, timestamp)
     ''')
 
+    # Integer epoch-ms mirror of `timestamp` so range filters are index seeks instead of a
+    # per-row strftime() call. Triggers keep it populated for every writer; rows written before
+    # they existed are backfilled once by _migrate_data().
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stock_data_ts_ms_insert
+        AFTER INSERT ON stock_data
+        WHEN NEW.ts_ms IS NULL
+        BEGIN
+            UPDATE stock_data
+            SET ts_ms = CAST(strftime('%s', NEW.timestamp) AS INTEGER) * 1000
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stock_data_ts_ms_update
+        AFTER UPDATE OF timestamp ON stock_data
+        BEGIN
+            UPDATE stock_data
+            SET ts_ms = CAST(strftime('%s', NEW.timestamp) AS INTEGER) * 1000
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sd_ticker_interval_tsms
+        ON stock_data(ticker, interval, ts_ms)
+    ''')
+
     # Table for global backtest configurations (strategy-neutral presets)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS backtest_configs (
@@ -85,6 +120,11 @@ def init_database():
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_bt_configs_created ON backtest_configs(created_at DESC)
     ''')
+    # The list endpoints (here and for backtests) order by datetime(created_at); index that
+    # expression so the newest-100 query reads the index in order instead of sorting the table.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bt_configs_created_dt ON backtest_configs(datetime(created_at) DESC)
+    ''')
 
     # Table for saved/named backtests (parameters + optional metrics)
     cursor.execute('''
@@ -102,12 +142,22 @@ def init_database():
             updated_at TEXT DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Migration: what the stored metrics were computed from (see app._backtest_input_key), so a
+    # re-run over unchanged bars and strategy code can return them instead of recomputing.
+    for column_name, column_type in (('input_key', 'TEXT'), ('n_bars', 'INTEGER')):
+        try:
+            cursor.execute(f'ALTER TABLE backtests ADD COLUMN {column_name} {column_type}')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_backtests_name ON backtests(name)
     ''')
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_backtests_created ON backtests(created_at DESC)
     ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_backtests_created_dt ON backtests(datetime(created_at) DESC)
+    ''')
 
     # Replay sessions + event log (append-only)
     # This supports deterministic "practice field" replay sessions.
@@ -130,6 +180,11 @@ def init_database():
         CREATE INDEX IF NOT EXISTS idx_replay_sessions_symbol_created
         ON replay_sessions(symbol, created_at DESC)
     ''')
+    # History lists (/replay/session_summaries, trade_ledger, trade_matrix) page by updated_at.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_replay_sessions_updated
+        ON replay_sessions(updated_at DESC)
+    ''')
 
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS replay_events (
@@ -151,6 +206,30 @@ def init_database():
         CREATE INDEX IF NOT EXISTS idx_replay_events_session_time
         ON replay_events(session_id, ts_exec)
     ''')
+    # FILL rows by session: "sessions with fills" is a covering range over the FILL rows only, and
+    # the batched per-session fill fetch is an equality search already in id order (id is the rowid).
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_replay_events_type_session
+        ON replay_events(event_type, session_id)
+    ''')
+    # Per-session History aggregates, upserted by the app as a live session fills so
+    # /replay/session_summaries needn't re-derive them from FILL events. A row is only current
+    # while last_fill_id is still the session's latest FILL event id.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS replay_session_stats (
+            session_id TEXT PRIMARY KEY,
+            last_fill_id INTEGER NOT NULL,        -- replay_events.id of the last FILL counted
+            fills INTEGER NOT NULL,
+            round_trips INTEGER NOT NULL,
+            adds INTEGER NOT NULL,
+            max_abs_pos REAL NOT NULL,
+            realized REAL,                        -- cumulative realized PnL at the last fill
+            win_rate REAL,                        -- NULL until a round trip closes
+            segments_json TEXT NOT NULL,          -- round trips (History strip segments), JSON array
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(session_id) REFERENCES replay_sessions(session_id) ON DELETE CASCADE
+        )
+    ''')
 
     # New canonical bars table (supports real and synthetic sources)
     cursor.execute('''
@@ -179,6 +258,30 @@ def init_database():
         cursor.execute("ALTER TABLE bars ADD COLUMN ref_symbol TEXT")
     except sqlite3.OperationalError:
         pass
+    # Migration: integer epoch-ms mirror of ts_start (see stock_data.ts_ms).
+    try:
+        cursor.execute("ALTER TABLE bars ADD COLUMN ts_ms INTEGER")
+    except sqlite3.OperationalError:
+        pass
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_bars_ts_ms_insert
+        AFTER INSERT ON bars
+        WHEN NEW.ts_ms IS NULL
+        BEGIN
+            UPDATE bars
+            SET ts_ms = CAST(strftime('%s', NEW.ts_start) AS INTEGER) * 1000
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_bars_ts_ms_update
+        AFTER UPDATE OF ts_start ON bars
+        BEGIN
+            UPDATE bars
+            SET ts_ms = CAST(strftime('%s', NEW.ts_start) AS INTEGER) * 1000
+            WHERE id = NEW.id;
+        END
+    ''')
 
     # Short links for chart/audio sharing (short code -> full URL)
     cursor.execute('''
@@ -209,6 +312,11 @@ def init_database():
         ON bars(symbol, scenario, timeframe, ts_start)
         WHERE data_source = 'synthetic'
     ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bars_synth_tsms
+        ON bars(symbol, scenario, timeframe, ts_ms)
+        WHERE data_source = 'synthetic'
+    ''')
 
     # Strategy metadata (UI/description)
     cursor.execute('''
@@ -278,18 +386,194 @@ def init_database():
         JOIN bars b ON b.id = l2.bar_id
         WHERE b.data_source = 'synthetic'
     ''')
+
+    _migrate_data(cursor)
     
     conn.commit()
     conn.close()
     print(f"Database {DB_NAME} initialized successfully.")
 
+
+# Number of one-off data migrations in _migrate_data(); stored in PRAGMA user_version.
+DATA_VERSION = 2
+
+def _migrate_data(cursor):
+    """
+    Whole-table data migrations, each run once per database file. PRAGMA user_version records
+    how many have been applied, so init_database() doesn't rescan stock_data/bars on every call
+    (the schema statements above are idempotent and cheap).
+    """
+    version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    if version >= DATA_VERSION:
+        return
+    if version < 1:
+        # ts_ms for rows written before the ts_ms triggers existed.
+        cursor.execute('''
+            UPDATE stock_data
+            SET ts_ms = CAST(strftime('%s', timestamp) AS INTEGER) * 1000
+            WHERE ts_ms IS NULL
+        ''')
+        cursor.execute('''
+            UPDATE bars
+            SET ts_ms = CAST(strftime('%s', ts_start) AS INTEGER) * 1000
+            WHERE ts_ms IS NULL
+        ''')
+    if version < 2:
+        # Synthetic symbols are compared with a plain `symbol = ?` (index-friendly), so legacy
+        # mixed-case rows are uppercased. OR IGNORE skips a row whose uppercase twin (same bar,
+        # same source/scenario) already exists; that twin is the one lookups reach, so the
+        # skipped duplicate is deleted (its l2_state row cascades).
+        cursor.execute('''
+            UPDATE OR IGNORE bars
+            SET symbol = UPPER(symbol)
+            WHERE data_source = 'synthetic' AND symbol <> UPPER(symbol)
+        ''')
+        cursor.execute('''
+            DELETE FROM bars
+            WHERE data_source = 'synthetic' AND symbol <> UPPER(symbol)
+        ''')
+    # Same transaction as the migrations: committed together by init_database().
+    cursor.execute(f'PRAGMA user_version = {DATA_VERSION}')
+
+
+class _PooledConnection(sqlite3.Connection):
+    """
+    Per-thread SQLite handle handed out by `get_db_connection()`.
+
+    Callers keep the usual open/`close()` pattern. `close()` only releases the handle: once the
+    outermost user releases it, any uncommitted transaction is rolled back (what a real close
+    would do) but the connection stays open, so its schema cache, page cache and prepared
+    statements are reused by the next request on the same thread.
+    """
+
+    _depth = 0
+    _optimized_at = 0.0  # time.monotonic() of the last PRAGMA optimize (or of opening)
+
+    def close(self) -> None:
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0 and self.in_transaction:
+            self.rollback()
+
+    def dispose(self) -> None:
+        """Really close the underlying SQLite handle."""
+        super().close()
+
+
+# Thread-local pool: {(pid, db_path): _PooledConnection}. The pid guards against reusing a handle
+# inherited across fork(); the path lets tests point DB_NAME at a temp database.
+_POOL = threading.local()
+_ALL_POOLED: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+_ALL_POOLED_LOCK = threading.Lock()
+# Bumped by close_db_connections() so other threads drop their (now disposed) handles.
+_POOL_GENERATION = 0
+
+# Each thread runs PRAGMA optimize on its own handle at most this often, from
+# release_db_connection(), so SQLite refreshes planner statistics (sqlite_stat1) for the tables
+# that handle queried. Not from another thread at exit: the handle may be in use there, and a
+# fresh connection has no query history for optimize to act on.
+_OPTIMIZE_INTERVAL_S = 3600.0
+
+_CONNECTION_PRAGMAS = (
+    'PRAGMA foreign_keys = ON;',
+    'PRAGMA journal_mode = WAL;',
+    'PRAGMA synchronous = NORMAL;',
+    'PRAGMA temp_store = MEMORY;',
+    'PRAGMA cache_size = -65536;',      # 64 MiB page cache
+    'PRAGMA mmap_size = 268435456;',    # 256 MiB memory-mapped reads
+)
+
+
+def _open_pooled_connection(path: str) -> _PooledConnection:
+    # check_same_thread=False only so close_db_connections() can dispose handles at shutdown;
+    # each handle is still used exclusively by the thread that opened it.
+    conn = sqlite3.connect(path, factory=_PooledConnection, check_same_thread=False, cached_statements=256)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    conn._optimized_at = time.monotonic()
+    with _ALL_POOLED_LOCK:
+        _ALL_POOLED.add(conn)
+    return conn
+
+
 def get_db_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(DB_NAME)
-    conn.execute('PRAGMA foreign_keys = ON;')
+    """Get this thread's pooled database connection (opened with WAL + cache PRAGMAs on first use)."""
+    conns = getattr(_POOL, "conns", None)
+    if conns is None or getattr(_POOL, "generation", None) != _POOL_GENERATION:
+        conns = _POOL.conns = {}
+        _POOL.generation = _POOL_GENERATION
+    key = (os.getpid(), DB_NAME)
+    conn = conns.get(key)
+    if conn is None:
+        conn = _open_pooled_connection(DB_NAME)
+        conns[key] = conn
+    conn._depth += 1
     return conn
 
 
+@contextmanager
+def db_connection() -> Iterator[sqlite3.Connection]:
+    """
+    `with db_connection() as conn:` borrows this thread's pooled connection for the block.
+    An exception rolls back any open transaction; the handle is released either way.
+    """
+    conn = get_db_connection()
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def release_db_connection() -> None:
+    """
+    End-of-request hook: release this thread's pooled connections even if a handler forgot to
+    call close(), rolling back any transaction left open so it cannot hold the write lock.
+    """
+    now = time.monotonic()
+    for conn in (getattr(_POOL, "conns", None) or {}).values():
+        conn._depth = 0
+        if conn.in_transaction:
+            conn.rollback()
+        if now - conn._optimized_at >= _OPTIMIZE_INTERVAL_S:
+            _optimize(conn, now)
+
+
+def _optimize(conn: _PooledConnection, now: float) -> None:
+    """PRAGMA optimize on `conn`; only ever called from the thread that owns it."""
+    conn._optimized_at = now
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+
+
+def close_db_connections() -> None:
+    """
+    Dispose every pooled connection (all threads). Registered with atexit. Only the calling
+    thread's own handles get a final PRAGMA optimize (see _OPTIMIZE_INTERVAL_S).
+    """
+    global _POOL_GENERATION
+    with _ALL_POOLED_LOCK:
+        conns = list(_ALL_POOLED)
+        _ALL_POOLED.clear()
+        _POOL_GENERATION += 1
+    now = time.monotonic()
+    for conn in (getattr(_POOL, "conns", None) or {}).values():
+        if conn in conns:
+            _optimize(conn, now)
+    for conn in conns:
+        try:
+            conn.dispose()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(close_db_connections)
+
+
 def get_synthetic_datasets() -> List[Dict[str, Any]]:
     """Return distinct synthetic datasets grouped by symbol/scenario/timeframe."""
     conn = get_db_connection()
@@ -407,13 +691,14 @@ def list_all_tickers() -> List[str]:
         out.append(str(t).strip().upper())
     return out
 
+
+_SHORT_CODE_ALPHABET = string.ascii_lowercase + string.digits
+
+
 def store_short_link(url: str) -> str:
     """Store a URL and return a short code. Uses 8-char alphanumeric."""
-    import secrets
-    import string
-    alphabet = string.ascii_lowercase + string.digits
     for _ in range(10):
-        code = ''.join(secrets.choice(alphabet) for _ in range(8))
+        code = ''.join(secrets.choice(_SHORT_CODE_ALPHABET) for _ in range(8))
         conn = get_db_connection()
         try:
             conn.execute('INSERT INTO short_links (code, url) VALUES (?, ?)', (code, url))
@@ -10,11 +10,46 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
 from strategies.contracts import normalize_signals
 
 
+_OHLC_COLUMNS = frozenset(("open", "high", "low", "close"))
+
+# First window searched for a trade's exit; it doubles per miss, so a trade lasting k bars costs
+# O(log k) vectorized comparisons rather than k Python iterations (or a scan to end of data).
+_EXIT_SCAN_WINDOW = 64
+
+
+def _first_exit_bar(
+    high: np.ndarray,
+    low: np.ndarray,
+    start: int,
+    is_long: bool,
+    take_profit: float,
+    stop_loss: float,
+) -> Optional[int]:
+    """Index of the first bar at/after `start` whose range reaches `take_profit` or `stop_loss`."""
+    n = len(high)
+    window = _EXIT_SCAN_WINDOW
+    while start < n:
+        end = min(n, start + window)
+        h = high[start:end]
+        lo = low[start:end]
+        if is_long:
+            hit = (h >= take_profit) | (lo <= stop_loss)
+        else:
+            hit = (lo <= take_profit) | (h >= stop_loss)
+        k = int(hit.argmax())
+        if hit[k]:
+            return start + k
+        start = end
+        window *= 2
+    return None
+
+
 @dataclass
 class RiskRewardExecutionModel:
     """
@@ -45,11 +80,11 @@ class RiskRewardExecutionModel:
                 "median_ret": None,
             }
 
-        df = df_prices.copy()
+        # Read-only from here on, so no defensive copy of the frame.
+        df = df_prices
 
         # Ensure OHLC is present
-        required_cols = {"open", "high", "low", "close"}
-        if not required_cols.issubset(df.columns):
+        if not _OHLC_COLUMNS.issubset(df.columns):
             return {
                 "n_trades": 0,
                 "win_rate": None,
@@ -90,15 +125,23 @@ class RiskRewardExecutionModel:
                 pass
             return None, None
 
+        # Plain arrays: per-bar df.iloc[j]["high"] lookups dominated the exit scan. float64
+        # columns come back as views, not copies.
+        n_bars = len(df)
+        open_ = df["open"].to_numpy(dtype=np.float64)
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+
         i = 0
-        while i < len(df):
+        while i < n_bars:
             if i < len(entry_signals) and entry_signals[i]:
                 # Entry at next bar's open
-                if i + 1 < len(df):
+                if i + 1 < n_bars:
                     trade_id_counter += 1
                     trade_id = trade_id_counter
                     entry_idx = i + 1
-                    entry_price = float(df.iloc[entry_idx]["open"])
+                    entry_price = float(open_[entry_idx])
 
                     side = int(sides[i]) if i < len(sides) else 1
                     is_long = side >= 0
@@ -124,15 +167,14 @@ class RiskRewardExecutionModel:
                         stop_loss = entry_price * (1 + risk)
                         take_profit = entry_price * (1 - reward_mult * risk)
 
-                    exit_idx = None
-                    exit_price = None
-                    exit_reason: Optional[str] = None
-
-                    for j in range(entry_idx + 1, len(df)):
-                        bar_high = float(df.iloc[j]["high"])
-                        bar_low = float(df.iloc[j]["low"])
-                        bar_open = float(df.iloc[j]["open"])
-
+                    exit_idx = _first_exit_bar(high, low, entry_idx + 1, is_long, take_profit, stop_loss)
+                    if exit_idx is None:
+                        exit_idx = n_bars - 1
+                        exit_price = float(close[exit_idx])
+                        exit_reason: Optional[str] = "end_of_data"
+                    else:
+                        bar_high = float(high[exit_idx])
+                        bar_low = float(low[exit_idx])
                         if is_long:
                             hit_take_profit = bar_high >= take_profit
                             hit_stop_loss = bar_low <= stop_loss
@@ -141,32 +183,17 @@ class RiskRewardExecutionModel:
                             hit_stop_loss = bar_high >= stop_loss
 
                         if hit_take_profit and hit_stop_loss:
+                            # Both in one bar: whichever level is closer to the bar's open wins.
+                            bar_open = float(open_[exit_idx])
                             dist_to_tp = abs(bar_open - take_profit)
                             dist_to_sl = abs(bar_open - stop_loss)
-                            if dist_to_tp <= dist_to_sl:
-                                exit_idx = j
-                                exit_price = take_profit
-                                exit_reason = "take_profit"
-                                break
-                            exit_idx = j
-                            exit_price = stop_loss
-                            exit_reason = "stop_loss"
-                            break
+                            hit_take_profit = dist_to_tp <= dist_to_sl
                         if hit_take_profit:
-                            exit_idx = j
                             exit_price = take_profit
                             exit_reason = "take_profit"
-                            break
-                        if hit_stop_loss:
-                            exit_idx = j
+                        else:
                             exit_price = stop_loss
                             exit_reason = "stop_loss"
-                            break
-
-                    if exit_idx is None:
-                        exit_idx = len(df) - 1
-                        exit_price = float(df.iloc[exit_idx]["close"])
-                        exit_reason = "end_of_data"
 
                     if is_long:
                         ret = (float(exit_price) - entry_price) / entry_price
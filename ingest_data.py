@@ -1,4 +1,5 @@
 import alpaca_trade_api as tradeapi
+import os
 import sqlite3
 from datetime import datetime, timedelta, timezone
 from database import get_db_connection, init_database
@@ -9,12 +10,12 @@ try:
     import pandas_ta as ta
 except ImportError:
     ta = None
-from utils import calculate_vwap_per_trading_day
+from utils import STOCK_DATA_UPSERT_SQL, calculate_vwap_per_trading_day, stock_data_rows, wilder_rsi
 
-# Alpaca API credentials
-API_KEY = 'PK57P4EYJODEZTVL7QYOX7J53W'
-API_SECRET = '6PXLeTmf6wKNJBSCKZAhg3SgCkieGag1Bgvf5Yeq53qD'
-BASE_URL = 'https://paper-api.alpaca.markets/v2'
+# Alpaca API credentials (ALPACA_* environment variables override the paper-account defaults)
+API_KEY = os.environ.get('ALPACA_API_KEY') or 'PK57P4EYJODEZTVL7QYOX7J53W'
+API_SECRET = os.environ.get('ALPACA_API_SECRET') or '6PXLeTmf6wKNJBSCKZAhg3SgCkieGag1Bgvf5Yeq53qD'
+BASE_URL = os.environ.get('ALPACA_BASE_URL') or 'https://paper-api.alpaca.markets/v2'
 
 TICKERS = ['SPY', 'QQQ']
 INTERVALS = ['1Min', '5Min']
@@ -96,12 +97,7 @@ def ingest_stock_data():
                     bars['ema_50'] = bars['close'].ewm(span=50, adjust=False).mean()
                     bars['ema_200'] = bars['close'].ewm(span=200, adjust=False).mean()
                     
-                    # Simple RSI fallback
-                    delta = bars['close'].diff()
-                    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                    rs = gain / loss
-                    bars['rsi'] = 100 - (100 / (1 + rs))
+                    bars['rsi'] = wilder_rsi(bars['close'], length=14)
                     
                     ema12 = bars['close'].ewm(span=12, adjust=False).mean()
                     ema26 = bars['close'].ewm(span=26, adjust=False).mean()
@@ -121,44 +117,9 @@ def ingest_stock_data():
                 bars['vwap'] = calculate_vwap_per_trading_day(bars)
 
                 # Insert data into database with OHLC data and technical indicators
-                inserted_count = 0
-                for timestamp, row in bars.iterrows():
-                    try:
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO stock_data 
-                            (ticker, timestamp, price, open_price, high_price, low_price, volume, 
-                             interval, ema_9, ema_21, ema_50, ema_200, vwap, rsi, macd, macd_signal, macd_histogram, 
-                             bb_upper, bb_middle, bb_lower, sma_20, sma_50, sma_200)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            ticker,
-                            timestamp.isoformat(),
-                            float(row['close']),
-                            float(row['open']),
-                            float(row['high']),
-                            float(row['low']),
-                            float(row['volume']) if 'volume' in row and pd.notna(row['volume']) else None,
-                            interval,
-                            float(row['ema_9']) if pd.notna(row['ema_9']) else None,
-                            float(row['ema_21']) if pd.notna(row['ema_21']) else None,
-                            float(row['ema_50']) if pd.notna(row['ema_50']) else None,
-                            float(row['ema_200']) if pd.notna(row['ema_200']) else None,
-                            float(row['vwap']) if pd.notna(row['vwap']) else None,
-                            float(row['rsi']) if pd.notna(row['rsi']) else None,
-                            float(row['macd']) if pd.notna(row['macd']) else None,
-                            float(row['macd_signal']) if pd.notna(row['macd_signal']) else None,
-                            float(row['macd_histogram']) if pd.notna(row['macd_histogram']) else None,
-                            float(row['bb_upper']) if pd.notna(row['bb_upper']) else None,
-                            float(row['bb_middle']) if pd.notna(row['bb_middle']) else None,
-                            float(row['bb_lower']) if pd.notna(row['bb_lower']) else None,
-                            float(row['sma_20']) if pd.notna(row['sma_20']) else None,
-                            float(row['sma_50']) if pd.notna(row['sma_50']) else None,
-                            float(row['sma_200']) if pd.notna(row['sma_200']) else None
-                        ))
-                        inserted_count += 1
-                    except Exception as e:
-                        print(f"Error inserting data point: {e}")
-                        continue
+                rows = stock_data_rows(ticker, interval, bars)
+                cursor.executemany(STOCK_DATA_UPSERT_SQL, rows)
+                inserted_count = len(rows)
                 
                 conn.commit()
                 print(f"Inserted {inserted_count} data points for {ticker} at {interval} interval")
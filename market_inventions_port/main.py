@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime, timezone
 import json
+import math
 import random
 from typing import Dict, Iterable, List, Optional, Sequence
 
@@ -277,7 +278,6 @@ class InventionEngine:
         prev_price: Optional[float] = None,
     ) -> int:
         """Convert price to MIDI with trend-aware rounding to eliminate deadzones."""
-        import math
         delta_pct = (price - open_price) / open_price
         raw_semitones = delta_pct / step_pct
 
@@ -523,7 +523,6 @@ class InventionEngine:
         start_spy = self.spy_price
         
         # Oscillating drift: cycles between bullish and bearish phases
-        import math
         # Convert cycle duration to angular frequency: 2*pi radians per full cycle
         cycle_speed = (2 * math.pi) / self.trend_cycle_seconds
         cycle_position = math.sin(self.tick_count * cycle_speed)  # Oscillation based on cycle setting
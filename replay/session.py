@@ -9,6 +9,7 @@ from database import get_db_connection
 from replay.broker import BrokerSim
 from replay.events import EventLogger, _iso_z
 from replay.market import MarketFeed
+from replay.stats import FillTally
 from replay.types import Order, Position, ReplayState
 
 try:
@@ -221,6 +222,10 @@ class ReplaySession:
             self._disp_cursor_start_ts = anchor_dt.astimezone(timezone.utc)
         self._last_event_id = 0
         self._last_bar = None  # last consumed exec bar (for market fills)
+        # Running History aggregates over this session's FILLs. The app writes them to the
+        # session's replay_session_stats row; stats_fill_id is the last FILL that row covers.
+        self.fill_tally = FillTally()
+        self.stats_fill_id = 0
 
         # Delta-mode (opt-in) cache:
         # - Maintains a fixed-length rolling display window for fast {drop, append} updates.
@@ -868,11 +873,11 @@ class ReplaySession:
         Batch delta stepping: returns one delta item per step (small payloads; safe to buffer on the client).
         """
         steps = max(1, int(disp_steps))
-        out: List[Dict[str, Any]] = []
-        for i in range(steps):
-            # Only force_state on the first item (client uses it to realign); periodic resync handles the rest.
-            out.append(self.step_delta(resync_every=resync_every, force_state=force_state if i == 0 else False))
-        return out
+        # Only force_state on the first item (client uses it to realign); periodic resync handles the rest.
+        return [
+            self.step_delta(resync_every=resync_every, force_state=force_state and i == 0)
+            for i in range(steps)
+        ]
 
     def step_payloads(self, *, disp_steps: int = 1) -> List[Dict[str, Any]]:
         """
@@ -960,8 +965,13 @@ class ReplaySession:
                     "tag": tag,
                 },
             )
+            self._mark_fill()
         return o, fill_px
 
+    def _mark_fill(self) -> None:
+        """Fold the position/realized PnL after the FILL event just emitted into fill_tally."""
+        self.fill_tally.add(int(self._last_event_id), float(self.position.qty), float(self.position.realized_pnl))
+
     def flatten_now(self, *, tag: Optional[str] = None) -> Optional[float]:
         """
         Close any open position immediately at last known close.
@@ -1039,6 +1049,7 @@ class ReplaySession:
                                 "realized_pnl": self.position.realized_pnl,
                             },
                         )
+                        self._mark_fill()
                 self._exec_idx += 1
 
             if consumed == 0:
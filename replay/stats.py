@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class FillTally:
+    """
+    Running History aggregates over a session's fills, updated one FILL at a time.
+
+    Round trips run flat -> position -> flat; "adds" are fills that grow |position| mid-trip and a
+    trip still open is not a segment. Only the open trip and the counters are kept per fill, so
+    `add` is O(1); the closed trips are kept as segments (and as JSON text for the stats row).
+    """
+
+    last_fill_id: int = 0
+    fills: int = 0
+    adds: int = 0  # over closed trips
+    wins: int = 0
+    max_abs_pos: float = 0.0
+    realized: Optional[float] = None  # cumulative realized PnL at the last fill
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    segments_json: str = "[]"
+
+    # Open trip
+    _prev_pos: float = 0.0
+    _dir: Optional[str] = None  # 'long'|'short'
+    _peak: float = 0.0
+    _trip_adds: int = 0
+    _realized_start: float = 0.0
+
+    def add(self, fill_id: int, pos: float, realized: float) -> None:
+        """Fold in the position qty and cumulative realized PnL after FILL event `fill_id`."""
+        prev = self._prev_pos
+        self.fills += 1
+        self.realized = realized
+        # A NaN position never wins, as with max() seeded at 0.0.
+        if abs(pos) > self.max_abs_pos:
+            self.max_abs_pos = abs(pos)
+        # If we were flat and now entered a position, start a new trip.
+        if prev == 0.0 and pos != 0.0:
+            self._dir = "long" if pos > 0 else "short"
+            self._peak = abs(pos)
+            self._trip_adds = 0
+            self._realized_start = realized
+        # If we stayed in a position, track peak and count "adds" when abs(pos) increases.
+        if prev != 0.0 and pos != 0.0:
+            self._peak = max(self._peak, abs(pos))
+            if abs(pos) > abs(prev) + 1e-9:
+                self._trip_adds += 1
+        # If we returned to flat, finalize trip segment.
+        if prev != 0.0 and pos == 0.0 and self._dir is not None:
+            self._close_trip(realized)
+        self._prev_pos = pos
+        # Last, so a reader on another thread that sees the new id also sees the counters it covers.
+        self.last_fill_id = fill_id
+
+    def _close_trip(self, realized: float) -> None:
+        seg = {
+            "trip_index": len(self.segments) + 1,
+            "dir": self._dir,
+            "realized": realized - self._realized_start,
+            "qty_peak": self._peak,
+            "adds": self._trip_adds,
+        }
+        text = json.dumps(seg, separators=(",", ":"))
+        self.segments_json = f"{self.segments_json[:-1]},{text}]" if self.segments else f"[{text}]"
+        self.segments.append(seg)
+        self.adds += self._trip_adds
+        if seg["realized"] > 0:
+            self.wins += 1
+        self._dir = None
+        self._peak = 0.0
+        self._trip_adds = 0
+        self._realized_start = realized
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        """Share of closed trips with positive realized PnL (None until a trip closes)."""
+        return (self.wins / len(self.segments)) if self.segments else None
@@ -20,8 +20,11 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # 2. Import the FastAPI app first (it will be the primary server)
 from market_inventions_port.main import app as fastapi_app
 
-# 3. Import the Flask app
+# 3. Import the Flask app and initialize its database (app.py leaves that to its entry points)
 from app import app as flask_app
+from database import init_database
+
+init_database()
 
 # 4. Mount Flask into FastAPI using WSGIMiddleware
 # This allows Flask to handle all routes not captured by FastAPI
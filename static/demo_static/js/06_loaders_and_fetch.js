@@ -170,6 +170,9 @@
       } catch(_e){}
     }
 
+    // Strategy signals are opt-in server-side; only request them when a strategy is selected
+    // (selecting one triggers a reload).
+    var btSel = (state.backtest && state.backtest.selectedStrategy) ? state.backtest.selectedStrategy : 'none';
     var url = buildUrl(API_BASE, '/window', {
       symbol: symbol,
       start: start,
@@ -177,7 +180,8 @@
       max_bars: effMaxBars,
       // send legacy `limit` too for older servers
       limit: effMaxBars,
-      bar_s: Math.floor(bar_s)
+      bar_s: Math.floor(bar_s),
+      strategies: (btSel && btSel !== 'none') ? 1 : ''
     });
     if(ui.reqInfo) ui.reqInfo.textContent = 'bar_s=' + Math.floor(bar_s) + ' (loading…)';
 
@@ -3245,7 +3245,9 @@
   }
 
   async function _getJson(url){
-    var res = await fetch(url, { method:'GET', cache:'no-store' });
+    // no-cache (not no-store): always revalidate, so the history endpoints' ETags turn repeat
+    // opens into 304s that the browser answers from its cache.
+    var res = await fetch(url, { method:'GET', cache:'no-cache' });
     if(!res.ok){
       var t = '';
       try{ t = await res.text(); } catch(_e){}
@@ -3,10 +3,19 @@ Trading strategies package.
 
 This package contains individual trading strategy implementations.
 Each strategy is in its own module and exports a compute function.
+
+STRATEGY_REGISTRY is populated from `_registry.json` (strategy name -> "module:function"), which
+the app rewrites when strategies are created/deleted at runtime.
 """
+import importlib
+import json
+import os
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Optional
+
 from strategies.vwap_ema_crossover_v1 import compute_vwap_ema_crossover_signals
 from strategies.fools_paradise import compute_fools_paradise_signals
-from strategies.utils import clean_series, build_regular_mask
+from strategies.utils import clean_series, build_regular_mask, add_shared_indicators
 from strategies.contracts import (
     REQUIRED_BAR_COLUMNS,
     TIME_SEMANTICS,
@@ -23,6 +32,8 @@ __all__ = [
     'compute_fools_paradise_signals',
     'clean_series',
     'build_regular_mask',
+    'add_shared_indicators',
+    'compute_signals_batch',
     # contract utilities
     'REQUIRED_BAR_COLUMNS',
     'TIME_SEMANTICS',
@@ -31,10 +42,77 @@ __all__ = [
     'normalize_signals',
     'validate_bars_df',
     'validate_signals',
+    # registry manifest
+    'REGISTRY_MANIFEST_PATH',
+    'load_registry_manifest',
+    'write_registry_manifest',
 ]
 
+REGISTRY_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_registry.json")
+
+
+def load_registry_manifest() -> Dict[str, str]:
+    """Read the strategy manifest ({name: "module:function"}); missing/invalid file -> {}."""
+    try:
+        with open(REGISTRY_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+
+def write_registry_manifest(manifest: Dict[str, str]) -> None:
+    """Atomically replace the strategy manifest (write temp file + os.replace)."""
+    tmp_path = REGISTRY_MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, REGISTRY_MANIFEST_PATH)
+
+
+def _load_registry() -> Dict[str, Callable]:
+    registry: Dict[str, Callable] = {}
+    for name, target in load_registry_manifest().items():
+        module_path, _, fn_name = target.partition(":")
+        try:
+            fn = getattr(importlib.import_module(module_path), fn_name)
+        except Exception:
+            # A broken user strategy must not take down the whole package import.
+            continue
+        if callable(fn):
+            registry[name] = fn
+    return registry
+
+
 # Strategy registry - maps strategy names to their compute functions
-STRATEGY_REGISTRY = {
-    'vwap_ema_crossover_v1': compute_vwap_ema_crossover_signals,
-    'fools_paradise': compute_fools_paradise_signals,
-}
+STRATEGY_REGISTRY = _load_registry()
+
+
+def compute_signals_batch(
+    df_prices,
+    names: Iterable[str],
+    rth_mask=None,
+    executor: Optional[Executor] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several registered strategies over the same bars and return {name: normalized signals}.
+
+    Shared pre-processing (DatetimeIndex, EMA/VWAP columns) is done once via
+    `add_shared_indicators` instead of once per strategy. Strategies that return no
+    signals are omitted. With `executor`, the strategies run concurrently (each copies the
+    shared frame before writing to it); results keep the order of `names`.
+    """
+    if df_prices is None or df_prices.empty:
+        return {}
+    df = add_shared_indicators(df_prices)
+    fns = [(name, STRATEGY_REGISTRY[name]) for name in names if name in STRATEGY_REGISTRY]
+    if executor is not None and len(fns) > 1:
+        futures = [(name, executor.submit(fn, df, rth_mask=rth_mask)) for name, fn in fns]
+        results = [(name, fut.result()) for name, fut in futures]
+    else:
+        results = [(name, fn(df, rth_mask=rth_mask)) for name, fn in fns]
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, signals in results:
+        if signals:
+            out[name] = normalize_signals(signals, df)
+    return out
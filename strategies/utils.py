@@ -4,6 +4,16 @@ Shared utility functions for trading strategies.
 import pandas as pd
 import math
 
+from utils import calculate_vwap_per_trading_day
+
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+# EMA columns the built-in strategies read when present (name -> span).
+SHARED_EMA_SPANS = {'ema9': 9, 'ema21': 21, 'ema50': 50, 'ema200': 200}
+
 
 def clean_series(series):
     """Convert a pandas Series to list with None for nan/NaT."""
@@ -40,3 +50,22 @@ def build_regular_mask(timestamps, market_hours=None):
         mask = pd.Series(rth_mask, index=idx)
 
     return mask
+
+
+def add_shared_indicators(df_prices):
+    """
+    Return a copy of df_prices with the indicator columns strategies look for (ema9/21/50/200,
+    vwap) computed once, so several strategies run over the same bars skip recomputing them.
+    Existing columns are kept; values match what each strategy would compute on its own.
+    """
+    df = df_prices.copy()
+    df.index = pd.to_datetime(df.index)
+    for col, span in SHARED_EMA_SPANS.items():
+        if col not in df.columns:
+            if ta:
+                df[col] = ta.ema(df['close'], length=span)
+            else:
+                df[col] = df['close'].ewm(span=span, adjust=False).mean()
+    if 'vwap' not in df.columns:
+        df['vwap'] = calculate_vwap_per_trading_day(df)
+    return df
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Callable, Dict, Tuple, List
+import sqlite3
+from typing import Any, Callable, Dict, Tuple, List, Optional
 
 from .base import SyntheticBar, SyntheticL2, write_synthetic_series_to_db
 from .trend_regime_v1 import generate_trend_regime_series
@@ -24,6 +25,43 @@ def get_generator(name: str) -> Generator:
         raise KeyError(f"Unknown synthetic generator: {name}") from exc
 
 
+def generate_and_store(
+    name: str,
+    gen_kwargs: Dict[str, Any],
+    db_path: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[str, str]]]:
+    """
+    Run generator `name` with `gen_kwargs` and persist the series (`bars` + `l2_state`).
+
+    Returns ({bar_count, ts_start_min, ts_start_max}, None) or (None, (error_code, message)).
+    Module-level and picklable so it can run in a worker process; there `db_path` gives it a
+    dedicated connection instead of the pooled one.
+    """
+    try:
+        bars, l2 = get_generator(name)(**gen_kwargs)
+    except Exception as e:
+        return None, ("generation_failed", str(e))
+
+    conn = None
+    if db_path:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        conn.execute("PRAGMA foreign_keys = ON;")
+    try:
+        write_synthetic_series_to_db(bars, l2, conn=conn)
+    except Exception as e:
+        # Most common: unique constraint violation when reusing the same name/timeframe/timestamps.
+        return None, ("persist_failed", str(e))
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return {
+        "bar_count": len(bars),
+        "ts_start_min": bars[0].ts_start.isoformat().replace("+00:00", "Z") if bars else None,
+        "ts_start_max": bars[-1].ts_start.isoformat().replace("+00:00", "Z") if bars else None,
+    }, None
+
+
 __all__ = [
     "SyntheticBar",
     "SyntheticL2",
@@ -32,6 +70,7 @@ __all__ = [
     "generate_trend_regime_series_v2",
     "generate_trend_regime_series_v3",
     "get_generator",
+    "generate_and_store",
     "GENERATOR_REGISTRY",
 ]
 
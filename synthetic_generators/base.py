@@ -41,6 +41,22 @@ class SyntheticL2:
     tss: float
 
 
+# Column order of the `bars` rows built in write_synthetic_series_to_db.
+_BAR_COLUMNS = (
+    "symbol", "timeframe", "ts_start", "ts_ms", "duration_sec",
+    "open", "high", "low", "close", "volume",
+    "trades", "vwap",
+    "data_source", "scenario", "ref_symbol",
+)
+
+
+def _insert_bars(cur: sqlite3.Cursor, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    cur.executemany(
+        f"INSERT INTO bars ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows,
+    )
+
+
 def write_synthetic_series_to_db(
     bars: Sequence[SyntheticBar],
     l2_states: Sequence[SyntheticL2],
@@ -61,71 +77,55 @@ def write_synthetic_series_to_db(
     try:
         cur = conn.cursor()
 
-        for bar, l2 in zip(bars, l2_states):
-            # Support older DBs without the optional ref_symbol column.
+        # Symbols are stored uppercase so readers can compare with a plain `symbol = ?`.
+        # ts_ms is filled here for tz-aware starts so the per-row ts_ms trigger is skipped.
+        bar_rows = [
+            (
+                str(bar.symbol).strip().upper(),
+                bar.timeframe,
+                bar.ts_start.isoformat(),
+                int(bar.ts_start.timestamp()) * 1000 if bar.ts_start.tzinfo is not None else None,
+                bar.duration_sec,
+                bar.open,
+                bar.high,
+                bar.low,
+                bar.close,
+                bar.volume,
+                bar.trades,
+                bar.vwap,
+                bar.data_source,
+                bar.scenario,
+                bar.ref_symbol,
+            )
+            for bar in bars
+        ]
+        # Support older DBs without the optional ts_ms/ref_symbol columns. ts_ms is dropped first
+        # and ref_symbol only after that, so a DB that has ref_symbol but not yet ts_ms keeps it.
+        try:
+            _insert_bars(cur, _BAR_COLUMNS, bar_rows)
+        except sqlite3.OperationalError:
             try:
-                cur.execute(
-                    """
-                    INSERT INTO bars (
-                        symbol, timeframe, ts_start, duration_sec,
-                        open, high, low, close, volume,
-                        trades, vwap,
-                        data_source, scenario, ref_symbol
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        bar.symbol,
-                        bar.timeframe,
-                        bar.ts_start.isoformat(),
-                        bar.duration_sec,
-                        bar.open,
-                        bar.high,
-                        bar.low,
-                        bar.close,
-                        bar.volume,
-                        bar.trades,
-                        bar.vwap,
-                        bar.data_source,
-                        bar.scenario,
-                        bar.ref_symbol,
-                    ),
-                )
+                _insert_bars(cur, _BAR_COLUMNS[:3] + _BAR_COLUMNS[4:], [row[:3] + row[4:] for row in bar_rows])
             except sqlite3.OperationalError:
-                cur.execute(
-                    """
-                    INSERT INTO bars (
-                        symbol, timeframe, ts_start, duration_sec,
-                        open, high, low, close, volume,
-                        trades, vwap,
-                        data_source, scenario
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        bar.symbol,
-                        bar.timeframe,
-                        bar.ts_start.isoformat(),
-                        bar.duration_sec,
-                        bar.open,
-                        bar.high,
-                        bar.low,
-                        bar.close,
-                        bar.volume,
-                        bar.trades,
-                        bar.vwap,
-                        bar.data_source,
-                        bar.scenario,
-                    ),
-                )
-            bar_id = cur.lastrowid
+                _insert_bars(cur, _BAR_COLUMNS[:3] + _BAR_COLUMNS[4:-1], [row[:3] + row[4:-1] for row in bar_rows])
 
-            cur.execute(
-                """
-                INSERT INTO l2_state (
-                    bar_id,
-                    spr, bbs, bas, dbi, microprice,
-                    ofi, sigma_spr, frag, d_micro, tss
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        # executemany does not report row ids. `bars.id` is AUTOINCREMENT and this transaction
+        # holds the write lock, so the newest len(bars) ids are ours, in insertion order.
+        bar_ids = [
+            r[0]
+            for r in cur.execute("SELECT id FROM bars ORDER BY id DESC LIMIT ?", (len(bar_rows),)).fetchall()
+        ]
+        bar_ids.reverse()
+
+        cur.executemany(
+            """
+            INSERT INTO l2_state (
+                bar_id,
+                spr, bbs, bas, dbi, microprice,
+                ofi, sigma_spr, frag, d_micro, tss
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
                 (
                     bar_id,
                     l2.spr,
@@ -138,8 +138,10 @@ def write_synthetic_series_to_db(
                     l2.frag,
                     l2.d_micro,
                     l2.tss,
-                ),
-            )
+                )
+                for bar_id, l2 in zip(bar_ids, l2_states)
+            ),
+        )
 
         conn.commit()
     finally:
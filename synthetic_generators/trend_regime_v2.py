@@ -125,6 +125,44 @@ def generate_trend_regime_series_v2(
         # Mon-Fri only. (Holiday calendar not modeled in this synthetic generator.)
         return d.weekday() < 5
 
+    # Everything below that does not depend on the random draws is computed once, outside the
+    # per-bar loop. The draws are consumed in exactly the same order, so a given seed still
+    # produces the same series.
+    sqrt_tf = math.sqrt(tf_min)
+    regime_params = {r: (float(rp["drift"]), float(rp["vol"])) for r, rp in params.regimes.items()}
+    regime_names = list(params.regimes.keys())
+    candidates_for = {r: [c for c in regime_names if c != r] for r in (*regime_names, "CHOP")}
+
+    # Per-bar-of-day profile: (offset from session open, vol_mult, volume base, spread base,
+    # depth scale, sigma_spr base). These only depend on the diurnal position of the bar.
+    profile = []
+    for i in range(bars_per_day):
+        # Diurnal progress t in [0,1]
+        t = (i + 0.5) / bars_per_day
+        u = _u_shape(t)
+        # U-shaped volume profile
+        vol_u = 0.65 + 0.85 * u
+        vol_u = 1.0 + params.diurnal_volume_strength * (vol_u - 1.0)
+        profile.append(
+            (
+                timedelta(minutes=i * tf_min),
+                1.0 + params.diurnal_vol_strength * u,
+                params.base_volume * vol_u,
+                params.base_spread * (1.0 + params.spread_diurnal_strength * u),
+                params.depth_scale * (1.0 + 0.2 * u),
+                0.002 + 0.004 * u,
+            )
+        )
+
+    symbol = str(dataset_name)
+    scenario = str(scenario)
+    ref_symbol = str(ref_symbol).strip().upper() if ref_symbol else None
+    stay_prob = params.stay_prob
+    rand = rng.random
+    gauss = rng.gauss
+    choice = rng.choice
+    exp = math.exp
+
     # Produce N trading days, skipping weekends.
     produced = 0
     cur = start_date_local
@@ -137,80 +175,73 @@ def generate_trend_regime_series_v2(
 
         # Overnight gap applied at the start of each day except the first.
         if produced > 0:
-            gap_ret = params.overnight_gap_mu + params.overnight_gap_sigma * rng.gauss(0, 1)
-            price = price * math.exp(gap_ret)
+            gap_ret = params.overnight_gap_mu + params.overnight_gap_sigma * gauss(0, 1)
+            price = price * exp(gap_ret)
             microprice_prev = price
             # New day open tends to be choppier in many markets; reset regime bias.
             current_regime = "CHOP"
 
-        open_dt_local = tz.localize(datetime.combine(d, params.session_open_local))
-
-        for i in range(bars_per_day):
-            # Diurnal progress t in [0,1]
-            t = (i + 0.5) / bars_per_day
-            u = _u_shape(t)
+        # A localized datetime plus a timedelta keeps its UTC offset, so every bar of the day is
+        # the UTC session open plus its wall-clock offset.
+        open_dt_utc = tz.localize(datetime.combine(d, params.session_open_local)).astimezone(timezone.utc)
 
+        for offset, vol_mult, base_vol_u, spr_base, depth_scale, sigma_base in profile:
             # Regime transitions
-            if rng.random() > params.stay_prob:
-                candidates = [r for r in params.regimes.keys() if r != current_regime]
-                current_regime = rng.choice(candidates)  # type: ignore[assignment]
+            if rand() > stay_prob:
+                current_regime = choice(candidates_for[current_regime])  # type: ignore[assignment]
 
-            rp = params.regimes[current_regime]
-            drift = float(rp["drift"])
-            vol = float(rp["vol"])
+            drift, vol = regime_params[current_regime]
 
             # Scale drift/vol by timeframe length and diurnal volatility
-            vol_mult = 1.0 + params.diurnal_vol_strength * u
-            ret = (drift * tf_min) + (vol * math.sqrt(tf_min) * vol_mult) * rng.gauss(0, 1)
+            ret = (drift * tf_min) + (vol * sqrt_tf * vol_mult) * gauss(0, 1)
 
             price_open = price
-            price_close = price * math.exp(ret)
+            price_close = price * exp(ret)
 
             # Make intrabar range/wicks depend on vol + diurnal intensity
             base_range = max(0.001 * price_open, abs(ret) * price_open)
-            extra = (0.7 + rng.random()) * (vol * vol_mult) * price_open
+            extra = (0.7 + rand()) * (vol * vol_mult) * price_open
             bar_range = base_range + extra
 
-            upper_wiggle = (0.25 + 0.75 * rng.random()) * 0.6 * bar_range
-            lower_wiggle = (0.25 + 0.75 * rng.random()) * 0.6 * bar_range
+            upper_wiggle = (0.25 + 0.75 * rand()) * 0.6 * bar_range
+            lower_wiggle = (0.25 + 0.75 * rand()) * 0.6 * bar_range
 
-            price_high = max(price_open, price_close) + upper_wiggle
-            price_low = min(price_open, price_close) - lower_wiggle
-            price_high = max(price_high, price_open, price_close)
-            price_low = min(price_low, price_open, price_close)
+            if price_close > price_open:
+                price_high = price_close + upper_wiggle
+                price_low = price_open - lower_wiggle
+            else:
+                price_high = price_open + upper_wiggle
+                price_low = price_close - lower_wiggle
 
-            # U-shaped volume profile + noise
-            vol_u = 0.65 + 0.85 * u
-            vol_u = 1.0 + params.diurnal_volume_strength * (vol_u - 1.0)
-            volume = params.base_volume * vol_u * rng.uniform(0.6, 1.6)
+            # Volume noise; uniform(a, b) is a + (b - a) * random().
+            volume = base_vol_u * (0.6 + (1.6 - 0.6) * rand())
 
-            trades = max(1, int(volume / 10.0 * rng.uniform(0.7, 1.3)))
+            trades = max(1, int(volume / 10.0 * (0.7 + (1.3 - 0.7) * rand())))
 
-            vwap_alpha = rng.uniform(0.3, 0.7)
+            vwap_alpha = 0.3 + (0.7 - 0.3) * rand()
             vwap = vwap_alpha * price_close + (1.0 - vwap_alpha) * 0.5 * (price_high + price_low)
 
             # Spread also tends to be wider at open/close.
-            spr = params.base_spread * (1.0 + params.spread_diurnal_strength * u) * rng.uniform(0.8, 1.6)
+            spr = spr_base * (0.8 + (1.6 - 0.8) * rand())
 
             # Depth + imbalance heuristics
-            depth_scale = params.depth_scale * (1.0 + 0.2 * u)
             bullish = price_close > price_open
             bearish = price_close < price_open
 
             if bullish:
-                bbs = depth_scale * rng.uniform(1.0, 1.6)
-                bas = depth_scale * rng.uniform(0.6, 1.1)
+                bbs = depth_scale * (1.0 + (1.6 - 1.0) * rand())
+                bas = depth_scale * (0.6 + (1.1 - 0.6) * rand())
                 dbi_center = 0.62
             elif bearish:
-                bbs = depth_scale * rng.uniform(0.6, 1.1)
-                bas = depth_scale * rng.uniform(1.0, 1.6)
+                bbs = depth_scale * (0.6 + (1.1 - 0.6) * rand())
+                bas = depth_scale * (1.0 + (1.6 - 1.0) * rand())
                 dbi_center = 0.38
             else:
-                bbs = depth_scale * rng.uniform(0.8, 1.3)
-                bas = depth_scale * rng.uniform(0.8, 1.3)
+                bbs = depth_scale * (0.8 + (1.3 - 0.8) * rand())
+                bas = depth_scale * (0.8 + (1.3 - 0.8) * rand())
                 dbi_center = 0.5
 
-            dbi = max(0.0, min(1.0, rng.gauss(dbi_center, 0.08)))
+            dbi = max(0.0, min(1.0, gauss(dbi_center, 0.08)))
 
             midprice = price_close
             depth_sum = bbs + bas
@@ -219,58 +250,55 @@ def generate_trend_regime_series_v2(
             else:
                 micro_shift = (bas - bbs) / depth_sum
                 micro_shift = -micro_shift
-                microprice = midprice + micro_shift * spr * rng.uniform(0.5, 1.5)
+                microprice = midprice + micro_shift * spr * (0.5 + (1.5 - 0.5) * rand())
 
             # OFI magnitude scales with volume.
             ofi_scale = volume * 0.1
             ofi_mean = (+0.4 if bullish else (-0.4 if bearish else 0.0)) * ofi_scale
-            ofi = rng.gauss(ofi_mean, 0.6 * ofi_scale)
+            ofi = gauss(ofi_mean, 0.6 * ofi_scale)
 
-            sigma_spr = (0.002 + 0.004 * u) * rng.uniform(0.8, 2.0)
+            sigma_spr = sigma_base * (0.8 + (2.0 - 0.8) * rand())
             frag = 1.0 / (bbs + bas) if (bbs + bas) > 0 else 0.0
             d_micro = microprice - microprice_prev
             tss_center = 1.0 if ofi_mean > 0 else (-1.0 if ofi_mean < 0 else 0.0)
-            tss = rng.gauss(tss_center, 0.8)
-
-            ts_start_local = open_dt_local + timedelta(minutes=i * tf_min)
-            ts_start_utc = ts_start_local.astimezone(timezone.utc)
+            tss = gauss(tss_center, 0.8)
 
             bars.append(
                 SyntheticBar(
-                    symbol=str(dataset_name),
+                    symbol=symbol,
                     timeframe=timeframe,
-                    ts_start=ts_start_utc,
+                    ts_start=open_dt_utc + offset,
                     duration_sec=duration_sec,
-                    open=float(price_open),
-                    high=float(price_high),
-                    low=float(price_low),
-                    close=float(price_close),
-                    volume=float(volume),
-                    trades=int(trades),
-                    vwap=float(vwap),
+                    open=price_open,
+                    high=price_high,
+                    low=price_low,
+                    close=price_close,
+                    volume=volume,
+                    trades=trades,
+                    vwap=vwap,
                     data_source="synthetic",
-                    scenario=str(scenario),
-                    ref_symbol=str(ref_symbol).strip().upper() if ref_symbol else None,
+                    scenario=scenario,
+                    ref_symbol=ref_symbol,
                 )
             )
 
             l2_states.append(
                 SyntheticL2(
-                    spr=float(spr),
-                    bbs=float(bbs),
-                    bas=float(bas),
-                    dbi=float(dbi),
-                    microprice=float(microprice),
-                    ofi=float(ofi),
-                    sigma_spr=float(sigma_spr),
-                    frag=float(frag),
-                    d_micro=float(d_micro),
-                    tss=float(tss),
+                    spr=spr,
+                    bbs=bbs,
+                    bas=bas,
+                    dbi=dbi,
+                    microprice=microprice,
+                    ofi=ofi,
+                    sigma_spr=sigma_spr,
+                    frag=frag,
+                    d_micro=d_micro,
+                    tss=tss,
                 )
             )
 
-            price = float(price_close)
-            microprice_prev = float(microprice)
+            price = price_close
+            microprice_prev = microprice
 
         produced += 1
         cur = cur + timedelta(days=1)
@@ -171,6 +171,87 @@ def generate_trend_regime_series_v3(
     mu_d = float(params.daily_vol_mu)
     log_mult_prev = mu_d
 
+    # Everything below that does not depend on the random draws is computed once, outside the
+    # per-bar loop. The draws are consumed in exactly the same order, so a given seed still
+    # produces the same series.
+    sqrt_tf = math.sqrt(tf_min)
+    coupling = max(0.0, float(params.vol_ret_coupling))
+    # Regime -> (drift, vol, ret_scale) and regime -> transition candidates (in regimes order).
+    regime_params = {}
+    for r, rp in params.regimes.items():
+        vol_r = float(rp["vol"])
+        regime_params[r] = (float(rp["drift"]), vol_r, max(1e-9, vol_r * sqrt_tf))
+    regime_names = list(params.regimes.keys())
+    candidates_for = {r: [c for c in regime_names if c != r] for r in (*regime_names, "CHOP")}
+
+    # Per-bar-of-day profile. Bar times are wall-clock offsets from the session open, so the
+    # session classification and diurnal terms only depend on the bar index.
+    open_wall = datetime.combine(start_date_local, params.session_open_local)
+    profile = []
+    for i in range(bars_per_day):
+        offset = timedelta(minutes=i * tf_min)
+        wall = open_wall + offset
+        mins = wall.hour * 60 + wall.minute
+
+        # Session classification (used for both visuals and realism).
+        if mins >= pre_start_m and mins < rth_start_m:
+            sess = "pre_market"
+            vol_mult_sess = float(params.pre_market_volume_mult)
+            spread_mult_sess = float(params.pre_market_spread_mult)
+            ret_vol_mult_sess = float(params.pre_market_ret_vol_mult)
+            u = 0.0
+        elif mins >= rth_start_m and mins < rth_end_m:
+            sess = "regular"
+            vol_mult_sess = 1.0
+            spread_mult_sess = 1.0
+            ret_vol_mult_sess = 1.0
+            # U-shape should be within RTH (open/close of regular session), not the full 4am–8pm window.
+            t_rth = ((mins - rth_start_m) + (tf_min * 0.5)) / max(1.0, float(rth_minutes))
+            u = _u_shape(t_rth)
+        elif mins >= rth_end_m and mins < ah_end_m:
+            sess = "after_hours"
+            vol_mult_sess = float(params.after_hours_volume_mult)
+            spread_mult_sess = float(params.after_hours_spread_mult)
+            ret_vol_mult_sess = float(params.after_hours_ret_vol_mult)
+            u = 0.0
+        else:
+            # In case session_minutes configuration extends beyond expected bounds.
+            sess = "closed"
+            vol_mult_sess = 0.05
+            spread_mult_sess = 2.0
+            ret_vol_mult_sess = 0.8
+            u = 0.0
+
+        # Diurnal volume only really applies to regular session. Pre/after use a flatter profile.
+        if sess == "regular":
+            vol_u = 0.65 + 0.85 * u
+            vol_u = 1.0 + params.diurnal_volume_strength * (vol_u - 1.0)
+        else:
+            vol_u = 1.0
+
+        profile.append(
+            (
+                offset,
+                (1.0 + params.diurnal_vol_strength * u) * ret_vol_mult_sess,  # vol_mult
+                params.base_volume * vol_u,
+                vol_mult_sess,
+                params.base_spread * (1.0 + params.spread_diurnal_strength * u),
+                spread_mult_sess,
+                params.depth_scale * (1.0 + 0.2 * u),
+                0.002 + 0.004 * u,
+            )
+        )
+
+    symbol = str(dataset_name)
+    scenario = str(scenario)
+    ref_symbol = str(ref_symbol).strip().upper() if ref_symbol else None
+    stay_prob = params.stay_prob
+    rand = rng.random
+    gauss = rng.gauss
+    choice = rng.choice
+    lognormvariate = rng.lognormvariate
+    exp = math.exp
+
     produced = 0
     cur = start_date_local
     while produced < n_trading_days:
@@ -182,133 +263,90 @@ def generate_trend_regime_series_v3(
 
         # Overnight gap at start of day except the first produced trading day
         if produced > 0:
-            gap_ret = params.overnight_gap_mu + params.overnight_gap_sigma * rng.gauss(0, 1)
-            price = price * math.exp(gap_ret)
+            gap_ret = params.overnight_gap_mu + params.overnight_gap_sigma * gauss(0, 1)
+            price = price * exp(gap_ret)
             microprice_prev = price
             current_regime = "CHOP"
 
         # Update daily volume multiplier with persistence (AR-like in log-space).
         # log_mult_t = mu + rho*(log_mult_{t-1}-mu) + sigma*sqrt(1-rho^2)*z
-        z = rng.gauss(0, 1)
+        z = gauss(0, 1)
         innov = sigma_d * math.sqrt(max(0.0, 1.0 - rho * rho)) * z
         log_mult = mu_d + rho * (log_mult_prev - mu_d) + innov
         log_mult_prev = log_mult
 
         # Optional event spike on top of daily multiplier.
-        if float(params.event_prob) > 0 and rng.random() < float(params.event_prob):
-            log_mult += abs(float(params.event_sigma)) * rng.gauss(0, 1)
-
-        daily_mult = math.exp(log_mult)
-
-        open_dt_local = tz.localize(datetime.combine(d, params.session_open_local))
-
-        for i in range(bars_per_day):
-            # Local session clock for this bar.
-            ts_start_local = open_dt_local + timedelta(minutes=i * tf_min)
-            mins = ts_start_local.hour * 60 + ts_start_local.minute
-
-            # Session classification (used for both visuals and realism).
-            if mins >= pre_start_m and mins < rth_start_m:
-                sess = "pre_market"
-                vol_mult_sess = float(params.pre_market_volume_mult)
-                spread_mult_sess = float(params.pre_market_spread_mult)
-                ret_vol_mult_sess = float(params.pre_market_ret_vol_mult)
-                u = 0.0
-            elif mins >= rth_start_m and mins < rth_end_m:
-                sess = "regular"
-                vol_mult_sess = 1.0
-                spread_mult_sess = 1.0
-                ret_vol_mult_sess = 1.0
-                # U-shape should be within RTH (open/close of regular session), not the full 4am–8pm window.
-                t_rth = ((mins - rth_start_m) + (tf_min * 0.5)) / max(1.0, float(rth_minutes))
-                u = _u_shape(t_rth)
-            elif mins >= rth_end_m and mins < ah_end_m:
-                sess = "after_hours"
-                vol_mult_sess = float(params.after_hours_volume_mult)
-                spread_mult_sess = float(params.after_hours_spread_mult)
-                ret_vol_mult_sess = float(params.after_hours_ret_vol_mult)
-                u = 0.0
-            else:
-                # In case session_minutes configuration extends beyond expected bounds.
-                sess = "closed"
-                vol_mult_sess = 0.05
-                spread_mult_sess = 2.0
-                ret_vol_mult_sess = 0.8
-                u = 0.0
+        if float(params.event_prob) > 0 and rand() < float(params.event_prob):
+            log_mult += abs(float(params.event_sigma)) * gauss(0, 1)
+
+        daily_mult = exp(log_mult)
+
+        # A localized datetime plus a timedelta keeps its UTC offset, so every bar of the day is
+        # the UTC session open plus its wall-clock offset.
+        open_dt_utc = tz.localize(datetime.combine(d, params.session_open_local)).astimezone(timezone.utc)
 
+        for offset, vol_mult, base_vol_u, vol_mult_sess, spr_base, spread_mult_sess, depth_scale, sigma_base in profile:
             # Regime transitions
-            if rng.random() > params.stay_prob:
-                candidates = [r for r in params.regimes.keys() if r != current_regime]
-                current_regime = rng.choice(candidates)  # type: ignore[assignment]
+            if rand() > stay_prob:
+                current_regime = choice(candidates_for[current_regime])  # type: ignore[assignment]
 
-            rp = params.regimes[current_regime]
-            drift = float(rp["drift"])
-            vol = float(rp["vol"])
+            drift, vol, ret_scale = regime_params[current_regime]
 
-            vol_mult = (1.0 + params.diurnal_vol_strength * u) * ret_vol_mult_sess
-            ret = (drift * tf_min) + (vol * math.sqrt(tf_min) * vol_mult) * rng.gauss(0, 1)
+            ret = (drift * tf_min) + (vol * sqrt_tf * vol_mult) * gauss(0, 1)
 
             price_open = price
-            price_close = price * math.exp(ret)
+            price_close = price * exp(ret)
 
             # Intrabar range/wicks
             base_range = max(0.001 * price_open, abs(ret) * price_open)
-            extra = (0.7 + rng.random()) * (vol * vol_mult) * price_open
+            extra = (0.7 + rand()) * (vol * vol_mult) * price_open
             bar_range = base_range + extra
-            upper_wiggle = (0.25 + 0.75 * rng.random()) * 0.6 * bar_range
-            lower_wiggle = (0.25 + 0.75 * rng.random()) * 0.6 * bar_range
-            price_high = max(price_open, price_close) + upper_wiggle
-            price_low = min(price_open, price_close) - lower_wiggle
-            price_high = max(price_high, price_open, price_close)
-            price_low = min(price_low, price_open, price_close)
+            upper_wiggle = (0.25 + 0.75 * rand()) * 0.6 * bar_range
+            lower_wiggle = (0.25 + 0.75 * rand()) * 0.6 * bar_range
+            if price_close > price_open:
+                price_high = price_close + upper_wiggle
+                price_low = price_open - lower_wiggle
+            else:
+                price_high = price_open + upper_wiggle
+                price_low = price_close - lower_wiggle
 
             # Volume:
             # - diurnal u-shape intraday
             # - daily multiplier (varies per day, clusters across days)
             # - coupling to abs returns (movement => more volume)
             # - modest iid noise so it doesn't look too "perfect"
-            # Diurnal volume only really applies to regular session. Pre/after use a flatter profile.
-            if sess == "regular":
-                vol_u = 0.65 + 0.85 * u
-                vol_u = 1.0 + params.diurnal_volume_strength * (vol_u - 1.0)
-            else:
-                vol_u = 1.0
-
             # Couple to movement (use |ret| relative to a "typical" sigma scale).
-            coupling = max(0.0, float(params.vol_ret_coupling))
             move_mult = 1.0
             if coupling > 0:
                 # Scale by sqrt(tf_min) so coupling feels similar across timeframes.
-                ret_scale = max(1e-9, vol * math.sqrt(tf_min))
                 move_mult = 1.0 + coupling * (abs(ret) / ret_scale)
 
-            noise_mult = rng.lognormvariate(0.0, 0.25)  # heavy-tailed noise
-            volume = params.base_volume * vol_u * daily_mult * move_mult * noise_mult * vol_mult_sess
+            noise_mult = lognormvariate(0.0, 0.25)  # heavy-tailed noise
+            volume = base_vol_u * daily_mult * move_mult * noise_mult * vol_mult_sess
 
-            # Trades roughly proportional to volume
-            trades = max(1, int(volume / 10.0 * rng.uniform(0.7, 1.3)))
+            # Trades roughly proportional to volume; uniform(a, b) is a + (b - a) * random().
+            trades = max(1, int(volume / 10.0 * (0.7 + (1.3 - 0.7) * rand())))
 
-            vwap_alpha = rng.uniform(0.3, 0.7)
+            vwap_alpha = 0.3 + (0.7 - 0.3) * rand()
             vwap = vwap_alpha * price_close + (1.0 - vwap_alpha) * 0.5 * (price_high + price_low)
 
-            spr = params.base_spread * (1.0 + params.spread_diurnal_strength * u) * rng.uniform(0.8, 1.6) * spread_mult_sess
+            spr = spr_base * (0.8 + (1.6 - 0.8) * rand()) * spread_mult_sess
 
-            depth_scale = params.depth_scale * (1.0 + 0.2 * u)
             bullish = price_close > price_open
             bearish = price_close < price_open
             if bullish:
-                bbs = depth_scale * rng.uniform(1.0, 1.6)
-                bas = depth_scale * rng.uniform(0.6, 1.1)
+                bbs = depth_scale * (1.0 + (1.6 - 1.0) * rand())
+                bas = depth_scale * (0.6 + (1.1 - 0.6) * rand())
                 dbi_center = 0.62
             elif bearish:
-                bbs = depth_scale * rng.uniform(0.6, 1.1)
-                bas = depth_scale * rng.uniform(1.0, 1.6)
+                bbs = depth_scale * (0.6 + (1.1 - 0.6) * rand())
+                bas = depth_scale * (1.0 + (1.6 - 1.0) * rand())
                 dbi_center = 0.38
             else:
-                bbs = depth_scale * rng.uniform(0.8, 1.3)
-                bas = depth_scale * rng.uniform(0.8, 1.3)
+                bbs = depth_scale * (0.8 + (1.3 - 0.8) * rand())
+                bas = depth_scale * (0.8 + (1.3 - 0.8) * rand())
                 dbi_center = 0.5
-            dbi = max(0.0, min(1.0, rng.gauss(dbi_center, 0.08)))
+            dbi = max(0.0, min(1.0, gauss(dbi_center, 0.08)))
 
             midprice = price_close
             depth_sum = bbs + bas
@@ -317,55 +355,53 @@ def generate_trend_regime_series_v3(
             else:
                 micro_shift = (bas - bbs) / depth_sum
                 micro_shift = -micro_shift
-                microprice = midprice + micro_shift * spr * rng.uniform(0.5, 1.5)
+                microprice = midprice + micro_shift * spr * (0.5 + (1.5 - 0.5) * rand())
 
             ofi_scale = volume * 0.1
             ofi_mean = (+0.4 if bullish else (-0.4 if bearish else 0.0)) * ofi_scale
-            ofi = rng.gauss(ofi_mean, 0.6 * ofi_scale)
+            ofi = gauss(ofi_mean, 0.6 * ofi_scale)
 
-            sigma_spr = (0.002 + 0.004 * u) * rng.uniform(0.8, 2.0)
+            sigma_spr = sigma_base * (0.8 + (2.0 - 0.8) * rand())
             frag = 1.0 / (bbs + bas) if (bbs + bas) > 0 else 0.0
             d_micro = microprice - microprice_prev
             tss_center = 1.0 if ofi_mean > 0 else (-1.0 if ofi_mean < 0 else 0.0)
-            tss = rng.gauss(tss_center, 0.8)
-
-            ts_start_utc = ts_start_local.astimezone(timezone.utc)
+            tss = gauss(tss_center, 0.8)
 
             bars.append(
                 SyntheticBar(
-                    symbol=str(dataset_name),
+                    symbol=symbol,
                     timeframe=timeframe,
-                    ts_start=ts_start_utc,
+                    ts_start=open_dt_utc + offset,
                     duration_sec=duration_sec,
-                    open=float(price_open),
-                    high=float(price_high),
-                    low=float(price_low),
-                    close=float(price_close),
-                    volume=float(volume),
-                    trades=int(trades),
-                    vwap=float(vwap),
+                    open=price_open,
+                    high=price_high,
+                    low=price_low,
+                    close=price_close,
+                    volume=volume,
+                    trades=trades,
+                    vwap=vwap,
                     data_source="synthetic",
-                    scenario=str(scenario),
-                    ref_symbol=str(ref_symbol).strip().upper() if ref_symbol else None,
+                    scenario=scenario,
+                    ref_symbol=ref_symbol,
                 )
             )
             l2_states.append(
                 SyntheticL2(
-                    spr=float(spr),
-                    bbs=float(bbs),
-                    bas=float(bas),
-                    dbi=float(dbi),
-                    microprice=float(microprice),
-                    ofi=float(ofi),
-                    sigma_spr=float(sigma_spr),
-                    frag=float(frag),
-                    d_micro=float(d_micro),
-                    tss=float(tss),
+                    spr=spr,
+                    bbs=bbs,
+                    bas=bas,
+                    dbi=dbi,
+                    microprice=microprice,
+                    ofi=ofi,
+                    sigma_spr=sigma_spr,
+                    frag=frag,
+                    d_micro=d_micro,
+                    tss=tss,
                 )
             )
 
-            price = float(price_close)
-            microprice_prev = float(microprice)
+            price = price_close
+            microprice_prev = microprice
 
         produced += 1
         cur = cur + timedelta(days=1)
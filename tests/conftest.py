@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+import pytest
+
+import database
+
+
+@pytest.fixture(scope="module")
+def app_db():
+    """
+    Point database.DB_NAME at a fresh, initialized throwaway database for one test module, then
+    restore it. Importing app never touches the database, so modules simply `import app` and
+    opt in with `pytestmark = pytest.mark.usefixtures("app_db")`.
+    """
+    orig = database.DB_NAME
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database.DB_NAME = os.path.join(tmpdir, "test.db")
+        database.init_database()
+        try:
+            yield database.DB_NAME
+        finally:
+            database.close_db_connections()
+            database.DB_NAME = orig
@@ -0,0 +1,61 @@
+import sqlite3
+import unittest
+
+import pytest
+
+import app as app_module
+import database
+
+pytestmark = pytest.mark.usefixtures("app_db")
+
+
+def _insert_bars(start, n):
+    conn = sqlite3.connect(database.DB_NAME)
+    conn.executemany(
+        "INSERT OR REPLACE INTO stock_data (ticker, timestamp, price, open_price, high_price, low_price, volume, interval) "
+        "VALUES ('TEST', ?, ?, ?, ?, ?, 100.0, '1Min')",
+        [
+            (f"2025-01-02T{14 + i // 60:02d}:{i % 60:02d}:00Z", 100.0 + (i % 9), 100.0, 110.0, 90.0)
+            for i in range(start, start + n)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+class BacktestRerunTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        _insert_bars(0, 120)
+
+    def _rerun(self, bt_id):
+        resp = self.client.post(f"/api/backtests/{bt_id}/run")
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_json()
+
+    def test_rerun_reuses_metrics_until_bars_change(self):
+        resp = self.client.post("/api/backtests", json={
+            "name": "rerun", "strategy": "vwap_ema_crossover_v1", "ticker": "TEST", "interval": "1Min",
+        })
+        self.assertEqual(resp.status_code, 201)
+        created = resp.get_json()
+
+        cached = self._rerun(created["id"])
+        self.assertTrue(cached["cached"])
+        self.assertEqual(cached["metrics"], created["metrics"])
+        self.assertEqual(cached["n_bars"], created["n_bars"])
+
+        # A new bar invalidates the stored run; the recomputed one is reused again.
+        _insert_bars(120, 1)
+        fresh = self._rerun(created["id"])
+        self.assertFalse(fresh["cached"])
+        self.assertEqual(fresh["n_bars"], created["n_bars"] + 1)
+        self.assertTrue(self._rerun(created["id"])["cached"])
+
+        # So does revising an existing bar in place (INSERT OR REPLACE).
+        _insert_bars(5, 1)
+        self.assertFalse(self._rerun(created["id"])["cached"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import database
+
+
+class DataMigrationTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = database.DB_NAME
+        database.DB_NAME = os.path.join(self._tmpdir.name, "test.db")
+
+    def tearDown(self):
+        database.DB_NAME = self._orig
+        self._tmpdir.cleanup()
+
+    def _query(self, sql):
+        conn = sqlite3.connect(database.DB_NAME)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def _execute(self, *statements):
+        conn = sqlite3.connect(database.DB_NAME)
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+        conn.close()
+
+    def test_ts_ms_backfilled_once(self):
+        # A pre-ts_ms database: no column, no triggers.
+        self._execute(
+            "CREATE TABLE stock_data (id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT NOT NULL, "
+            "timestamp TEXT NOT NULL, price REAL NOT NULL, interval TEXT NOT NULL, "
+            "UNIQUE(ticker, timestamp, interval))",
+            "INSERT INTO stock_data (ticker, timestamp, price, interval) VALUES ('T', '2025-01-02T14:30:00Z', 1.0, '1Min')",
+        )
+        database.init_database()
+        self.assertEqual(self._query("SELECT ts_ms FROM stock_data"), [(1735828200000,)])
+        self.assertEqual(self._query("PRAGMA user_version"), [(database.DATA_VERSION,)])
+
+        # Later calls skip the table scan.
+        self._execute("UPDATE stock_data SET ts_ms = NULL")
+        database.init_database()
+        self.assertEqual(self._query("SELECT ts_ms FROM stock_data"), [(None,)])
+
+    def test_mixed_case_synthetic_symbols_merged(self):
+        database.init_database()
+        bar = "'1Min', '2025-01-02T14:30:00Z', 60, 1, 1, 1, 1, 'synthetic', 'base'"
+        self._execute(
+            f"INSERT INTO bars (symbol, timeframe, ts_start, duration_sec, open, high, low, close, data_source, scenario) VALUES ('SYN', {bar})",
+            f"INSERT INTO bars (symbol, timeframe, ts_start, duration_sec, open, high, low, close, data_source, scenario) VALUES ('Syn', {bar})",
+            "INSERT INTO bars (symbol, timeframe, ts_start, duration_sec, open, high, low, close, data_source, scenario) "
+            "VALUES ('other', '1Min', '2025-01-02T14:30:00Z', 60, 1, 1, 1, 1, 'synthetic', 'base')",
+            "PRAGMA user_version = 1",
+        )
+        database.init_database()
+        self.assertEqual(self._query("SELECT symbol FROM bars ORDER BY symbol"), [("OTHER",), ("SYN",)])
+
+
+class AppImportTests(unittest.TestCase):
+    def test_import_leaves_database_alone(self):
+        # Spawned backtest/synthetic pool workers import app; that must not run init_database().
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "test.db")
+            subprocess.run(
+                [sys.executable, "-c", "import app"],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env={**os.environ, "NTREE_DB_PATH": db_path},
+                check=True,
+                capture_output=True,
+            )
+            self.assertFalse(os.path.exists(db_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import database
+
+
+class PooledConnectionPragmaTests(unittest.TestCase):
+    """History readers rely on WAL (no blocking behind /replay/step writers) and the read caches."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = database.DB_NAME
+        database.DB_NAME = os.path.join(self._tmpdir.name, "test.db")
+
+    def tearDown(self):
+        database.DB_NAME = self._orig
+        self._tmpdir.cleanup()
+
+    def test_pragmas_applied_on_first_use(self):
+        with database.db_connection() as conn:
+            pragma = lambda name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+            self.assertEqual(pragma("journal_mode"), "wal")
+            self.assertEqual(pragma("synchronous"), 1)  # NORMAL
+            self.assertEqual(pragma("temp_store"), 2)  # MEMORY
+            self.assertEqual(pragma("cache_size"), -65536)
+            self.assertEqual(pragma("mmap_size"), 268435456)
+            self.assertEqual(pragma("foreign_keys"), 1)
+
+
+class PooledConnectionOptimizeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = database.DB_NAME
+        database.DB_NAME = os.path.join(self._tmpdir.name, "test.db")
+
+    def tearDown(self):
+        database.close_db_connections()
+        database.DB_NAME = self._orig
+        self._tmpdir.cleanup()
+
+    def _stat1_exists(self):
+        with database.db_connection() as conn:
+            return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+
+    def test_owning_thread_optimizes_on_release(self):
+        with database.db_connection() as conn:
+            conn.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+            conn.execute("CREATE INDEX idx_t_a ON t(a)")
+            conn.executemany("INSERT INTO t VALUES (?, ?)", [(i % 10, i) for i in range(5000)])
+            conn.commit()
+            conn.execute("SELECT b FROM t WHERE a = 3").fetchall()
+        database.release_db_connection()
+        self.assertFalse(self._stat1_exists())  # not due yet
+
+        with mock.patch.object(database, "_OPTIMIZE_INTERVAL_S", 0.0):
+            database.release_db_connection()
+        self.assertTrue(self._stat1_exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
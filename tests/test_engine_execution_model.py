@@ -65,6 +65,18 @@ class EngineSemanticsTests(unittest.TestCase):
         self.assertEqual(metrics2["n_trades"], 1)
         self.assertAlmostEqual(metrics2["avg_ret"], -0.01, places=9)
 
+    def test_short_exit_found_past_first_scan_window(self):
+        # Short entry at bar1 open=100, risk 1%, reward 1 => TP=99, SL=101; TP is hit 150 bars later.
+        flat = {"open": 100.0, "high": 100.0, "low": 100.0, "close": 100.0, "volume": 1.0}
+        rows = [dict(flat) for _ in range(152)] + [{"open": 99.5, "high": 99.6, "low": 98.9, "close": 99.0, "volume": 1.0}]
+        signals = {"long_entry": [i == 0 for i in range(len(rows))], "direction": ["bearish"] + [None] * (len(rows) - 1)}
+        model = RiskRewardExecutionModel(risk_percent=1.0, reward_multiple=1.0)
+        metrics = run_backtest(_df_from_rows(rows), signals, fee_bp=0.0, execution_model=model)
+        self.assertEqual(metrics["n_trades"], 1)
+        self.assertAlmostEqual(metrics["avg_ret"], 0.01, places=9)
+        exit_event = metrics["execution_events"][-1]
+        self.assertEqual((exit_event["idx"], exit_event["exit_reason"]), (152, "take_profit"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import database
+
+
+class ReplayEventIndexTests(unittest.TestCase):
+    """The replay history indexes exist and the history queries use them."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmpdir = tempfile.TemporaryDirectory()
+        orig = database.DB_NAME
+        database.DB_NAME = os.path.join(cls._tmpdir.name, "test.db")
+        try:
+            database.init_database()
+        finally:
+            cls.db_path, database.DB_NAME = database.DB_NAME, orig
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmpdir.cleanup()
+
+    def _query(self, sql, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _index_columns(self, table, index):
+        names = {row[1] for row in self._query(f"PRAGMA index_list({table})")}
+        self.assertIn(index, names)
+        return [row[2] for row in self._query(f"PRAGMA index_info({index})")]
+
+    def _plan(self, sql, params=()):
+        # Only the index name is checked; the rest of the plan text varies across SQLite versions.
+        return " | ".join(row[-1] for row in self._query("EXPLAIN QUERY PLAN " + sql, params))
+
+    def test_fill_fetch_uses_type_session_index(self):
+        self.assertEqual(
+            self._index_columns("replay_events", "idx_replay_events_type_session"),
+            ["event_type", "session_id"],
+        )
+        plan = self._plan(
+            "SELECT session_id, id, ts_exec, payload_json FROM replay_events "
+            "WHERE session_id IN (?, ?) AND event_type = 'FILL' ORDER BY session_id, id ASC",
+            ("a", "b"),
+        )
+        self.assertIn("idx_replay_events_type_session", plan)
+
+    def test_recent_sessions_use_updated_index(self):
+        self.assertEqual(self._index_columns("replay_sessions", "idx_replay_sessions_updated"), ["updated_at"])
+        plan = self._plan("SELECT session_id FROM replay_sessions ORDER BY updated_at DESC LIMIT 8")
+        self.assertIn("idx_replay_sessions_updated", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+import app as app_module
+from replay.stats import FillTally
+
+
+class _FakeSession:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.ended = False
+        self.fill_tally = FillTally()
+        self.stats_fill_id = 0
+
+    def end(self):
+        self.ended = True
+
+
+class ReplaySessionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(app_module, "_REPLAY_SESSIONS", app_module.OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _add_at(self, sess, now):
+        with mock.patch.object(app_module.time, "monotonic", return_value=now):
+            app_module._add_replay_session(sess)
+
+    def test_idle_sessions_are_ended_and_dropped(self):
+        idle, active = _FakeSession("idle"), _FakeSession("active")
+        self._add_at(idle, 0.0)
+        self._add_at(active, 10.0)
+        with mock.patch.object(app_module.time, "monotonic", return_value=3000.0):
+            self.assertIs(app_module._get_replay_session("active"), active)
+
+        new = _FakeSession("new")
+        self._add_at(new, app_module._REPLAY_SESSION_TTL_S + 5.0)
+        self.assertTrue(idle.ended)
+        self.assertIsNone(app_module._get_replay_session("idle"))
+        self.assertFalse(active.ended)
+        self.assertIs(app_module._get_replay_session("active"), active)
+
+    def test_least_recently_used_dropped_over_cap(self):
+        sessions = [_FakeSession(f"s{i}") for i in range(3)]
+        with mock.patch.object(app_module, "_REPLAY_SESSIONS_MAX", 2):
+            self._add_at(sessions[0], 0.0)
+            self._add_at(sessions[1], 1.0)
+            app_module._get_replay_session("s0")
+            self._add_at(sessions[2], 2.0)
+        self.assertEqual([s.ended for s in sessions], [False, True, False])
+        self.assertEqual(list(app_module._REPLAY_SESSIONS), ["s0", "s2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import unittest
+from unittest import mock
+
+import pytest
+
+import app as app_module
+import database
+from replay.stats import FillTally
+
+pytestmark = pytest.mark.usefixtures("app_db")
+
+
+def _add_session(sid, updated_at, fills):
+    conn = sqlite3.connect(database.DB_NAME)
+    conn.execute(
+        "INSERT INTO replay_sessions (session_id, symbol, exec_tf_sec, disp_tf_sec, t_start, t_end, created_at, updated_at) "
+        "VALUES (?, 'TEST', 60, 60, '2025-01-02T14:30:00Z', '2025-01-02T15:30:00Z', ?, ?)",
+        (sid, updated_at, updated_at),
+    )
+    conn.executemany(
+        "INSERT INTO replay_events (session_id, ts_exec, event_type, payload_json) VALUES (?, ?, 'FILL', ?)",
+        [(sid, "2025-01-02T14:31:00Z", json.dumps(p)) for p in fills],
+    )
+    conn.commit()
+    conn.close()
+
+
+class ReplaySummariesCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def test_cached_until_replay_history_changes(self):
+        _add_session("s1", "2025-01-02T15:00:00Z", [
+            {"position_qty": 1.0, "realized_pnl": 0.0},
+            {"position_qty": 0.0, "realized_pnl": 2.5},
+        ])
+        first = self.client.get("/replay/session_summaries")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([s["session_id"] for s in first.get_json()["sessions"]], ["s1"])
+        self.assertEqual(first.get_json()["sessions"][0]["activity"]["round_trips"], 1)
+
+        again = self.client.get("/replay/session_summaries", headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+        _add_session("s2", "2025-01-02T16:00:00Z", [{"position_qty": -1.0, "realized_pnl": 0.0}])
+        fresh = self.client.get("/replay/session_summaries", headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual([s["session_id"] for s in fresh.get_json()["sessions"]], ["s2", "s1"])
+
+    def test_payloads_with_nan_still_count(self):
+        # json.dumps writes NaN/Infinity, which SQLite's json_valid() rejects.
+        _add_session("nan", "2024-06-01T00:00:00Z", [
+            {"position_qty": 1.0, "realized_pnl": 0.0, "stop": float("nan")},
+            {"position_qty": 0.0, "realized_pnl": 2.5, "target": float("inf")},
+        ])
+        app_module._SUMMARIES_CACHE.clear()
+        sessions = self.client.get("/replay/session_summaries?limit_sessions=50").get_json()["sessions"]
+        (session,) = [s for s in sessions if s["session_id"] == "nan"]
+        self.assertEqual((session["activity"]["fills"], session["activity"]["round_trips"]), (2, 1))
+
+
+class ReplayTradeLedgerTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def test_streamed_rows_span_batches(self):
+        fills = [
+            {"side": "buy" if i % 2 == 0 else "sell", "qty": 1.0, "price": 10.0 + i, "realized_pnl": float(i // 2)}
+            for i in range(5)
+        ]
+        _add_session("ledger", "2030-01-01T00:00:00Z", fills)
+        with mock.patch.object(app_module, "REPLAY_LEDGER_BATCH", 2):
+            resp = self.client.get("/replay/trade_ledger?limit_sessions=1")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.get_json()
+        self.assertGreaterEqual(body["total_sessions"], 1)
+        (session,) = body["sessions"]
+        self.assertEqual((session["session_id"], session["label"]), ("ledger", "S1"))
+        self.assertEqual([r["trade_id"] for r in session["rows"]], [1, 2, 3, 4, 5])
+        self.assertEqual([r["signed_qty"] for r in session["rows"]], [1.0, -1.0, 1.0, -1.0, 1.0])
+        self.assertEqual([r["realized_pnl_delta"] for r in session["rows"]], [0.0, 0.0, 1.0, 0.0, 1.0])
+
+        again = self.client.get("/replay/trade_ledger?limit_sessions=1", headers={"If-None-Match": resp.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+
+class ReplaySessionStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def _latest_summary(self):
+        app_module._SUMMARIES_CACHE.clear()
+        return self.client.get("/replay/session_summaries?limit_sessions=1").get_json()["sessions"][0]
+
+    def test_stats_row_serves_summary_until_a_newer_fill(self):
+        fills = [
+            {"position_qty": 2.0, "realized_pnl": 0.0},
+            {"position_qty": 3.0, "realized_pnl": 0.0},
+            {"position_qty": 0.0, "realized_pnl": 4.0},
+            {"position_qty": -1.0, "realized_pnl": 4.0},
+        ]
+        _add_session("stats", "2031-01-01T00:00:00Z", fills)
+        recomputed = self._latest_summary()
+
+        conn = sqlite3.connect(database.DB_NAME)
+        ids = [r[0] for r in conn.execute("SELECT id FROM replay_events WHERE session_id = 'stats' ORDER BY id")]
+        conn.close()
+        sess = mock.Mock(session_id="stats", fill_tally=FillTally(), stats_fill_id=0)
+        for i, p in zip(ids, fills):
+            sess.fill_tally.add(i, p["position_qty"], p["realized_pnl"])
+        app_module._sync_replay_session_stats(sess)
+        self.assertEqual(sess.stats_fill_id, ids[-1])
+
+        with mock.patch.object(app_module, "_replay_fill_rows", wraps=app_module._replay_fill_rows) as fill_rows:
+            self.assertEqual(self._latest_summary(), recomputed)
+        self.assertEqual(fill_rows.call_args[0][1], [])
+
+        # A FILL the row doesn't cover sends the session back to its events.
+        conn = sqlite3.connect(database.DB_NAME)
+        conn.execute(
+            "INSERT INTO replay_events (session_id, ts_exec, event_type, payload_json) VALUES ('stats', ?, 'FILL', ?)",
+            ("2025-01-02T14:32:00Z", json.dumps({"position_qty": 0.0, "realized_pnl": 6.0})),
+        )
+        conn.commit()
+        conn.close()
+        activity = self._latest_summary()["activity"]
+        self.assertEqual((activity["fills"], activity["round_trips"]), (5, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
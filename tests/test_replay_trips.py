@@ -0,0 +1,45 @@
+import json
+import unittest
+from unittest import mock
+
+import app as app_module
+from replay.stats import FillTally
+
+
+# Long 1 -> add to 3 -> flat, short 2 -> flip long 1 -> flat, then a trip left open.
+POSITIONS = [1.0, 3.0, 0.0, 0.0, -2.0, 1.0, 0.0, 2.0]
+REALIZED = [0.0, 0.0, 5.0, 5.0, 5.0, 2.0, 3.5, 3.5]
+EXPECTED = [
+    {"trip_index": 1, "dir": "long", "realized": 5.0, "qty_peak": 3.0, "adds": 1},
+    {"trip_index": 2, "dir": "short", "realized": -1.5, "qty_peak": 2.0, "adds": 0},
+]
+
+
+class ReplayFillTripsTests(unittest.TestCase):
+    def test_loop(self):
+        with mock.patch.object(app_module, "NUMPY_AVAILABLE", False):
+            self.assertEqual(app_module._replay_fill_trips(POSITIONS, REALIZED), EXPECTED)
+
+    @unittest.skipUnless(app_module.NUMPY_AVAILABLE, "numpy not installed")
+    def test_numpy_matches_loop(self):
+        with mock.patch.object(app_module, "_TRIPS_NUMPY_MIN_FILLS", 0):
+            self.assertEqual(app_module._replay_fill_trips(POSITIONS, REALIZED), EXPECTED)
+            self.assertEqual(app_module._replay_fill_trips([1.0, 2.0], [0.0, 0.0]), [])
+
+
+class FillTallyTests(unittest.TestCase):
+    def test_running_tally_matches_batch_stats(self):
+        tally = FillTally()
+        for i, (pos, pnl) in enumerate(zip(POSITIONS, REALIZED), 1):
+            tally.add(i, pos, pnl)
+        stats = app_module._replay_fill_stats(POSITIONS, REALIZED)
+        self.assertEqual(tally.segments, stats["segments"])
+        self.assertEqual(json.loads(tally.segments_json), stats["segments"])
+        self.assertEqual(
+            (tally.fills, len(tally.segments), tally.adds, tally.max_abs_pos, tally.win_rate, tally.last_fill_id),
+            (stats["fills"], stats["round_trips"], stats["adds"], stats["max_abs_pos"], stats["win_rate"], 8),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
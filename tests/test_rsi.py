@@ -0,0 +1,41 @@
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import wilder_rsi
+
+
+def _wilder_loop(close, length):
+    """Textbook Wilder RSI: SMA seed over the first `length` deltas, then (prev*(n-1)+x)/n."""
+    delta = np.diff(close)
+    gain, loss = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = gain[:length].mean(), loss[:length].mean()
+    out = [math.nan] * length + [100 * avg_gain / (avg_gain + avg_loss)]
+    for g, l in zip(gain[length:], loss[length:]):
+        avg_gain = (avg_gain * (length - 1) + g) / length
+        avg_loss = (avg_loss * (length - 1) + l) / length
+        out.append(100 * avg_gain / (avg_gain + avg_loss))
+    return out
+
+
+class WilderRsiTests(unittest.TestCase):
+    def test_converges_to_textbook_recursion(self):
+        close = 100 + np.random.default_rng(7).standard_normal(600).cumsum()
+        got = wilder_rsi(pd.Series(close), length=14).tolist()
+        ref = _wilder_loop(close, 14)
+        self.assertTrue(all(math.isnan(v) for v in got[:14]))
+        self.assertFalse(math.isnan(got[14]))
+        for a, b in zip(got[300:], ref[300:]):
+            self.assertAlmostEqual(a, b, places=6)
+
+    def test_one_sided_moves(self):
+        up = wilder_rsi(pd.Series(np.arange(30, dtype=float)), length=14)
+        self.assertEqual(up.iloc[-1], 100.0)
+        down = wilder_rsi(pd.Series(np.arange(30, 0, -1, dtype=float)), length=14)
+        self.assertEqual(down.iloc[-1], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
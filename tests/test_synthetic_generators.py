@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import tempfile
 import unittest
 from datetime import datetime, timezone, timedelta
@@ -8,6 +9,7 @@ from synthetic_generators import (
     GENERATOR_REGISTRY,
     SyntheticBar,
     SyntheticL2,
+    generate_and_store,
     get_generator,
     write_synthetic_series_to_db,
 )
@@ -58,11 +60,68 @@ class TrendRegimeGeneratorTests(unittest.TestCase):
                 bar_count = cur.fetchone()[0]
                 cur.execute("SELECT COUNT(*) FROM l2_state")
                 l2_count = cur.fetchone()[0]
+                cur.execute(
+                    "SELECT b.ts_ms, l.dbi FROM l2_state l JOIN bars b ON b.id = l.bar_id ORDER BY b.ts_start"
+                )
+                joined = cur.fetchall()
             finally:
                 conn.close()
+                # Connections are pooled per thread; dispose it before the temp dir is removed.
+                database.close_db_connections()
 
             self.assertEqual(bar_count, 3)
             self.assertEqual(l2_count, 3)
+            self.assertEqual([row[1] for row in joined], [x.dbi for x in l2])
+            self.assertEqual([row[0] for row in joined], [int(bar.ts_start.timestamp()) * 1000 for bar in bars])
+
+    def test_write_keeps_ref_symbol_on_db_without_ts_ms(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute(
+            "CREATE TABLE bars (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT, timeframe TEXT, "
+            "ts_start TEXT, duration_sec INTEGER, open REAL, high REAL, low REAL, close REAL, volume REAL, "
+            "trades INTEGER, vwap REAL, data_source TEXT, scenario TEXT, ref_symbol TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE l2_state (bar_id INTEGER, spr REAL, bbs REAL, bas REAL, dbi REAL, microprice REAL, "
+            "ofi REAL, sigma_spr REAL, frag REAL, d_micro REAL, tss REAL)"
+        )
+        bars, l2 = generate_trend_regime_series(symbol="MES_SYNTH", start_price=5000.0, n_bars=3, seed=7)
+        for bar in bars:
+            bar.ref_symbol = "ES"
+        try:
+            write_synthetic_series_to_db(bars, l2, conn=conn)
+            refs = [r[0] for r in conn.execute("SELECT ref_symbol FROM bars ORDER BY id")]
+        finally:
+            conn.close()
+        self.assertEqual(refs, ["ES", "ES", "ES"])
+
+    def test_generate_and_store_reports_persist_failure(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "test.db")
+            database.DB_NAME = db_path
+            database.init_database()
+            kwargs = dict(
+                symbol="mes_synth",
+                start_price=5000.0,
+                n_bars=4,
+                seed=7,
+                start_ts=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            )
+
+            summary, err = generate_and_store("trend_regime_v1", kwargs, db_path)
+            self.assertIsNone(err)
+            self.assertEqual(summary["bar_count"], 4)
+            self.assertEqual(summary["ts_start_min"], "2025-01-01T00:00:00Z")
+
+            # Same dataset again: unique constraint, nothing half-written.
+            summary, err = generate_and_store("trend_regime_v1", kwargs, db_path)
+            self.assertIsNone(summary)
+            self.assertEqual(err[0], "persist_failed")
+            conn = sqlite3.connect(db_path)
+            try:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM bars WHERE symbol = 'MES_SYNTH'").fetchone()[0], 4)
+            finally:
+                conn.close()
 
 
 class RegistryTests(unittest.TestCase):
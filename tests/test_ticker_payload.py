@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import unittest
+
+import pytest
+
+import app as app_module
+import database
+
+pytestmark = pytest.mark.usefixtures("app_db")
+
+
+def _seed(n=40):
+    conn = sqlite3.connect(database.DB_NAME)
+    rows = []
+    for i in range(n):
+        # 2025-01-02 14:00Z onwards: pre-market, then the regular session opens at 14:30Z.
+        ts = f"2025-01-02T{14 + (i // 60):02d}:{i % 60:02d}:00Z"
+        close = 100.0 + (i % 5) - (i % 3) * 0.5
+        # Missing open/high/low fall back to the close; missing volume to 0.
+        open_ = None if i == 3 else close - 0.25
+        volume = None if i == 4 else float(10 + i)
+        rows.append(("TEST", ts, close, open_, close + 1.0, close - 1.0, volume, "1Min"))
+    conn.executemany(
+        "INSERT INTO stock_data (ticker, timestamp, price, open_price, high_price, low_price, volume, interval) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+class TickerPayloadTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        _seed()
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def _get(self, orjson_available):
+        prev = app_module.ORJSON_AVAILABLE
+        app_module.ORJSON_AVAILABLE = orjson_available and app_module.orjson is not None
+        # The cached indicator series are in the encoder's form, so don't share them across modes.
+        app_module._INDICATOR_CACHE.clear()
+        try:
+            resp = self.client.get("/api/ticker/TEST/1Min")
+        finally:
+            app_module.ORJSON_AVAILABLE = prev
+            app_module._INDICATOR_CACHE.clear()
+        self.assertEqual(resp.status_code, 200)
+        return json.loads(resp.get_data())
+
+    def test_ohlc_rows_and_fallbacks(self):
+        data = self._get(orjson_available=True)
+        self.assertEqual(len(data["ohlc"]), 40)
+        self.assertEqual(data["prices"], [bar["close"] for bar in data["ohlc"]])
+        self.assertEqual(data["ohlc"][3]["open"], data["ohlc"][3]["close"])
+        self.assertEqual(data["ohlc"][4]["volume"], 0.0)
+        # Pre-market bars have no anchored VWAP (NaN -> null).
+        self.assertIsNone(data["indicators_ta"]["vwap"][0])
+        self.assertIsNotNone(data["indicators_ta"]["vwap"][30])
+
+    def test_include_limits_sections(self):
+        full = self._get(orjson_available=True)
+        resp = self.client.get("/api/ticker/TEST/1Min?include=ohlc,market_opens")
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(set(data), set(full))
+        self.assertEqual(data["ohlc"], full["ohlc"])
+        self.assertEqual(data["market_opens"], full["market_opens"])
+        self.assertEqual(data["prices"], full["prices"])
+        self.assertEqual((data["indicators_ta"], data["strategies"], data["market_hours"]), ({}, {}, []))
+        self.assertEqual((data["candle_bias"], data["pattern_counts"]), ([], {}))
+
+    def test_unknown_include_is_rejected(self):
+        resp = self.client.get("/api/ticker/TEST/1Min?include=ohlc,bogus")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error"]["code"], "invalid_include")
+
+    @unittest.skipUnless(app_module.ORJSON_AVAILABLE, "orjson not installed")
+    def test_orjson_and_jsonify_payloads_match(self):
+        self.assertEqual(self._get(orjson_available=True), self._get(orjson_available=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class ListingCacheTests(unittest.TestCase):
+    def test_latest_price_entries_are_bounded(self):
+        prev_max = app_module._LISTING_CACHE_MAX
+        app_module._LISTING_CACHE_MAX = 4
+        app_module._LISTING_CACHE.clear()
+        try:
+            for i in range(10):
+                app_module._cached_listing(f"latest_price:T{i}", lambda: [i])
+            self.assertEqual(list(app_module._LISTING_CACHE), [f"latest_price:T{i}" for i in range(6, 10)])
+        finally:
+            app_module._LISTING_CACHE_MAX = prev_max
+            app_module._LISTING_CACHE.clear()
@@ -0,0 +1,50 @@
+import math
+import unittest
+
+import pandas as pd
+
+from utils import calculate_vwap_per_trading_day
+
+
+def _bars(rows):
+    """rows: (iso_utc, high, low, close, volume)."""
+    df = pd.DataFrame(
+        [(c, h, l, c, v) for _, h, l, c, v in rows],
+        columns=["open", "high", "low", "close", "volume"],
+    )
+    df.index = pd.to_datetime([ts for ts, *_ in rows])
+    return df
+
+
+class VwapPerTradingDayTests(unittest.TestCase):
+    def test_anchoring_and_session_mapping(self):
+        # 2025-01-02 (EST, UTC-5): 09:25 pre-market, 09:30/09:31 regular, 16:05 after-hours;
+        # 2025-01-03: regular bar with zero volume -> no VWAP for that day.
+        df = _bars([
+            ("2025-01-02T14:25:00Z", 11.0, 9.0, 10.0, 500.0),
+            ("2025-01-02T14:30:00Z", 12.0, 9.0, 12.0, 100.0),
+            ("2025-01-02T14:31:00Z", 15.0, 12.0, 15.0, 300.0),
+            ("2025-01-02T21:05:00Z", 20.0, 20.0, 20.0, 900.0),
+            ("2025-01-03T14:30:00Z", 10.0, 10.0, 10.0, 0.0),
+        ])
+        out = calculate_vwap_per_trading_day(df).tolist()
+        first = (12.0 + 9.0 + 12.0) / 3
+        second = (first * 100.0 + (15.0 + 12.0 + 15.0) / 3 * 300.0) / 400.0
+        self.assertTrue(math.isnan(out[0]))
+        self.assertAlmostEqual(out[1], first)
+        self.assertAlmostEqual(out[2], second)
+        self.assertAlmostEqual(out[3], second)
+        self.assertTrue(math.isnan(out[4]))
+
+    def test_unsorted_input_is_returned_sorted(self):
+        df = _bars([
+            ("2025-01-02T14:31:00Z", 15.0, 12.0, 15.0, 300.0),
+            ("2025-01-02T14:30:00Z", 12.0, 9.0, 12.0, 100.0),
+        ])
+        out = calculate_vwap_per_trading_day(df)
+        self.assertTrue(out.index.is_monotonic_increasing)
+        self.assertAlmostEqual(out.iloc[0], 11.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
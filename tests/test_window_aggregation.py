@@ -0,0 +1,80 @@
+import unittest
+
+import app as app_module
+
+
+def _rows(n, start_ms=1_700_000_000_000, step_ms=60_000):
+    rows = []
+    for i in range(n):
+        base = 100.0 + (i % 7) - (i % 3) * 0.5
+        rows.append((start_ms + i * step_ms, base, base + 1.0 + (i % 4), base - 1.0 - (i % 5), base + 0.25, float(i % 11)))
+    return rows
+
+
+class AggregateOhlcvTests(unittest.TestCase):
+    def _python_path(self, rows, bar_s):
+        prev = app_module.NUMPY_AVAILABLE
+        app_module.NUMPY_AVAILABLE = False
+        try:
+            return app_module._aggregate_ohlcv(rows, bar_s)
+        finally:
+            app_module.NUMPY_AVAILABLE = prev
+
+    def test_numpy_path_matches_python_path(self):
+        rows = _rows(500)
+        # Drop a few rows to create gaps (missing minutes / empty buckets).
+        rows = [r for i, r in enumerate(rows) if i % 37 not in (5, 6, 7)]
+        for bar_s in (60, 120, 300, 900, 3600):
+            self.assertEqual(app_module._aggregate_ohlcv(rows, bar_s), self._python_path(rows, bar_s))
+
+    def test_bucket_semantics(self):
+        rows = [
+            (0, 10.0, 12.0, 9.0, 11.0, 1.0),
+            (60_000, 11.0, 15.0, 10.0, 14.0, None),
+            (120_000, 14.0, 14.5, 8.0, 9.0, 2.0),
+        ]
+        out = app_module._aggregate_ohlcv(rows, 120)
+        self.assertEqual(out["t_ms"], [0, 120_000])
+        self.assertEqual(out["o"], [10.0, 14.0])
+        self.assertEqual(out["h"], [15.0, 14.5])
+        self.assertEqual(out["l"], [9.0, 8.0])
+        self.assertEqual(out["c"], [14.0, 9.0])
+        self.assertEqual(out["v"], [1.0, 2.0])
+
+    def test_python_path_sums_integer_volume_as_float(self):
+        rows = [(0, 10.0, 12.0, 9.0, 11.0, 1), (60_000, 11.0, 15.0, 10.0, 14.0, 2), (120_000, 14.0, 14.5, 8.0, 9.0, 3)]
+        out = self._python_path(rows, 120)
+        self.assertEqual(out["v"], [3.0, 3.0])
+        self.assertTrue(all(type(v) is float for v in out["v"]))
+
+    @unittest.skipUnless(app_module.NUMPY_AVAILABLE, "numpy not installed")
+    def test_last_cols_take_last_row_per_bucket(self):
+        rows = [
+            (0, 10.0, 12.0, 9.0, 11.0, 1.0, 1.5, None),
+            (60_000, 11.0, 15.0, 10.0, 14.0, 0.0, 2.5, 7.0),
+            (120_000, 14.0, 14.5, 8.0, 9.0, 2.0, None, None),
+        ]
+        out = app_module._aggregate_ohlcv_np(rows, 0, 120_000, last_cols=("ema_9", "vwap"))
+        self.assertEqual(out["c"], [14.0, 9.0])
+        self.assertEqual(out["ema_9"], [2.5, None])
+        self.assertEqual(out["vwap"], [7.0, None])
+
+    def test_limit_keeps_newest_buckets(self):
+        rows = [r for i, r in enumerate(_rows(500)) if i % 37 not in (5, 6, 7)]
+        full = app_module._aggregate_ohlcv(rows, 300)
+        tail = {k: v[-10:] for k, v in full.items()}
+        self.assertEqual(app_module._aggregate_ohlcv(rows, 300, limit=10), tail)
+        prev = app_module.NUMPY_AVAILABLE
+        app_module.NUMPY_AVAILABLE = False
+        try:
+            self.assertEqual(app_module._aggregate_ohlcv(rows, 300, limit=10), tail)
+        finally:
+            app_module.NUMPY_AVAILABLE = prev
+        self.assertEqual(app_module._aggregate_ohlcv(rows, 300, limit=10_000), full)
+
+    def test_empty_rows(self):
+        self.assertEqual(app_module._aggregate_ohlcv([], 300)["t_ms"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 """
 Utility functions for stock data processing.
 """
+import numpy as np
 import pandas as pd
-from datetime import datetime, time as dt_time, timezone
+from datetime import datetime, time as dt_time, timedelta, timezone
+from itertools import repeat
 import pytz
 
 # Market hours in Eastern Time
@@ -80,48 +82,47 @@ def calculate_vwap_per_trading_day(bars):
     
     # Sort by timestamp
     bars = bars.sort_index()
-    
-    # Calculate typical price
-    typical_price = (bars['high'] + bars['low'] + bars['close']) / 3
-    
-    # Group by trading day
-    bars['trading_day'] = bars.index.map(get_trading_day)
-    
-    # Calculate VWAP per trading day
-    result = pd.Series(index=bars.index, dtype=float)
-    
-    for _day, group in bars.groupby('trading_day'):
-        # VWAP is anchored to 09:30 ET and uses regular session volume only.
-        group_regular = group[group.index.map(lambda ts: is_market_hours(ts) == 'regular')]
+    n = len(bars)
+
+    # Trading day and session per bar, vectorized (same rules as get_trading_day /
+    # is_market_hours: naive timestamps are UTC, days are US/Eastern calendar dates).
+    et = pd.DatetimeIndex(pd.to_datetime(bars.index, utc=True)).tz_convert(ET)
+    day = np.asarray(et.year * 10000 + et.month * 100 + et.day)
+    sod = np.asarray(et.hour * 3600 + et.minute * 60 + et.second)
+    open_s = MARKET_OPEN_TIME.hour * 3600 + MARKET_OPEN_TIME.minute * 60
+    close_s = MARKET_CLOSE_TIME.hour * 3600 + MARKET_CLOSE_TIME.minute * 60
+    regular = (sod >= open_s) & (sod < close_s)
 
-        if group_regular.empty or group_regular['volume'].sum() <= 0:
+    volume = bars['volume'].to_numpy(dtype=float)
+    typical = ((bars['high'] + bars['low'] + bars['close']) / 3).to_numpy(dtype=float)
+
+    result = np.full(n, np.nan)
+    for rows in pd.Series(day).groupby(day).indices.values():
+        # VWAP is anchored to 09:30 ET and uses regular session volume only.
+        regular_rows = rows[regular[rows]]
+        if regular_rows.size == 0 or np.nansum(volume[regular_rows]) <= 0:
             # No regular-hours bars (or no volume) in this visible slice -> no VWAP for the day.
-            result[group.index] = None
             continue
 
-        typical = (group_regular['high'] + group_regular['low'] + group_regular['close']) / 3
-        vwap_day = (typical * group_regular['volume']).cumsum() / group_regular['volume'].cumsum()
-        vwap_series = pd.Series(index=group_regular.index, data=vwap_day.values)
+        vol = volume[regular_rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap_day = _cumsum_skipna(typical[regular_rows] * vol) / _cumsum_skipna(vol)
 
         # Map VWAP:
         # - pre-market (before first regular bar): None
         # - regular: computed VWAP
         # - after-hours: last regular VWAP (flat)
-        first_regular_idx = vwap_series.index[0] if len(vwap_series) else None
-        last_vwap = None
-        for idx in group.index:
-            if idx in vwap_series.index:
-                result[idx] = vwap_series[idx]
-                last_vwap = vwap_series[idx]
-            else:
-                if first_regular_idx is not None and idx < first_regular_idx:
-                    result[idx] = None
-                elif last_vwap is not None:
-                    result[idx] = last_vwap
-                else:
-                    result[idx] = None
-    
-    return result
+        last_regular = np.searchsorted(regular_rows, rows, side='right') - 1
+        result[rows] = np.where(last_regular >= 0, vwap_day[np.maximum(last_regular, 0)], np.nan)
+
+    return pd.Series(result, index=bars.index, dtype=float)
+
+
+def _cumsum_skipna(values):
+    """Cumulative sum like pandas' `Series.cumsum()`: NaN entries stay NaN and are skipped."""
+    out = np.nancumsum(values)
+    out[np.isnan(values)] = np.nan
+    return out
 
 
 def get_market_hours_info(timestamps):
@@ -225,3 +226,78 @@ def get_market_open_times(timestamps):
     
     return market_opens
 
+
+# Indicator columns written with Alpaca bars (app /api/fetch-latest, ingest_data.py), in
+# STOCK_DATA_UPSERT_SQL order.
+STOCK_DATA_INDICATOR_COLUMNS = (
+    'ema_9', 'ema_21', 'ema_50', 'ema_200', 'vwap', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower', 'sma_20', 'sma_50', 'sma_200',
+)
+STOCK_DATA_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO stock_data 
+    (ticker, timestamp, price, open_price, high_price, low_price, volume, 
+     interval, ema_9, ema_21, ema_50, ema_200, vwap, rsi, macd, macd_signal, macd_histogram, 
+     bb_upper, bb_middle, bb_lower, sma_20, sma_50, sma_200)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def to_nullable_floats(values):
+    """Numeric column (Series/array, may hold None/NA) as a list of floats with NaN -> None."""
+    if isinstance(values, pd.Series):
+        arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        arr = np.asarray(values, dtype=np.float64)
+    mask = np.isnan(arr)
+    if not mask.any():
+        return arr.tolist()
+    out = arr.astype(object)
+    out[mask] = None
+    return out.tolist()
+
+
+def wilder_rsi(close, length=14):
+    """
+    RSI with Wilder's smoothing (the recursive average pandas_ta uses), for when pandas_ta is
+    unavailable. ewm(alpha=1/length) is that recursion run in C, so no per-bar Python loop.
+    """
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1.0 / length, min_periods=length).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1.0 / length, min_periods=length).mean()
+    return 100 * gain / (gain + loss)
+
+
+def iso_timestamps(index):
+    """
+    `[ts.isoformat() for ts in index]`, formatted in one NumPy call when the index is naive or UTC
+    and on whole seconds (Alpaca bars); anything else takes the per-timestamp path.
+    """
+    tz = index.tz
+    utc = tz is not None and tz.utcoffset(None) == timedelta(0)
+    if tz is None or utc:
+        values = index.values  # datetime64 (UTC wall time when tz-aware), any unit
+        seconds = values.astype('datetime64[s]')
+        if len(values) and (seconds == values).all():
+            stamps = np.datetime_as_string(seconds).tolist()
+            return [s + '+00:00' for s in stamps] if utc else stamps
+    return [ts.isoformat() for ts in index]
+
+
+def stock_data_rows(ticker, interval, bars):
+    """
+    STOCK_DATA_UPSERT_SQL parameter rows for Alpaca bars (DatetimeIndex, OHLCV and
+    STOCK_DATA_INDICATOR_COLUMNS), built column by column for one executemany();
+    missing volume/indicators become NULL.
+    """
+    n = len(bars)
+    prices = [bars[col].astype(float).tolist() for col in ('close', 'open', 'high', 'low')]
+    volume = to_nullable_floats(bars['volume']) if 'volume' in bars.columns else [None] * n
+    indicators = [to_nullable_floats(bars[col]) for col in STOCK_DATA_INDICATOR_COLUMNS]
+    return list(zip(
+        repeat(ticker, n),
+        iso_timestamps(bars.index),
+        *prices,
+        volume,
+        repeat(interval, n),
+        *indicators,
+    ))